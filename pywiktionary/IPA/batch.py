@@ -0,0 +1,100 @@
+"""Batch conversion of spellings to IPA.
+
+Building a lexicon converts hundreds of thousands of spellings, many of
+them repeated. The ``to_IPA_many`` functions of language modules convert
+an iterable of spellings through :func:`convert_many`, which converts
+each distinct spelling and options only once and yields results in
+order of input. :func:`convert_batches` passes distinct spellings in
+batches to a converter of many spellings at once.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import itertools
+
+
+# Default number of spellings read from input per batch
+BATCH_SIZE = 1000
+
+
+def convert_many(convert, items, options=None):
+    """Convert spellings with results of duplicates reused.
+
+    Parameters
+    ----------
+    convert : function
+        Function converting a spelling with keyword options to IPA.
+    items : iterable
+        Iterable of spelling strings, or of ``(text, options)`` tuples
+        with dict of options of the spelling.
+    options : dict
+        Dict of default options of all spellings.
+
+    Yields
+    ------
+    string
+        Converted IPA of each spelling, in order of ``items``.
+    """
+    options = options or {}
+    results = {}
+    for item in items:
+        key, text, item_options = item_key(item, options)
+        try:
+            ipa = results[key]
+        except KeyError:
+            ipa = results[key] = convert(text, **item_options)
+        yield ipa
+
+
+def convert_batches(convert_batch, items, options=None, size=BATCH_SIZE):
+    """Convert spellings in batches with results of duplicates reused.
+
+    Parameters
+    ----------
+    convert_batch : function
+        Function converting a list of ``(text, options)`` tuples to a
+        list of IPA.
+    items : iterable
+        Iterable of spelling strings, or of ``(text, options)`` tuples
+        with dict of options of the spelling.
+    options : dict
+        Dict of default options of all spellings.
+    size : int
+        Number of items read from ``items`` per batch; a batch holds the
+        spellings among them not converted before.
+
+    Yields
+    ------
+    string
+        Converted IPA of each spelling, in order of ``items``.
+    """
+    options = options or {}
+    results = {}
+    items = iter(items)
+    while True:
+        keys = []
+        pending = {}
+        for item in itertools.islice(items, size):
+            key, text, item_options = item_key(item, options)
+            keys.append(key)
+            if key not in results and key not in pending:
+                pending[key] = (text, item_options)
+        if not keys:
+            break
+        if pending:
+            keys_pending = list(pending.keys())
+            ipas = convert_batch([pending[key] for key in keys_pending])
+            results.update(zip(keys_pending, ipas))
+        for key in keys:
+            yield results[key]
+
+
+def item_key(item, options):
+    """Split item into text and options, and build its result key."""
+    if isinstance(item, tuple):
+        text, item_options = item
+        item_options = dict(options, **item_options)
+    else:
+        text, item_options = item, options
+    return (text, tuple(sorted(item_options.items()))), text, item_options
@@ -11,6 +11,7 @@ from __future__ import unicode_literals
 import unicodedata
 
 import regex as re
+from .batch import convert_many
 
 
 tones =  "[̄́̌̀]"
@@ -219,6 +220,10 @@ ipa_t_values = {
     "4-2": "⁵¹⁻³⁵",
 }
 
+# decomposed forms of ü and ê, recomposed in pinyin_transform
+NFD_U_DIAERESIS = unicodedata.normalize("NFD", "ü")
+NFD_E_CIRCUMFLEX = unicodedata.normalize("NFD", "ê")
+
 def tone_determ(text):
     text = unicodedata.normalize("NFD", text)
     match = re.search(tones, text)
@@ -231,13 +236,9 @@ def pinyin_transform(text):
     if re.search("​", text):
         return ""
     text = re.sub(
-        unicodedata.normalize("NFD", "ü"),
+        NFD_U_DIAERESIS,
         "ü",
-        re.sub(
-            unicodedata.normalize("NFD", "ê"),
-            "ê",
-            unicodedata.normalize("NFD", text)
-        )
+        re.sub(NFD_E_CIRCUMFLEX, "ê", unicodedata.normalize("NFD", text))
     )
     if re.search(
             "[aeiouêü]" + tones + "[aeiou]?[aeiouêü]" + tones + "",
@@ -385,3 +386,25 @@ def to_IPA(text, IPA_tone=True):
             p[i] += tone[i]
 
     return " ".join(p)
+
+
+def to_IPA_many(texts, **options):
+    """Generates Mandarin IPA from many Pinyin texts.
+
+    Pinyin texts repeated with the same options are converted once.
+
+    Parameters
+    ----------
+    texts : iterable
+        Iterable of Pinyin text strings, or of ``(text, options)`` tuples
+        with dict of keyword arguments of :func:`to_IPA` for the text.
+
+    **options
+        Keyword arguments of :func:`to_IPA` for all texts.
+
+    Yields
+    ------
+    string
+        Converted Mandarin IPA of each text, in order.
+    """
+    return convert_many(to_IPA, texts, options)
@@ -9,6 +9,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import regex as re
+from .batch import convert_many
 
 
 def to_IPA(word, LatinAmerica=False, phonetic=True):
@@ -202,3 +203,25 @@ def to_IPA(word, LatinAmerica=False, phonetic=True):
     word = re.sub("ï", "i", word) # fake "y$" to real "y$"
 
     return word
+
+
+def to_IPA_many(texts, **options):
+    """Generates Spanish IPA from many spellings.
+
+    Spellings repeated with the same options are converted once.
+
+    Parameters
+    ----------
+    texts : iterable
+        Iterable of es-IPA text strings, or of ``(text, options)`` tuples
+        with dict of keyword arguments of :func:`to_IPA` for the text.
+
+    **options
+        Keyword arguments of :func:`to_IPA` for all texts.
+
+    Yields
+    ------
+    string
+        Converted Spanish IPA of each text, in order.
+    """
+    return convert_many(to_IPA, texts, options)
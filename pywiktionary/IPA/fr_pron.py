@@ -10,16 +10,10 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import regex as re
+from .rules import Rule, Cascade, fixed_point
+from .batch import convert_many
 
 
-# apply sub() repeatedly until no change
-def sub_repeatedly(pattern, repl, term):
-    while True:
-        new_term = re.sub(pattern, repl, term)
-        if new_term == term:
-            return term
-        term = new_term
-
 def ine(x):
     if x == "":
         return None
@@ -96,6 +90,86 @@ cons_or_joiner_c = "[^" + vowel + ". ]" # includes all joiners
 front_vowel = "eiéèêĕėəɛæœy" # should not include capital E, used in cœur etc.
 front_vowel_c = "[" + front_vowel + "]"
 
+def nasalize(match):
+    v1, v2, mn, c = \
+        match.group(1), match.group(2), match.group(3), match.group(4)
+    if mn == "n" or re.search("[bpBP]", c) or v2 == "o" or v2 == "ɛ":
+        nasaltab = {
+            "a": "ɑ̃", "ä": "ɑ̃", "e": "ɑ̃", "ë": "ɑ̃",
+            "ɛ": "ɛ̃", "i": "ɛ̃", "ï": "ɛ̃", "o": "ɔ̃", "ö": "ɔ̃",
+            "ø": "œ̃", "œ": "œ̃", "u": "œ̃", "ü": "œ̃",
+        } # à jeun
+        if re.search("[éiï]", v1) and v2 == "e":
+            return v1 + ".ɛ̃" + c # bien, européen, païen
+        elif v1 == "j" and v2 == "e":
+            return "jɛ̃" + c # moyen
+        elif v1 == "o" and v2 == "i":
+            return "wɛ̃" + c # coin, point
+        elif v2 in nasaltab.keys():
+            return v1 + nasaltab[v2] + c
+    return v1 + v2 + mn + c
+
+def delete_schwa(match):
+    v1, c1, c2, v2 = \
+        match.group(1), match.group(2), match.group(3), match.group(4)
+    if c1 == "ʁ" and c2 == "ʁ":
+        return v1 + "." + c1 + "Ə." + c2 + v2
+    return v1 + c1 + "." + c2 + v2
+
+def optional_schwa(match):
+    v1, c1, sep1, sep2, c2, v2 = \
+        match.group(1), match.group(2), match.group(3), match.group(4), match.group(5), match.group(6)
+    if c1 + c2 in no_delete_schwa_between.keys() and \
+        no_delete_schwa_between[c1 + c2]:
+        return v1 + c1 + sep1 + "Ə" + sep2 + c2 + v2
+    return v1 + c1 + sep1 + "(Ə)" + sep2 + c2 + v2
+
+# Rules applied to a fixed point by to_IPA(), see comments there; rules
+# applied from right to left match in reverse, one match per pass.
+uill_rule = Rule("(" + cons_c + ")uill", r"\1ɥij")
+vowel_ill_rule = Rule("(" + vowel_c + ")ill", r"\1j")
+nasal_rule = Rule("(.)(" + vowel_c + ")([mn])(" + non_vowel_c + ")", nasalize)
+syllable_open_rule = Rule(
+    "(" + vowel_maybe_nasal_r + opt_syljoiners_c + ")" + \
+    "(" + real_cons_c + "?" + \
+    opt_syljoiners_c + oral_vowel_c + ")",
+    r"\1.\2"
+)
+syllable_closed_rule = Rule(
+    "(" + vowel_maybe_nasal_r + opt_syljoiners_c + \
+    real_cons_c + opt_syljoiners_c + ")" + \
+    "(" + real_cons_c + cons_or_joiner_c + \
+    "*" + oral_vowel_c + ")",
+    r"\1.\2"
+)
+schwa_rule = Rule(
+    "e\.(" + cons_no_liaison_c + '*' + vowel_c + ")",
+    r"ə.\1"
+)
+glide_subs = Cascade([
+    Rule("i\.?(" + vowel_c + ")", r"J\1", re.REVERSE, 1),
+    Rule("y\.?(" + vowel_c + ")", r"ɥ\1", re.REVERSE, 1),
+    Rule("U\.?(" + vowel_c + ")", r"W\1", re.REVERSE, 1),
+])
+delete_schwa_rule = Rule(
+    "(" + vowel_no_schwa_c + ")\." + \
+    "(" + real_cons_c + ")ə\." + \
+    "(" + real_cons_c + ")" + \
+    "(" + vowel_no_schwa_c + ")",
+    delete_schwa
+)
+optional_schwa_rule = Rule(
+    "(" + vowel_c + opt_schwajoiners_c + ")" + \
+    "(" + real_cons_c + ")" + \
+    "(" + opt_schwajoiners_c + ")ə" + \
+    "(" + opt_schwajoiners_c + ")" + \
+    "(" + real_cons_c + ")" + \
+    "(" + opt_schwajoiners_c + vowel_c + ")",
+    optional_schwa,
+    re.REVERSE,
+    1
+)
+
 
 def to_IPA(text, pos=""):
     """Generates French IPA from spelling.
@@ -138,24 +212,6 @@ def to_IPA(text, pos=""):
         if vow in remove_diaeresis_from_vowel.keys():
             return "gu" + remove_diaeresis_from_vowel[vow]
         return "g" + vow
-    def repl2(match):
-        v1, v2, mn, c = \
-            match.group(1), match.group(2), match.group(3), match.group(4)
-        if mn == "n" or re.search("[bpBP]", c) or v2 == "o" or v2 == "ɛ":
-            nasaltab = {
-                "a": "ɑ̃", "ä": "ɑ̃", "e": "ɑ̃", "ë": "ɑ̃",
-                "ɛ": "ɛ̃", "i": "ɛ̃", "ï": "ɛ̃", "o": "ɔ̃", "ö": "ɔ̃",
-                "ø": "œ̃", "œ": "œ̃", "u": "œ̃", "ü": "œ̃",
-            } # à jeun
-            if re.search("[éiï]", v1) and v2 == "e":
-                return v1 + ".ɛ̃" + c # bien, européen, païen
-            elif v1 == "j" and v2 == "e":
-                return "jɛ̃" + c # moyen
-            elif v1 == "o" and v2 == "i":
-                return "wɛ̃" + c # coin, point
-            elif v2 in nasaltab.keys():
-                return v1 + nasaltab[v2] + c
-        return v1 + v2 + mn + c
     def repl3(match):
         k = match.group()
         if k in remove_diaeresis_from_vowel.keys():
@@ -169,19 +225,6 @@ def to_IPA(text, pos=""):
         if re.search("[lmn]", a) and b == "ʁ":
             return a + dot + b + "ə" + "⁀"
         return a + dot + b + "(ə)" + "⁀"
-    def repl5(match):
-        v1, c1, c2, v2 = \
-            match.group(1), match.group(2), match.group(3), match.group(4)
-        if c1 == "ʁ" and c2 == "ʁ":
-            return v1 + "." + c1 + "Ə." + c2 + v2
-        return v1 + c1 + "." + c2 + v2
-    def repl6(match):
-        v1, c1, sep1, sep2, c2, v2 = \
-            match.group(1), match.group(2), match.group(3), match.group(4), match.group(5), match.group(6)
-        if c1 + c2 in no_delete_schwa_between.keys() and \
-            no_delete_schwa_between[c1 + c2]:
-            return v1 + c1 + sep1 + "Ə" + sep2 + c2 + v2
-        return v1 + c1 + sep1 + "(Ə)" + sep2 + c2 + v2
 
     text = text.lower()
 
@@ -274,10 +317,10 @@ def to_IPA(text, pos=""):
     # (e.g. [[boycotter]] respelled 'boillcotter')
     # (1) special-casing for C+uill (juillet, cuillère, aiguille respelled
     #     aiguïlle)
-    text = sub_repeatedly("(" + cons_c + ")uill", r"\1ɥij", text)
+    text = fixed_point(uill_rule, text)
     # (2) -ill- after a vowel; repeat if necessary in case of VillVill
     #     sequence (ailloille respelling of ayoye)
-    text = sub_repeatedly("(" + vowel_c + ")ill", r"\1j", text)
+    text = fixed_point(vowel_ill_rule, text)
     # (3) any other ill, except word-initially (illustrer etc.)
     text = re.sub("([^⁀])ill", r"\1ij", text)
     # (4) final -il after a vowel; we consider final -Cil to contain a
@@ -381,11 +424,7 @@ def to_IPA(text, pos=""):
     # 'oi' diphthong down below so we don't run into problems with the 'noi'
     # sequence (otherwise we'd map 'oi' to 'wa' and then nasalize the n
     # because it no longer precedes a vowel).
-    text = sub_repeatedly(
-        "(.)(" + vowel_c + ")([mn])(" + non_vowel_c + ")",
-        repl2,
-        text
-    )
+    text = fixed_point(nasal_rule, text)
     # special hack for maximum, aquarium, circumlunaire, etc.
     text = re.sub("um(" + non_vowel_c + ")", r"ɔm\1", text)
     # now remove BP that represent original b/p to be deleted, which we've
@@ -404,22 +443,9 @@ def to_IPA(text, pos=""):
     # syllabify
     # (1) break up VCV as V.CV, and VV as V.V; repeat to handle successive
     #     syllables
-    text = sub_repeatedly(
-        "(" + vowel_maybe_nasal_r + opt_syljoiners_c + ")" + \
-        "(" + real_cons_c + "?" + \
-        opt_syljoiners_c + oral_vowel_c + ")",
-        r"\1.\2",
-        text
-    )
+    text = fixed_point(syllable_open_rule, text)
     # (2) break up other VCCCV as VC.CCV, and VCCV as VC.CV; repeat to handle successive syllables
-    text = sub_repeatedly(
-        "(" + vowel_maybe_nasal_r + opt_syljoiners_c + \
-        real_cons_c + opt_syljoiners_c + ")" + \
-        "(" + real_cons_c + cons_or_joiner_c + \
-        "*" + oral_vowel_c + ")",
-        r"\1.\2",
-        text
-    )
+    text = fixed_point(syllable_closed_rule, text)
 
     def resyllabify(text):
         def resyllabify_repl1(match):
@@ -483,11 +509,7 @@ def to_IPA(text, pos=""):
     # text = re.sub("a(\.?)z", r"ɑ\1z", text)
     text = re.sub("ă", "a", text)
     text = re.sub("e\.j", "ɛ.j", text) # réveiller
-    text = sub_repeatedly(
-        "e\.(" + cons_no_liaison_c + '*' + vowel_c + ")",
-        r"ə.\1",
-        text
-    )
+    text = fixed_point(schwa_rule, text)
     text = re.sub("e([⁀‿])", r"ə\1", text)
     text = re.sub("æ\.", "é.", text)
     text = re.sub("æ([⁀‿])", r"é\1", text)
@@ -544,13 +566,7 @@ def to_IPA(text, pos=""):
     #    sources (w or oi); will be lowercased later; not necessary to do
     #    something similar to ɥ, which can always be converted back to /y/
     #    because it always originates from /y/.
-    while True:
-        new_text = re.sub("^(.*)i\.?(" + vowel_c + ")", r"\1J\2", text)
-        new_text = re.sub("^(.*)y\.?(" + vowel_c + ")", r"\1ɥ\2", new_text)
-        new_text = re.sub("^(.*)U\.?(" + vowel_c + ")", r"\1W\2", new_text)
-        if new_text == text:
-            break
-        text = new_text
+    text = fixed_point(glide_subs, text)
 
     # hack for agréions, pronounced with /j.j/
     text = re.sub("e.J", "ej.J", text)
@@ -571,31 +587,15 @@ def to_IPA(text, pos=""):
     #    except in ʁəʁ sequence (déchirerez); use uppercase schwa when not
     #    deleting it, see below; FIXME, we might want to prevent schwa deletion
     #    with other consonant sequences
-    text = sub_repeatedly(
-        "(" + vowel_no_schwa_c + ")\." + \
-        "(" + real_cons_c + ")ə\." + \
-        "(" + real_cons_c + ")" + \
-        "(" + vowel_no_schwa_c + ")",
-        repl5,
-        text
-    )
+    text = fixed_point(delete_schwa_rule, text)
     # 2. make optional internal schwa in remaining VCəCV sequences, including
     # across words, except between certain pairs of consonants (FIXME, needs
     # to be smarter); needs to happen after /e/ -> /ɛ/ before schwa in next
     # syllable and after removing ' and _ (or we need to take them into account);
-    # include .* so we go right-to-left, convert to uppercase schwa so
+    # match in reverse so we go right-to-left, convert to uppercase schwa so
     # we can handle sequences of schwas and not get stuck if we want to
     # leave a schwa alone.
-    text = sub_repeatedly(
-        "(.*" + vowel_c + opt_schwajoiners_c + ")" + \
-        "(" + real_cons_c + ")" + \
-        "(" + opt_schwajoiners_c + ")ə" + \
-        "(" + opt_schwajoiners_c + ")" + \
-        "(" + real_cons_c + ")" + \
-        "(" + opt_schwajoiners_c + vowel_c + ")",
-        repl6,
-        text
-    )
+    text = fixed_point(optional_schwa_rule, text)
 
     # lowercase any uppercase letters (AOUMNJW etc.); they were there to
     # prevent certain later rules from firing
@@ -614,3 +614,25 @@ def to_IPA(text, pos=""):
     text = re.sub("[⁀\-]", "", text)
 
     return text
+
+
+def to_IPA_many(texts, **options):
+    """Generates French IPA from many spellings.
+
+    Spellings repeated with the same options are converted once.
+
+    Parameters
+    ----------
+    texts : iterable
+        Iterable of fr-IPA text strings, or of ``(text, options)`` tuples
+        with dict of keyword arguments of :func:`to_IPA` for the text.
+
+    **options
+        Keyword arguments of :func:`to_IPA` for all texts.
+
+    Yields
+    ------
+    string
+        Converted French IPA of each text, in order.
+    """
+    return convert_many(to_IPA, texts, options)
@@ -10,6 +10,7 @@ from __future__ import unicode_literals
 
 import regex as re
 from .hi_translit import transliterate
+from .batch import convert_many
 
 
 correspondences = {
@@ -115,3 +116,21 @@ def to_IPA(text):
         else:
             result.append(ch)
     return "".join(result)
+
+
+def to_IPA_many(texts):
+    """Generates Hindi IPA from many spellings.
+
+    Repeated spellings are converted once.
+
+    Parameters
+    ----------
+    texts : iterable
+        Iterable of hi-IPA text strings.
+
+    Yields
+    ------
+    string
+        Converted Hindi IPA of each text, in order.
+    """
+    return convert_many(to_IPA, texts)
@@ -181,6 +181,8 @@ from __future__ import unicode_literals
 import regex as re
 from . import ru_common as com
 from . import ru_translit
+from .rules import Rule, Cascade, fixed_point, map_joined
+from .batch import convert_batches
 
 
 def list_to_set(lst):
@@ -192,14 +194,6 @@ def list_to_set(lst):
 
 remove_grave_accents_from_phonetic_respelling = True # Anatoli's desired value
 
-def sub_repeatedly(pattern, repl, term):
-    """apply sub() repeatedly until no change"""
-    while True:
-        new_term = re.sub(pattern, repl, term)
-        if new_term == term:
-            return term
-        term = new_term
-
 # If enabled, compare this module with new version of module in
 # Module:User:Benwing2/ru-pron to make sure all pronunciations are the same.
 # To check for differences, go to Template:tracking/ru-pron/different-pron
@@ -347,7 +341,7 @@ def ot_pod_sz(match):
     pre, sz = match.group(1), match.group(2)
     return pre + sztab[sz]
 
-phonetic_subs = [
+phonetic_subs = Cascade([
     ("h", "ɣ"),
 
     ("šč", "ɕː"), # conversion of šč to geminate
@@ -449,7 +443,7 @@ phonetic_subs = [
 
      # backing of /i/ after hard consonants in close juncture
     ("([mnpbtdkgfvszxɣrlšžcĵĉĝ])⁀‿⁀i", r"\1⁀‿⁀y"),
-]
+])
 
 cons_assim_palatal = {
     # assimilation of tn, dn, sn, zn, st, zd, nč, nɕ is handled specially
@@ -586,6 +580,237 @@ def phon_respelling(text, remove_grave):
     return text
 
 
+# Rules applied by to_IPA(), in the order they are applied; see comments
+# in to_IPA() for what they do. Patterns are compiled once here instead of
+# on every call.
+accent_subs = Cascade([
+    ("``", DUBGR),
+    ("`", GR),
+    ("@", DOTABOVE),
+    ("\^", CFLEX),
+    (DUBGR, CFLEX),
+    ("э", "ɛ"),
+    ("([" + com.vowel + "]" + com.opt_accent + ")й([еѐ])", r"\1йй\2"),
+])
+
+translit_subs = Cascade([
+    ("ě̈", "jo" + AC),
+    ("ě", "e"),
+    (accents + "+(" + accents + ")", r"\1"),
+    ("\s*[,–—]\s*", " | "),
+    ("\s+", " "),
+])
+
+word_sep = re.compile("([ \-]+)")
+accents_re = re.compile(accents)
+non_vowel_rule = Rule("[^" + vow + "]", "")
+primary_stress_rule = Rule(vowels_c, r"\1" + AC)
+tertiary_stress_rule = Rule(vowels_c, r"\1" + CFLEX)
+
+juncture_subs = Cascade([
+    ("[\-\s]+", " "),
+    ("^ ", ""),
+    (" $", ""),
+    (" ", "⁀ ⁀"),
+    ("([!?])", r"⁀\1⁀"),
+])
+tie_rule = Rule("‿", "⁀‿⁀")
+
+palatal_vowel_subs = Cascade([
+    ("([šž])j([ou])", r"\2\3"),
+    ("([čǰӂ])([aou])", r"\1j\2"),
+    ("ʹo", "ʹjo"),
+    ("(" + vowels + accents + "?o)⁀", r"\1" + CFLEX + "⁀"),
+    ("jo⁀", "jo" + CFLEX + "⁀"),
+    (DOTABOVE, ""),
+    ("ja" + DOTBELOW, "jạ"),
+])
+
+adj_subs = Cascade([
+    ("(.[aoe]́?)go(" + AC + "?)⁀", r"\1vo\2⁀"),
+    ("(.[aoe]́?)go(" + AC + "?)sja⁀", r"\1vo\2sja⁀"),
+])
+
+tsja_subs = Cascade([
+    ("́tʹ?sja⁀", "́cca⁀"),
+    ("([^́])tʹ?sja⁀", r"\1ca⁀"),
+])
+
+def devoice(match):
+    return devoicing[match.group(1)] + match.group(2)
+
+def voice(match):
+    return voicing[match.group(1)] + match.group(2)
+
+# MULTILINE so that $ also matches at the end of each text joined by
+# convert_batch()
+final_devoicing_subs = Cascade([
+    Rule("([bdgvɣzžĝĵǰӂ])(ʹ?⁀)$", devoice, re.MULTILINE),
+    ("([bdgvɣzžĝĵǰӂ])(ʹ?⁀ ⁀[^bdgɣzžĝĵǰӂ])", devoice),
+])
+
+voicing_assim_subs = Cascade([
+    ("([bdgvɣzžĝĵǰӂ])([ ‿⁀ʹːˑ()/]*[ptkfxsščɕcĉ])", devoice),
+    ("([ptkfxsščɕcĉ])([ ‿⁀ʹːˑ()/]*v?[ ‿⁀ʹːˑ()/]*[bdgɣzžĝĵǰӂ])", voice),
+])
+
+geminate_iotation_subs = Cascade([
+    ("([^" + vow + ".\-_])" + r"\1", r"\1ː"),
+    ("([^" + vow + ".\-_])" + r"\(\1\)", r"\1(ː)"),
+    ("(j[\(ːˑ\)]*)([aeou])", lambda x: x.group(1) + iotating[x.group(2)]),
+    ("([^" + vow + acc + "ʹʺ‿⁀ ]/?)j([äạëöü])", r"\1\2"),
+])
+
+# geminate_pref, compiled as patterns matching word-initially and after ne-
+geminate_pref_res = [
+    (
+        re.compile("⁀" + newspell), re.compile("⁀" + oldspell),
+        re.compile("⁀ne" + newspell), re.compile("⁀ne" + oldspell),
+    ) for newspell, oldspell in geminate_pref
+]
+remove_accents_rule = Rule(accents, "")
+prefix_gem_rule = Rule("(⁀[^‿⁀ː]*)ː", r"\1ˑ")
+
+keep_gem_rule = Rule("ˑ", "ː")
+opt_gem_rule = Rule("([^ɕӂ\(\)])[ːˑ]", r"\1(ː)")
+no_gem_rule = Rule("([^ɕӂ\(\)])[ːˑ]", r"\1")
+degem_l_rule = Rule("(l)ː", r"\1")
+gem_after_stress_rule = Rule("(" + vowels + stress_accents + "[^ɕӂ\(\)])ː(" + vowels + ")", r"\1ˑ\2")
+gem_n_after_stress_rule = Rule("(" + stress_accents + ".*?" + vowels + accents + "?n)ː(" + vowels + ")", r"\1(ː)\2")
+gem_zn_rule = Rule("(" + vowels + accents + "?[žn])ː(" + vowels + ")", r"\1ˑ\2")
+degem_subs = Cascade([
+    ("(" + vowels + stress_accents + "[^" + vow + "]*s)ː(k)", r"\1ˑ\2"),
+    ("([^ɕӂ\(\)])ː", r"\1"),
+    ("ˑ", "ː"),
+])
+
+soft_sign_subs = Cascade([
+    ("ʹi", "ʹji"),
+    ("ʺ([aɛiouy])", r"ʔ\1"),
+    ("\(ʹ\)", "⁽ʲ⁾"),
+    ("([mnpbtdkgfvszxɣrl])([ː()]*[eiäạëöüʹ])", r"\1ʲ\2"),
+    ("([cĵ])([ː()]*[äạöüʹ])", r"\1ʲ\2"),
+    ("[ʹʺ]", ""),
+    ("[äạ]⁀", "ə⁀"),
+    ("⁀nʲe⁀", "⁀nʲi⁀"),
+    ("⁀že⁀", "⁀žy⁀"),
+])
+
+final_je_rule = Rule(vowels_c + "(" + accents + "?j)ë⁀")
+final_e_rule = Rule("(.)(ʲ?[ː()]*)[eë]⁀")
+final_e_tie_rule = Rule("e" + TEMPCFLEX + "⁀‿", "i⁀‿")
+final_e_end_rule = Rule("e" + TEMPCFLEX + "⁀$", "i⁀")
+tempcflex_rule = Rule(TEMPCFLEX, CFLEX)
+old_final_e_subs = Cascade([
+    (vowels_c + "([cĵšžĉĝ][ː()]*)[eë]", r"\1\2ɛ"),
+    ("⁀ko(" + stress_accents + ")jë⁀", r"⁀ko\1ji⁀"),
+    ("[eë]⁀", "ə⁀"),
+])
+retraction_rule = Rule(
+    "([cĵšžĉĝ][ː()]*)([ei])",
+    lambda x: x.group(1) + retracting[x.group(2)]
+)
+
+def perm_onset(match):
+    a, aund, b, bund, c, d = \
+        match.group(1), match.group(2), match.group(3), match.group(4), match.group(5), match.group(6)
+    if a+b+c in perm_syl_onset.keys() or c == "j" and re.search("[čǰɕӂʲ]", b):
+        return "@" + a + aund + b + bund + c + d
+    elif b+c in perm_syl_onset.keys():
+        return a + aund + "@" + b + bund + c + d
+    return match.group()
+
+syllabify_subs = Cascade([
+    ("(" + vowels + accents + "?)", r"\1@"),
+    ("@+⁀$", "⁀"),
+    (
+        "@([^@" + vow + acc + "]*)([‿⁀]+[^‿⁀@" + vow + acc + "])",
+        r"\1@\2"
+    ),
+    (
+        "@([^‿⁀@" + vow + acc + "]*)([^‿⁀@" + vow + acc + "ːˑ()ʲ]ʲ?[ːˑ()]*‿?[" + vow + acc + "])",
+        r"\1@\2"
+    ),
+    (
+        "([^‿⁀@_" + vow + acc + "]?)(_*)([^‿⁀@_" + vow + acc + "])(_*)@([^‿⁀@" + vow + acc + "ːˑ()ʲ])(ʲ?[ːˑ()]*[‿⁀]*[" + vow + acc + "])",
+        perm_onset
+    ),
+])
+
+def explicit_boundary(match):
+    x = match.group()
+    if "/" in x:
+        x = x.replace("@", "").replace("/", "@")
+    return x
+
+explicit_boundary_rule = Rule("[^" + vow + acc + "]+", explicit_boundary)
+
+syllable_edge_subs = Cascade([
+    ("@([^‿⁀@" + vow + "]+⁀)$", r"\1"),
+    ("^(⁀[^‿⁀@" + vow + "]+)@", r"\1"),
+    ("@([‿⁀]+)", r"\1@"),
+    ("^⁀[ao]([^" + acc + "])", r"⁀ɐ\1"),
+])
+
+stress_accents_re = re.compile(stress_accents)
+stress_mark_subs = Cascade([
+    ("(.*)́", r"ˈ\1"),
+    ("(.*)̀", r"ˌ\1"),
+    (CFLEX, ""),
+])
+allophone_rule = Rule(vowels_c)
+
+def opt_palatal(match):
+    a, b, c = match.group(1), match.group(2), match.group(3)
+    if not a:
+        return a + b + "ʲ" + c
+    else:
+        return a + b + "⁽ʲ⁾" + c
+
+def cons_palatal(match):
+    a, b, c = match.group(1), match.group(2), match.group(3)
+    if a+c in cons_assim_palatal["compulsory"].keys():
+        return a + "ʲ" + b + c
+    elif a+c in cons_assim_palatal["optional"].keys():
+        return a + "⁽ʲ⁾" + b + c
+    else:
+        return a + b + c
+
+palatal_assim_subs = Cascade([
+    ("⁀jɪ", "⁀(j)ɪ"),
+    ("([" + ipa_vow + "])jɪ", r"\1(j)ɪ"),
+    ("([rl]?)([ː()ˈˌ]*[dtsz])([ː()ˈˌ]*nʲ)", opt_palatal),
+    ("([rl]?)([ˈˌ]?[sz])([ː()ˈˌ]*[td]ʲ)", opt_palatal),
+])
+cons_palatal_rule = Rule("([szntdpbmfcĵx])([ː()ˈˌ]*)([szntdpbmfcĵlk]ʲ)", cons_palatal)
+labial_palatal_subs = Cascade([
+    ("n([ː()ˈˌ]*)([čǰɕӂ])", r"nʲ\1\2"),
+    ("⁀([ː()ˈˌ]*[fv])([ː()ˈˌ]*[pb]ʲ)", r"⁀\1⁽ʲ⁾\2"),
+    ("b([ː()ˈˌ]*vʲ)", r"b⁽ʲ⁾\1"),
+])
+obv_re = re.compile("⁀o" + accents + "?bv")
+obv_rule = Rule("⁀([ː()ˈˌ]*[ɐəo][ː()ˈˌ]*)b⁽ʲ⁾([ː()ˈˌ]*vʲ)", r"⁀\1b\2")
+final_lsja_re = re.compile("ls[äạ]⁀")
+final_lsja_rule = Rule("lsʲə⁀", "ls⁽ʲ⁾ə⁀")
+
+soft_cons_rule = Rule("([čǰɕӂj])", r"\1ʲ")
+def front(match):
+    return match.group(1) + fronting[match.group(2)] + match.group(3)
+fronting_rule = Rule("(ʲ[ː()]*)([auʊ])([ˈˌ]?.ʲ)", front)
+fronting_opt_j_rule = Rule("(ʲ[ː()]*)([auʊ])([ˈˌ]?\(jʲ\))", front)
+opt_soft_rule = Rule("(ʲ[ː()]*)([auʊ])([ˈˌ]?.)⁽ʲ⁾")
+final_subs = Cascade([
+    ("([čǰɕӂj])ʲ", r"\1"),
+    ("[cĵ]ʲ", lambda x: translit_conv_j[x.group()]),
+    (
+        "[cčgĉĝĵǰšžɕӂ]",
+        lambda x: translit_conv[x.group()] if x.group() in translit_conv.keys() else x.group()
+    ),
+    ("ə([‿⁀]*)[ɐə]", r"ɐ\1ɐ"),
+    ("[⁀_]", ""),
+])
+
+
 # Return the actual IPA corresponding to Cyrillic text. ADJ, GEN, BRACKET
 # and POS are as in [[Template:ru-IPA]]. If IS_TRANFORMED is true, the text
 # has already been passed through m_ru_translit.apply_tr_fixes(); otherwise,
@@ -636,9 +861,71 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
     >>> ru_IPA
     "ɕːɪs⁽ʲ⁾ˈlʲivɨj"
     """
-    origtext, transformed_text = ru_translit.apply_tr_fixes(text)
-    text = transformed_text
+    args = parse_args(gem, bracket, pos)
+    if args is None:
+        return ""
+    return convert(text, adj, *args)
+
+
+def to_IPA_many(texts, **options):
+    """Generates Russian IPA from many spellings.
+
+    Spellings repeated with the same options are converted once, and
+    ``gem``, ``bracket`` and ``pos`` are parsed once for each distinct
+    combination. Spellings are converted in batches by
+    :func:`convert_batch`, applying each cascade of substitutions once
+    per batch.
+
+    Parameters
+    ----------
+    texts : iterable
+        Iterable of ru-IPA text strings, or of ``(text, options)`` tuples
+        with dict of keyword arguments of :func:`to_IPA` for the text.
 
+    **options
+        Keyword arguments of :func:`to_IPA` for all texts.
+
+    Yields
+    ------
+    string
+        Converted Russian IPA of each text, in order.
+    """
+    parsed = {}
+    def parse_item(text, adj="", gem="", bracket="", pos=""):
+        key = (gem, bracket, pos)
+        if key not in parsed:
+            parsed[key] = parse_args(gem, bracket, pos)
+        args = parsed[key]
+        return None if args is None else (text, adj) + args
+    def convert_chunk(items):
+        items = [parse_item(text, **item_options)
+                 for text, item_options in items]
+        valid = [item for item in items if item is not None]
+        results = iter(convert_batch(valid))
+        return ["" if item is None else next(results) for item in items]
+    return convert_batches(convert_chunk, texts, options)
+
+
+def parse_args(gem="", bracket="", pos=""):
+    """Parse gem, bracket and pos arguments of ``{{ru-IPA}}``.
+
+    Parameters
+    ----------
+    gem : string
+        String of ``|gem=`` parameter, multipart if separated by "/".
+
+    bracket : string
+        String of ``|bracket=`` parameter.
+
+    pos : string
+        String of ``|pos=`` parameter, multipart if separated by "/".
+
+    Returns
+    -------
+    tuple
+        Tuple of gem, bracket and pos, gem and pos are lists if
+        multipart; None if gem or pos is not recognized.
+    """
     if not gem:
         gem = ""
     # If a multipart gemination spec, split into components.
@@ -653,7 +940,7 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
     # Verify that gem (or each part of multipart gem) is recognized
     for g in (gem if isinstance(gem, list) else [gem]):
         if g != "" and g != "y" and g != "o" and g != "n":
-            return ""
+            return None
 
     bracket = ine(bracket[0] if bracket else bracket)
     if bracket == "n":
@@ -671,7 +958,149 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
     # Verify that pos (or each part of multipart pos) is recognized
     for p in (pos if isinstance(pos, list) else [pos]):
         if p not in pos_properties.keys():
-            return ""
+            return None
+
+    return gem, bracket, pos
+
+
+def convert(text, adj, gem, bracket, pos):
+    """Convert Russian spelling to IPA, with arguments parsed by
+    :func:`parse_args`."""
+    return convert_batch([(text, adj, gem, bracket, pos)])[0]
+
+
+def convert_batch(items):
+    """Convert many Russian spellings to IPA.
+
+    Conversion alternates between steps processing each text word by word
+    and cascades of substitutions over the whole text. Each cascade is
+    applied once to all texts joined by newlines, see
+    :func:`~pywiktionary.IPA.rules.map_joined`: after transliteration a
+    text has no newline and begins and ends with ``⁀``, so no rule matches
+    across texts.
+
+    Parameters
+    ----------
+    items : list
+        List of ``(text, adj, gem, bracket, pos)`` tuples, with gem,
+        bracket and pos parsed by :func:`parse_args`.
+
+    Returns
+    -------
+    list
+        List of converted Russian IPA of each item, "" if multipart gem
+        or pos does not match the words of text.
+    """
+    results = [""] * len(items)
+    states, texts = [], []
+    for i, (text, adj, gem, bracket, pos) in enumerate(items):
+        # multipart specs are modified when words are joined
+        if isinstance(gem, list):
+            gem = list(gem)
+        if isinstance(pos, list):
+            pos = list(pos)
+        text = prepare(text, gem, pos)
+        if text is None:
+            continue
+        # save original word spelling before respellings, (de)voicing
+        # changes, geminate changes, etc. for implementation of
+        # geminate_pref
+        states.append((i, adj, gem, bracket, pos, text.split(" ")))
+        texts.append(text)
+
+    # insert or remove /j/ before [aou] so that palatal versions of these
+    # vowels are always preceded by /j/ and non-palatal versions never are
+    # (do this before the change below adding tertiary stress to final
+    # palatal о):
+    # (1) Non-palatal [ou] after always-hard шж (e.g. in брошю́ра, жю́ри)
+    #     despite the spelling (FIXME, should this also affect [a]?)
+    # (2) Palatal [aou] after always-soft щчӂ and voiced variant ǰ (NOTE:
+    #     this happens before the change šč -> ɕː in phonetic_subs)
+    # (3) ьо is pronounced as ьйо, i.e. like (possibly unstressed) ьё, e.g.
+    #     in Асунсьо́н
+
+    # add tertiary stress to some final -о (this needs to be done before
+    # eliminating dot-above, after adding ⁀, after adding /j/ before palatal о):
+    # (1) after vowels, e.g. То́кио
+    # (2) when palatal, e.g. ра́нчо, га́учо, ма́чо, Ога́йо
+
+    # eliminate dot-above, which has served its purpose of preventing any
+    # sort of stress (needs to be done after adding tertiary stress to
+    # final -о)
+    # eliminate dot-below (needs to be done after changes above that insert
+    # j before [aou] after always-soft щчӂ)
+    texts = map_joined(palatal_vowel_subs, texts)
+    marked = [
+        (state, mark_endings(text, state[1], state[4]))
+        for state, text in zip(states, texts)
+    ]
+    states = [state for state, text in marked if text is not None]
+    texts = [text for _, text in marked if text is not None]
+
+    texts = map_joined(assimilate, texts)
+
+    texts = [
+        word_prons(text, orig_word, gem, pos)
+        for (_, _, gem, _, pos, orig_word), text in zip(states, texts)
+    ]
+    texts = [
+        "[" + text + "]" if bracket else text
+        for (_, _, _, bracket, _, _), text in zip(states, texts)
+    ]
+
+    # Front a and u between soft consonants. If between a soft and
+    # optionally soft consonant (should only occur in that order, shouldn't
+    # ever have a or u preceded by optionally soft consonant),
+    # split the result into two. We only split into two even if there
+    # happen to be multiple optionally fronted a's and u's to avoid
+    # excessive numbers of possibilities (and it simplifies the code).
+    # 1.-3. soft consonants, see front_vowels()
+    texts = map_joined(front_vowels, texts)
+    # 4. Handle case of [au] between soft and optionally soft consonant
+    for j, text in enumerate(texts):
+        if opt_soft_rule.search(text):
+            opt_hard = opt_soft_rule(text, r"\1\2\3")
+            opt_soft = opt_soft_rule(
+                text,
+                lambda x: x.group(1) + fronting[x.group(2)] + x.group(3) + "ʲ"
+            )
+            texts[j] = opt_hard + ", " + opt_soft
+    # 5. Undo addition of soft symbol to inherently soft consonants.
+    # then convert special symbols to IPA;
+    # assimilation involving hiatus of ɐ and ə;
+    # eliminate ⁀ symbol at word boundaries;
+    # eliminate _ symbol that prevents assimilations
+    texts = map_joined(final_subs, texts)
+
+    for state, text in zip(states, texts):
+        results[state[0]] = text
+    return results
+
+
+def prepare(text, gem, pos):
+    """Transliterate Russian spelling and mark stress and word junctures.
+
+    Parameters
+    ----------
+    text : string
+        String of ru-IPA text.
+
+    gem : string or list
+        Gemination spec parsed by :func:`parse_args`, modified in place
+        if multipart.
+
+    pos : string or list
+        Part of speech parsed by :func:`parse_args`, modified in place
+        if multipart.
+
+    Returns
+    -------
+    string
+        String of transliterated text with ``⁀`` at word boundaries, None
+        if multipart gem or pos does not match number of words.
+    """
+    origtext, transformed_text = ru_translit.apply_tr_fixes(text)
+    text = transformed_text
 
     text = text.lower()
 
@@ -696,22 +1125,12 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
 #    if re.search(DUBGR, text):
 #        track("dubgr")
 
-    text = re.sub("``", DUBGR, text)
-    text = re.sub("`", GR, text)
-    text = re.sub("@", DOTABOVE, text)
-    text = re.sub("\^", CFLEX, text)
-    text = re.sub(DUBGR, CFLEX, text)
-
+    # canonicalize accent marks;
     # translit doesn't always convert э to ɛ (depends on whether a consonant
-    # precedes), so do it ourselves before translit
-    text = re.sub("э", "ɛ", text)
+    # precedes), so do it ourselves before translit;
     # vowel + йе should have double jj, but the translit module will translit
     # it the same as vowel + е, so do it ourselves before translit
-    text = re.sub(
-        "([" + com.vowel + "]" + com.opt_accent + ")й([еѐ])",
-        r"\1йй\2",
-        text
-    )
+    text = accent_subs(text)
     # transliterate and decompose Latin vowels with accents, recomposing
     # certain key combinations; don't include accent on monosyllabic ё, so
     # that we end up without an accent on such words. NOTE: Not clear we
@@ -720,17 +1139,11 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
     # undocumented).
     text = com.decompose(ru_translit.tr_after_fixes(text))
 
-    # handle old ě (e.g. сѣдло́), and ě̈ from сѣ̈дла
-    text = re.sub("ě̈", "jo" + AC, text)
-    text = re.sub("ě", "e", text)
-    # handle sequences of accents (esp from ё with secondary/tertiary stress)
-    text = re.sub(accents + "+(" + accents + ")", r"\1", text)
-
-    # convert commas and en/en dashes to IPA foot boundaries
-    text = re.sub("\s*[,–—]\s*", " | ", text)
-
+    # handle old ě (e.g. сѣдло́), and ě̈ from сѣ̈дла;
+    # handle sequences of accents (esp from ё with secondary/tertiary stress);
+    # convert commas and en/en dashes to IPA foot boundaries;
     # canonicalize multiple spaces
-    text = re.sub("\s+", " ", text)
+    text = translit_subs(text)
 
     # Add primary stress to single-syllable words preceded or followed by
     # unstressed particle or preposition. Add "tertiary" stress to remaining
@@ -747,7 +1160,7 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
     # spelled letters о and а, which should not be reduced); and (3) we
     # recognize hyphens for the purpose of marking unstressed prefixes and
     # suffixes.
-    word = re.split("([ \-]+)", text)
+    word = word_sep.split(text)
     for i in range(len(word)):
         # check for single-syllable words that need a stress; they must meet
         # the following conditions:
@@ -764,9 +1177,9 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
                 #     (and not followed by a hyphen, see 1c);
                 i > 1 and word[i] in accentless["posthyphen"].keys() and word[i-1] == "-" and (i+1 >= len(word) or word[i+1] != "-")) and ( \
         # 2. must be one syllable;
-            len(re.sub("[^" + vow + "]", "", word[i])) == 1) and ( \
+            len(non_vowel_rule(word[i])) == 1) and ( \
         # 3. must not have any accents (including dot-above, forcing reduction);
-            not re.search(accents, word[i])) and ( \
+            not accents_re.search(word[i])) and ( \
         # 4. must not be a prefix or suffix, identified by a preceding or trailing hyphen, i.e. one of the following:
         #         4a. utterance-initial preceded by a hyphen, or
             not (i == 2 and word[1] == "-" and word[0] == "" or \
@@ -784,10 +1197,10 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
                 i > 1 and word[i-1] == " " and word[i-2] in accentless["prespace"].keys() or \
                 i < len(word) - 2 and word[i+2] in accentless["post"].keys() and word[i+3] != "-" or \
                 i < len(word) - 2 and word[i+1] == "-" and word[i+2] in accentless["posthyphen"].keys() and word[i+3] != "-"):
-                word[i] = re.sub(vowels_c, r"\1" + AC, word[i])
+                word[i] = primary_stress_rule(word[i])
         # 2. else add tertiary stress
             else:
-                word[i] = re.sub(vowels_c, r"\1" + CFLEX, word[i])
+                word[i] = tertiary_stress_rule(word[i])
 
     # count number of words and make sure we have correct number of
     # gemination and part-of-speech specs if a multipart spec is given
@@ -796,9 +1209,9 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
         if i % 2 == 0 and word[i] != "":
             num_real_words += 1
     if isinstance(gem, list) and len(gem) != num_real_words:
-        return ""
+        return None
     if isinstance(pos, list) and len(pos) != num_real_words:
-        return ""
+        return None
 
     # make unaccented prepositions and particles liaise with the following or
     # preceding word; in the process, fix up number of elements in gem/pos
@@ -828,81 +1241,65 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
                 del pos[real_word_index-2]
 
     # rejoin words, convert hyphens to spaces and eliminate stray spaces
-    # resulting from this
-    text = "".join(word)
-    text = re.sub("[\-\s]+", " ", text)
-    text = re.sub("^ ", "", text)
-    text = re.sub(" $", "", text)
-
+    # resulting from this;
     # add a ⁀ at the beginning and end of every word and at close juncture
     # boundaries; we will remove this later but it makes it easier to do
     # word-beginning and word-end re.subs
-    text = re.sub(" ", "⁀ ⁀", text)
-    text = re.sub("([!?])", r"⁀\1⁀", text)
+    text = juncture_subs("".join(word))
     text = "⁀" + text + "⁀"
-    text = re.sub("‿", "⁀‿⁀", text)
+    text = tie_rule(text)
+    return text
 
-    # save original word spelling before respellings, (de)voicing changes,
-    # geminate changes, etc. for implementation of geminate_pref
-    orig_word = text.split(" ")
 
-    # insert or remove /j/ before [aou] so that palatal versions of these
-    # vowels are always preceded by /j/ and non-palatal versions never are
-    # (do this before the change below adding tertiary stress to final
-    # palatal о):
-    # (1) Non-palatal [ou] after always-hard шж (e.g. in брошю́ра, жю́ри)
-    #     despite the spelling (FIXME, should this also affect [a]?)
-    text = re.sub("([šž])j([ou])", r"\2\3", text)
-    # (2) Palatal [aou] after always-soft щчӂ and voiced variant ǰ (NOTE:
-    #     this happens before the change šč -> ɕː in phonetic_subs)
-    text = re.sub("([čǰӂ])([aou])", r"\1j\2", text)
-    # (3) ьо is pronounced as ьйо, i.e. like (possibly unstressed) ьё, e.g.
-    #     in Асунсьо́н
-    text = re.sub("ʹo", "ʹjo", text)
+def fetch_pos_property(pos, i, ending):
+    """Fetch property of ending for part of speech of i-th word."""
+    thispos = pos[i] if isinstance(pos, list) else pos
+    chart = pos_properties[thispos]
+    while isinstance(chart, str): # handle aliases
+        chart = pos_properties[chart]
+    assert(isinstance(chart, dict))
+    if ending in chart.keys():
+        sub = chart[ending]
+    else:
+        sub = pos_properties["def"][ending]
+    assert(sub)
+    return sub
 
-    # add tertiary stress to some final -о (this needs to be done before
-    # eliminating dot-above, after adding ⁀, after adding /j/ before palatal о):
-    # (1) after vowels, e.g. То́кио
-    text = re.sub("(" + vowels + accents + "?o)⁀", r"\1" + CFLEX + "⁀", text)
-    # (2) when palatal, e.g. ра́нчо, га́учо, ма́чо, Ога́йо
-    text = re.sub("jo⁀", "jo" + CFLEX + "⁀", text)
 
-    # eliminate dot-above, which has served its purpose of preventing any
-    # sort of stress (needs to be done after adding tertiary stress to
-    # final -о)
-    text = re.sub(DOTABOVE, "", text)
-    # eliminate dot-below (needs to be done after changes above that insert
-    # j before [aou] after always-soft щчӂ)
-    text = re.sub("ja" + DOTBELOW, "jạ", text)
-    if re.search(DOTBELOW, text):
-        return ""
+def mark_endings(text, adj, pos):
+    """Respell adjectival and reflexive endings of transliterated text.
+
+    Parameters
+    ----------
+    text : string
+        String of text returned by :func:`prepare`, with palatal vowels
+        marked.
+
+    adj : string
+        String of ``|noadj=`` parameter.
+
+    pos : string or list
+        Part of speech parsed by :func:`parse_args`.
+
+    Returns
+    -------
+    string
+        String of respelled text, None if a dot-below remains.
+    """
+    if DOTBELOW in text:
+        return None
 
     if adj:
-        text = re.sub("(.[aoe]́?)go(" + AC + "?)⁀", r"\1vo\2⁀", text)
-        text = re.sub("(.[aoe]́?)go(" + AC + "?)sja⁀", r"\1vo\2sja⁀", text)
-
-    def fetch_pos_property(i, ending):
-        thispos = pos[i] if isinstance(pos, list) else pos
-        chart = pos_properties[thispos]
-        while isinstance(chart, str): # handle aliases
-            chart = pos_properties[chart]
-        assert(isinstance(chart, dict))
-        if ending in chart.keys():
-            sub = chart[ending]
-        else:
-            sub = pos_properties["def"][ending]
-        assert(sub)
-        return sub
+        text = adj_subs(text)
 
     # Pos-specific handling of final -ться: palatalized if pos=imp, else not
     # (infinitives). If we have multiple parts of speech, we need to be
     # trickier, splitting by word.
     def final_tsja_processing(pron, i):
-        tsjapal = fetch_pos_property(i, "tsjapal")
+        tsjapal = fetch_pos_property(pos, i, "tsjapal")
         if tsjapal == "n":
             # FIXME!!! Should these also pay attention to grave accents?
-            pron = re.sub("́tʹ?sja⁀", "́cca⁀", pron)
-            pron = re.sub("([^́])tʹ?sja⁀", r"\1ca⁀", pron)
+            pron = tsja_subs(pron)
         return pron
     if isinstance(pos, list):
         # split by word and process each word
@@ -912,56 +1309,54 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
         text = " ".join(word)
     else:
         text = final_tsja_processing(text, 0)
+    return text
 
+
+def assimilate(text):
+    """Apply phonetic substitutions, voicing assimilation and gemination
+    to the whole text."""
     # phonetic substitutions of various sorts
-    for phonsub in phonetic_subs:
-        text = re.sub(phonsub[0], phonsub[1], text)
+    text = phonetic_subs(text)
 
     #voicing, devoicing
     #NOTE: v before an obstruent assimilates in voicing and triggers voicing
     #assimilation of a preceding consonant; neither happens before a sonorant
     #1. absolutely final devoicing
-    text = re.sub(
-        "([bdgvɣzžĝĵǰӂ])(ʹ?⁀)$",
-        lambda x: devoicing[x.group(1)] + x.group(2),
-        text
-    )
     #2. word-final devoicing before another word
-    text = re.sub(
-        "([bdgvɣzžĝĵǰӂ])(ʹ?⁀ ⁀[^bdgɣzžĝĵǰӂ])",
-        lambda x: devoicing[x.group(1)] + x.group(2),
-        text
-    )
+    text = final_devoicing_subs(text)
     #3. voicing/devoicing assimilation; repeat to handle recursive assimilation
-    while True:
-        new_text = re.sub(
-            "([bdgvɣzžĝĵǰӂ])([ ‿⁀ʹːˑ()/]*[ptkfxsščɕcĉ])",
-            lambda x: devoicing[x.group(1)] + x.group(2),
-            text
-        )
-        new_text = re.sub(
-            "([ptkfxsščɕcĉ])([ ‿⁀ʹːˑ()/]*v?[ ‿⁀ʹːˑ()/]*[bdgɣzžĝĵǰӂ])",
-            lambda x: voicing[x.group(1)] + x.group(2),
-            new_text
-        )
-        if new_text == text:
-            break
-        text = new_text
+    text = fixed_point(voicing_assim_subs, text)
 
     #re-notate orthographic geminate consonants
-    text = re.sub("([^" + vow + ".\-_])" + r"\1", r"\1ː", text)
-    text = re.sub("([^" + vow + ".\-_])" + r"\(\1\)", r"\1(ː)", text)
-
     #rewrite iotated vowels
-    text = re.sub(
-        "(j[\(ːˑ\)]*)([aeou])",
-        lambda x: x.group(1) + iotating[x.group(2)],
-        text
-    )
     # eliminate j after consonant and before iotated vowel (including
     # semi-reduced ạ)
-    text = re.sub("([^" + vow + acc + "ʹʺ‿⁀ ]/?)j([äạëöü])", r"\1\2", text)
+    return geminate_iotation_subs(text)
+
+
+def word_prons(text, orig_word, gem, pos):
+    """Convert text to IPA word by word.
 
+    Parameters
+    ----------
+    text : string
+        String of text returned by :func:`assimilate`.
+
+    orig_word : list
+        List of words of text returned by :func:`prepare`.
+
+    gem : string or list
+        Gemination spec parsed by :func:`parse_args`.
+
+    pos : string or list
+        Part of speech parsed by :func:`parse_args`.
+
+    Returns
+    -------
+    string
+        String of IPA of words joined by spaces, before fronting and
+        conversion of special symbols.
+    """
     #split by word and process each word
     word = text.split(" ")
 
@@ -974,16 +1369,16 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
         # certain sequences at the beginning of a word, but make sure that
         # the original spelling is appropriate as well (see comment above
         # for geminate_pref).
-        if re.search("ː", pron):
+        if "ː" in pron:
             orig_pron = orig_word[i]
-            deac = re.sub(accents, "", pron)
-            orig_deac = re.sub(accents, "", orig_pron)
-            for newspell, oldspell in geminate_pref:
+            deac = remove_accents_rule(pron)
+            orig_deac = remove_accents_rule(orig_pron)
+            for new_re, old_re, ne_new_re, ne_old_re in geminate_pref_res:
                 # FIXME! The re.sub below will be incorrect if there is
                 # gemination in a joined preposition or particle
-                if re.search("⁀" + oldspell, orig_deac) and re.search("⁀" + newspell, deac) or \
-                    re.search("⁀ne" + oldspell, orig_deac) and re.search("⁀ne" + newspell, deac):
-                    pron = re.sub("(⁀[^‿⁀ː]*)ː", r"\1ˑ", pron)
+                if old_re.search(orig_deac) and new_re.search(deac) or \
+                    ne_old_re.search(orig_deac) and ne_new_re.search(deac):
+                    pron = prefix_gem_rule(pron)
 
         #degemination, optional gemination
         thisgem = gem[i] if isinstance(gem, list) else gem
@@ -991,17 +1386,17 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
             # leave geminates alone, convert ˑ to regular gemination; ˑ is a
             # special gemination symbol used at prefix boundaries that we
             # remove only when gem=n, else we convert it to regular gemination
-            pron = re.sub("ˑ", "ː", pron)
+            pron = keep_gem_rule(pron)
         elif thisgem == "o":
             # make geminates optional, except for ɕӂ, also ignore left paren
             # in (ː) sequence
-            pron = re.sub("([^ɕӂ\(\)])[ːˑ]", r"\1(ː)", pron)
+            pron = opt_gem_rule(pron)
         elif thisgem == "n":
             # remove gemination, except for ɕӂ
-            pron = re.sub("([^ɕӂ\(\)])[ːˑ]", r"\1", pron)
+            pron = no_gem_rule(pron)
         else:
             # degeminate l's
-            pron = re.sub("(l)ː", r"\1", pron)
+            pron = degem_l_rule(pron)
             # preserve gemination between vowels immediately after the stress,
             # special gemination symbol ˑ also remains, ɕӂ remain geminated,
             # žn remain geminated between vowels even not immediately after
@@ -1012,44 +1407,33 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
             # then removing remaining ː not after ɕӂ and left paren; do
             # various subs repeatedly in case of multiple geminations in a word
             # 1. immediately after the stress
-            pron = sub_repeatedly("(" + vowels + stress_accents + "[^ɕӂ\(\)])ː(" + vowels + ")", r"\1ˑ\2", pron)
+            pron = fixed_point(gem_after_stress_rule, pron)
             # 2. remaining geminate n after the stress between vowels
-            pron = sub_repeatedly("(" + stress_accents + ".*?" + vowels + accents + "?n)ː(" + vowels + ")", r"\1(ː)\2", pron)
+            pron = fixed_point(gem_n_after_stress_rule, pron)
             # 3. remaining ž and n between vowels
-            pron = sub_repeatedly("(" + vowels + accents + "?[žn])ː(" + vowels + ")", r"\1ˑ\2", pron)
+            pron = fixed_point(gem_zn_rule, pron)
             # 4. ssk (and zsk, already normalized) immediately after the stress
-            pron = re.sub("(" + vowels + stress_accents + "[^" + vow + "]*s)ː(k)", r"\1ˑ\2", pron)
             # 5. eliminate remaining gemination, except for ɕː and ӂː
-            pron = re.sub("([^ɕӂ\(\)])ː", r"\1", pron)
             # 6. convert special gemination symbol ˑ to regular gemination
-            pron = re.sub("ˑ", "ː", pron)
+            pron = degem_subs(pron)
 
         # handle soft and hard signs, assimilative palatalization
         # 1. insert j before i when required
-        pron = re.sub("ʹi", "ʹji", pron)
         # 2. insert glottal stop after hard sign if required
-        pron = re.sub("ʺ([aɛiouy])", r"ʔ\1", pron)
         # 3. (ь) indicating optional palatalization
-        pron = re.sub("\(ʹ\)", "⁽ʲ⁾", pron)
         # 4. assimilative palatalization of consonants when followed by
         #    front vowels or soft sign
-        pron = re.sub("([mnpbtdkgfvszxɣrl])([ː()]*[eiäạëöüʹ])", r"\1ʲ\2", pron)
-        pron = re.sub("([cĵ])([ː()]*[äạöüʹ])", r"\1ʲ\2", pron)
         # 5. remove hard and soft signs
-        pron = re.sub("[ʹʺ]", "", pron)
-
-        # reduction of unstressed word-final -я, -е; but special-case
+        # then reduction of unstressed word-final -я, -е; but special-case
         # unstressed не, же. Final -я always becomes [ə]; final -е may
         # become [ə], [e], [ɪ] or [ɨ] depending on the part of speech and
         # the preceding consonants/vowels.
-        pron = re.sub("[äạ]⁀", "ə⁀", pron)
-        pron = re.sub("⁀nʲe⁀", "⁀nʲi⁀", pron)
-        pron = re.sub("⁀že⁀", "⁀žy⁀", pron)
+        pron = soft_sign_subs(pron)
         # function to fetch the appropriate value for ending and part of
         # speech, handling aliases and defaults and converting 'e' to 'ê'
         # so that the unstressed [e] sound is preserved
         def fetch_e_sub(ending):
-            sub = fetch_pos_property(i, ending)
+            sub = fetch_pos_property(pos, i, ending)
             if sub == "e":
                 # add TEMPCFLEX (which will be converted to CFLEX) to preserve
                 # the unstressed [e] sound, which will otherwise be converted
@@ -1074,9 +1458,9 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
             ch, mod = match.group(1), match.group(2)
             if ch == "j":
                 ty = "je"
-            elif re.search("[cĵšžĉĝ]", ch):
+            elif ch in "cĵšžĉĝ":
                 ty = "hardsib"
-            elif re.search("[čǰɕӂ]", ch):
+            elif ch in "čǰɕӂ":
                 ty = "softsib"
             else:
                 ty = "softpaired"
@@ -1084,94 +1468,54 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
         if new_final_e_code:
             # handle substitutions in two parts, one for vowel+j+e sequences
             # and the other for cons+e sequences
-            pron = re.sub(vowels_c + "(" + accents + "?j)ë⁀", repl1, pron)
+            pron = final_je_rule(pron, repl1)
             # consonant may palatalized, geminated or optional-geminated
-            pron = re.sub("(.)(ʲ?[ː()]*)[eë]⁀", repl2, pron)
+            pron = final_e_rule(pron, repl2)
             if final_e_non_pausal:
                 # final [e] should become [ɪ] when not followed by pause or
                 # end of utterance (in other words, followed by space plus
                 # anything but a pause symbol, or followed by tie bar).
-                pron = re.sub("e" + TEMPCFLEX + "⁀‿", "i⁀‿", pron)
+                pron = final_e_tie_rule(pron)
                 if i < len(word) - 1 and word[i+1] != "⁀|⁀":
-                    pron = re.sub("e" + TEMPCFLEX + "⁀$", "i⁀", pron)
+                    pron = final_e_end_rule(pron)
             # now convert TEMPCFLEX to CFLEX; we use TEMPCFLEX so the previous
             # two regexps won"t affect cases where the user explicitly wrote
             # a circumflex
-            pron = re.sub(TEMPCFLEX, CFLEX, pron)
+            pron = tempcflex_rule(pron)
         else:
             # Do the old way, which mostly converts final -е to schwa, but
             # has highly broken retraction code for vowel + [шжц] + е (but
             # not with accent on vowel!) before it that causes final -е in
             # this circumstance to become [ɨ], and a special hack for кое-.
-            pron = re.sub(vowels_c + "([cĵšžĉĝ][ː()]*)[eë]", r"\1\2ɛ", pron)
-            pron = re.sub("⁀ko(" + stress_accents + ")jë⁀", r"⁀ko\1ji⁀", pron)
-            pron = re.sub("[eë]⁀", "ə⁀", pron)
+            pron = old_final_e_subs(pron)
 
         # retraction of е and и after цшж
-        pron = re.sub(
-            "([cĵšžĉĝ][ː()]*)([ei])",
-            lambda x: x.group(1) + retracting[x.group(2)],
-            pron
-        )
+        pron = retraction_rule(pron)
 
         #syllabify, inserting @ at syllable boundaries
         #1. insert @ after each vowel
-        pron = re.sub("(" + vowels + accents + "?)", r"\1@", pron)
         #2. eliminate word-final @
-        pron = re.sub("@+⁀$", "⁀", pron)
         #3. move @ forward directly before any ‿⁀, as long as at least
         #   one consonant follows that; we will move it across ‿⁀ later
-        pron = re.sub(
-            "@([^@" + vow + acc + "]*)([‿⁀]+[^‿⁀@" + vow + acc + "])",
-            r"\1@\2",
-            pron
-        )
         #4. in a consonant cluster, move @ forward so it"s before the
         #   last consonant
-        pron = re.sub(
-            "@([^‿⁀@" + vow + acc + "]*)([^‿⁀@" + vow + acc + "ːˑ()ʲ]ʲ?[ːˑ()]*‿?[" + vow + acc + "])",
-            r"\1@\2",
-            pron
-        )
         #5. move @ backward if in the middle of a "permanent onset" cluster,
         #   e.g. sk, str, that comes before a vowel, putting the @ before
         #   the permanent onset cluster
-        def repl3(match):
-            a, aund, b, bund, c, d = \
-                match.group(1), match.group(2), match.group(3), match.group(4), match.group(5), match.group(6)
-            if a+b+c in perm_syl_onset.keys() or c == "j" and re.search("[čǰɕӂʲ]", b):
-                return "@" + a + aund + b + bund + c + d
-            elif b+c in perm_syl_onset.keys():
-                return a + aund + "@" + b + bund + c + d
-            return match.group()
-        pron = re.sub(
-            "([^‿⁀@_" + vow + acc + "]?)(_*)([^‿⁀@_" + vow + acc + "])(_*)@([^‿⁀@" + vow + acc + "ːˑ()ʲ])(ʲ?[ːˑ()]*[‿⁀]*[" + vow + acc + "])",
-            repl3,
-            pron
-        )
-        def repl4(match):
-            x = match.group()
-            if "/" in x:
-                x = re.sub("@", "", x)
-                x = re.sub("/", "@", x)
-            return x
+        pron = syllabify_subs(pron)
         #6. if / is present (explicit syllable boundary), remove any @
         #   (automatic boundary) and convert / to @
         if "/" in pron:
-            pron = re.sub("[^" + vow + acc + "]+", repl4, pron)
+            pron = explicit_boundary_rule(pron)
         #7. remove @ followed by a final consonant cluster
-        pron = re.sub("@([^‿⁀@" + vow + "]+⁀)$", r"\1", pron)
         #8. remove @ preceded by an initial consonant cluster (should only
         #   happen when / is inserted by user or in цз, чж sequences)
-        pron = re.sub("^(⁀[^‿⁀@" + vow + "]+)@", r"\1", pron)
         #9. make sure @ isn"t directly before linking ‿⁀
-        pron = re.sub("@([‿⁀]+)", r"\1@", pron)
-
-        # handle word-initial unstressed o and a; note, vowels always
+        # then handle word-initial unstressed o and a; note, vowels always
         # followed by at least one char because of word-final ⁀
         # do after syllabification because syllabification doesn't know
         # about ɐ as a vowel
-        pron = re.sub("^⁀[ao]([^" + acc + "])", r"⁀ɐ\1", pron)
+        pron = syllable_edge_subs(pron)
 
         #split by syllable
         syllable = pron.split("@")
@@ -1180,9 +1524,9 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
         #(acute, grave, circumflex)
         stress = {}
         for j in range(len(syllable)):
-            if re.search(stress_accents, syllable[j]):
+            if stress_accents_re.search(syllable[j]):
                 stress[j] = "real"
-            elif re.search(CFLEX, syllable[j]):
+            elif CFLEX in syllable[j]:
                 stress[j] = "cflex"
             else:
                 stress[j] = ""
@@ -1198,126 +1542,55 @@ def to_IPA(text, adj="", gem="", bracket="", pos=""):
                 # convert acute/grave/circumflex accent to appropriate
                 # IPA marker of primary/secondary/unmarked stress
                 alnum = 0
-                syl = re.sub("(.*)́", r"ˈ\1", syl)
-                syl = re.sub("(.*)̀", r"ˌ\1", syl)
-                syl = re.sub(CFLEX, "", syl)
+                syl = stress_mark_subs(syl)
             elif j+1 < len(syllable) and stress[j+1] == "real":
                 # special-casing written а immediately before the stress,
                 # but only for primary/secondary stress, not circumflex
                 alnum = 1
             else:
                 alnum = 2
-            syl = re.sub(
-                vowels_c,
-                lambda x: allophones[x.group(1)][alnum] if x.group(1) != "" else x.group(),
-                syl
+            syl = allophone_rule(
+                syl,
+                lambda x: allophones[x.group(1)][alnum] if x.group(1) != "" else x.group()
             )
             syl_conv.append(syl)
 
         pron = "".join(syl_conv)
 
         # Optional (j) before ɪ, which is always unstressed
-        pron = re.sub("⁀jɪ", "⁀(j)ɪ", pron)
-        pron = re.sub("([" + ipa_vow + "])jɪ", r"\1(j)ɪ", pron)
-
-        def repl5(match):
-            a, b, c = match.group(1), match.group(2), match.group(3)
-            if not a:
-                return a + b + "ʲ" + c
-            else:
-                return a + b + "⁽ʲ⁾" + c
         #consonant assimilative palatalization of tn/dn/sn/zn, depending on
         #whether [rl] precedes
-        pron = re.sub("([rl]?)([ː()ˈˌ]*[dtsz])([ː()ˈˌ]*nʲ)", repl5, pron)
-
         #consonant assimilative palatalization of st/zd, depending on
         #whether [rl] precedes
-        pron = re.sub("([rl]?)([ˈˌ]?[sz])([ː()ˈˌ]*[td]ʲ)", repl5, pron)
-
-        def repl6(match):
-            a, b, c = match.group(1), match.group(2), match.group(3)
-            if a+c in cons_assim_palatal["compulsory"].keys():
-                return a + "ʲ" + b + c
-            elif a+c in cons_assim_palatal["optional"].keys():
-                return a + "⁽ʲ⁾" + b + c
-            else:
-                return a + b + c
+        pron = palatal_assim_subs(pron)
+
         #general consonant assimilative palatalization
-        pron = sub_repeatedly(
-            "([szntdpbmfcĵx])([ː()ˈˌ]*)([szntdpbmfcĵlk]ʲ)",
-            repl6,
-            pron
-        )
+        pron = fixed_point(cons_palatal_rule, pron)
 
         # further assimilation before alveolopalatals
-        pron = re.sub("n([ː()ˈˌ]*)([čǰɕӂ])", r"nʲ\1\2", pron)
-
         # optional palatal assimilation of вп, вб only word-initially
-        pron = re.sub("⁀([ː()ˈˌ]*[fv])([ː()ˈˌ]*[pb]ʲ)", r"⁀\1⁽ʲ⁾\2", pron)
-
         # optional palatal assimilation of бв but not in обв-
-        pron = re.sub("b([ː()ˈˌ]*vʲ)", r"b⁽ʲ⁾\1", pron)
-        if re.search("⁀o" + accents + "?bv", word[i]):
+        pron = labial_palatal_subs(pron)
+        if obv_re.search(word[i]):
             # ə in case of a word with a preceding preposition
-            pron = re.sub("⁀([ː()ˈˌ]*[ɐəo][ː()ˈˌ]*)b⁽ʲ⁾([ː()ˈˌ]*vʲ)", r"⁀\1b\2", pron)
+            pron = obv_rule(pron)
 
         # Word-final -лся (normally in past verb forms) should have optional
         # palatalization. Need to rewrite as -лсьа to defeat this.
         # FIXME: Should we move this to phonetic_subs?
-        if re.search("ls[äạ]⁀", word[i]):
-            pron = re.sub("lsʲə⁀", "ls⁽ʲ⁾ə⁀", pron)
+        if final_lsja_re.search(word[i]):
+            pron = final_lsja_rule(pron)
 
         word[i] = pron
 
-    text = " ".join(word)
-    if bracket:
-        text = "[" + text + "]"
+    return " ".join(word)
 
-    # Front a and u between soft consonants. If between a soft and
-    # optionally soft consonant (should only occur in that order, shouldn't
-    # ever have a or u preceded by optionally soft consonant),
-    # split the result into two. We only split into two even if there
-    # happen to be multiple optionally fronted a's and u's to avoid
-    # excessive numbers of possibilities (and it simplifies the code).
+
+def front_vowels(text):
+    """Front a and u between soft consonants of the whole text."""
     # 1. First, temporarily add soft symbol to inherently soft consonants.
-    text = re.sub("([čǰɕӂj])", r"\1ʲ", text)
+    text = soft_cons_rule(text)
     # 2. Handle case of [au] between two soft consonants
-    text = sub_repeatedly(
-        "(ʲ[ː()]*)([auʊ])([ˈˌ]?.ʲ)",
-        lambda x: x.group(1) + fronting[x.group(2)] + x.group(3),
-        text
-    )
+    text = fixed_point(fronting_rule, text)
     # 3. Handle [au] between soft consonant and optional j, which is still fronted
-    text = sub_repeatedly(
-        "(ʲ[ː()]*)([auʊ])([ˈˌ]?\(jʲ\))",
-        lambda x: x.group(1) + fronting[x.group(2)] + x.group(3),
-        text
-    )
-    # 4. Handle case of [au] between soft and optionally soft consonant
-    if re.search("ʲ[ː()]*[auʊ][ˈˌ]?.⁽ʲ⁾", text):
-        opt_hard = re.sub("(ʲ[ː()]*)([auʊ])([ˈˌ]?.)⁽ʲ⁾", r"\1\2\3", text)
-        opt_soft = re.sub(
-            "(ʲ[ː()]*)([auʊ])([ˈˌ]?.)⁽ʲ⁾",
-            lambda x: x.group(1) + fronting[x.group(2)] + x.group(3) + "ʲ",
-            text
-        )
-        text = opt_hard + ", " + opt_soft
-    # 5. Undo addition of soft symbol to inherently soft consonants.
-    text = re.sub("([čǰɕӂj])ʲ", r"\1", text)
-
-    # convert special symbols to IPA
-    text = re.sub("[cĵ]ʲ", lambda x: translit_conv_j[x.group()], text)
-    text = re.sub(
-        "[cčgĉĝĵǰšžɕӂ]",
-        lambda x: translit_conv[x.group()] if x.group() in translit_conv.keys() else x.group(),
-        text
-    )
-
-    # Assimilation involving hiatus of ɐ and ə
-    text = re.sub("ə([‿⁀]*)[ɐə]", r"ɐ\1ɐ", text)
-
-    # eliminate ⁀ symbol at word boundaries
-    # eliminate _ symbol that prevents assimilations
-    text = re.sub("[⁀_]", "", text)
-
-    return text
+    return fixed_point(fronting_opt_j_rule, text)
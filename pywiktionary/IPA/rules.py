@@ -0,0 +1,285 @@
+"""Precompiled rewrite rules used by IPA conversion modules.
+
+Conversion modules apply long cascades of regular expression
+substitutions to every word. Building the pattern strings and looking
+them up in the cache of ``regex`` module on each call costs more than the
+substitutions themselves, and a single module has more patterns than the
+cache holds. A :class:`Rule` compiles its pattern once, at import of the
+module defining it, a :class:`Cascade` applies rules in order, and
+:func:`fixed_point` applies rules repeatedly until the text is stable.
+:func:`map_joined` applies them to many texts at once.
+
+Rewriting can be limited in time by :func:`set_deadline`, e.g. per page
+parsed; rules then raise ``TimeoutError`` when the deadline is passed,
+also from inside a stalled regular expression.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import regex as re
+
+
+# Maximum number of passes of fixed-point rewriting
+MAX_PASSES = 1000
+
+# Deadline of rewriting in each thread, see set_deadline(); rules look it
+# up in local.__dict__, which is per thread and faster than getattr with
+# a default when no deadline is set
+local = threading.local()
+
+
+def set_deadline(deadline):
+    """Set deadline of rewriting in current thread.
+
+    Parameters
+    ----------
+    deadline : float
+        Time in seconds since the epoch, as returned by ``time.time()``,
+        None for no deadline.
+
+    Returns
+    -------
+    float
+        Previous deadline, None if not set.
+    """
+    previous = local.__dict__.get("deadline")
+    local.deadline = deadline
+    return previous
+
+
+def time_left():
+    """Get seconds left before deadline of current thread.
+
+    Returns
+    -------
+    float
+        Seconds left, None if no deadline is set.
+
+    Raises
+    ------
+    TimeoutError
+        If the deadline is passed.
+    """
+    deadline = local.__dict__.get("deadline")
+    if deadline is None:
+        return None
+    left = deadline - time.time()
+    if left <= 0:
+        raise TimeoutError("rewriting exceeds deadline")
+    return left
+
+
+class Rule(object):
+    """Substitution of a precompiled regular expression.
+
+    Parameters
+    ----------
+    pattern : string
+        String of regular expression.
+    repl : string or function
+        Replacement string, or function of match object. None if the
+        replacement is given when the rule is applied.
+    flags : int
+        Flags of regular expression, e.g. ``regex.REVERSE`` to match
+        from right to left.
+    count : int
+        Maximum number of substitutions, 0 for all matches.
+    """
+    __slots__ = ("pattern", "repl", "count")
+
+    def __init__(self, pattern, repl=None, flags=0, count=0):
+        self.pattern = re.compile(pattern, flags)
+        self.repl = repl
+        self.count = count
+
+    def __repr__(self):
+        return "Rule(%r, %r)" % (self.pattern.pattern, self.repl)
+
+    def __call__(self, text, repl=None):
+        """Apply substitution to text.
+
+        Parameters
+        ----------
+        text : string
+            String of text.
+        repl : string or function
+            Replacement overriding the one of rule, e.g. a function
+            depending on local state of the caller.
+
+        Returns
+        -------
+        string
+            String of text substituted.
+        """
+        if repl is None:
+            repl = self.repl
+        if local.__dict__.get("deadline") is None:
+            return self.pattern.sub(repl, text, self.count)
+        return self.pattern.sub(repl, text, self.count, timeout=time_left())
+
+    def subn(self, text):
+        """Apply substitution to text, counting substitutions.
+
+        Parameters
+        ----------
+        text : string
+            String of text.
+
+        Returns
+        -------
+        tuple
+            Tuple of substituted text and number of substitutions.
+        """
+        if local.__dict__.get("deadline") is None:
+            return self.pattern.subn(self.repl, text, self.count)
+        return self.pattern.subn(
+            self.repl, text, self.count, timeout=time_left()
+        )
+
+    def search(self, text):
+        """Search pattern of rule in text.
+
+        Parameters
+        ----------
+        text : string
+            String of text.
+
+        Returns
+        -------
+        match object
+            First match in text, None if not found.
+        """
+        if local.__dict__.get("deadline") is None:
+            return self.pattern.search(text)
+        return self.pattern.search(text, timeout=time_left())
+
+
+class Cascade(object):
+    """Ordered rules, each applied to the output of the previous one.
+
+    Parameters
+    ----------
+    rules : list
+        List of :class:`Rule` or ``(pattern, repl)`` tuples.
+    """
+    __slots__ = ("rules",)
+
+    def __init__(self, rules):
+        self.rules = tuple(
+            rule if isinstance(rule, Rule) else Rule(*rule)
+            for rule in rules
+        )
+
+    def __repr__(self):
+        return "Cascade(%r)" % (list(self.rules),)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __call__(self, text):
+        """Apply rules to text in order.
+
+        Parameters
+        ----------
+        text : string
+            String of text.
+
+        Returns
+        -------
+        string
+            String of text after all substitutions.
+        """
+        if local.__dict__.get("deadline") is not None:
+            for rule in self.rules:
+                text = rule.pattern.sub(rule.repl, text, rule.count,
+                                        timeout=time_left())
+            return text
+        for rule in self.rules:
+            text = rule.pattern.sub(rule.repl, text, rule.count)
+        return text
+
+
+def fixed_point(rules, text, max_passes=MAX_PASSES):
+    """Apply rules repeatedly until text no longer changes.
+
+    Each pass applies rules in order, like :class:`Cascade`. A pass in
+    which no rule matches ends the rewriting without comparing texts;
+    texts are compared only when rules matched, since a replacement
+    function may return the match unchanged. A rule processing matches
+    from right to left, one per pass, should be compiled with
+    ``regex.REVERSE`` and ``count=1`` instead of prefixing it with
+    ``^(.*)``, so that a pass scans only the text after the match.
+
+    Parameters
+    ----------
+    rules : Rule or iterable of Rule
+        Rule, or rules applied in order in each pass, e.g. a
+        :class:`Cascade`.
+    text : string
+        String of text.
+    max_passes : int
+        Maximum number of passes, after which text is returned as is.
+
+    Returns
+    -------
+    string
+        String of text after rewriting.
+    """
+    if isinstance(rules, Rule):
+        rules = (rules,)
+    timed = local.__dict__.get("deadline") is not None
+    for _ in range(max_passes):
+        before = text
+        total = 0
+        for rule in rules:
+            if timed:
+                text, count = rule.pattern.subn(rule.repl, text, rule.count,
+                                                timeout=time_left())
+            else:
+                text, count = rule.pattern.subn(rule.repl, text, rule.count)
+            total += count
+        if not total or text == before:
+            break
+    return text
+
+
+def map_joined(func, texts, sep="\n"):
+    """Apply a function of text to many texts in one call.
+
+    Texts are joined by ``sep`` into one buffer, so that each rule of
+    ``func`` scans all texts in one pass of the regular expression engine
+    instead of one call per text, and the result is split back by
+    ``sep``. This gives the same results as applying ``func`` to each text
+    only if no rule matches ``sep`` or anything across it, nor inserts or
+    removes it, e.g. rules anchored with ``$`` need ``regex.MULTILINE``
+    when ``sep`` is a newline. Rules with ``count`` limited would stop at
+    the first texts in buffer, so ``func`` should not apply them. Texts
+    containing ``sep`` are processed one by one.
+
+    Parameters
+    ----------
+    func : function
+        Function of text, e.g. a :class:`Cascade`.
+    texts : list
+        List of strings of text.
+    sep : string
+        Separator of texts in buffer.
+
+    Returns
+    -------
+    list
+        List of strings of texts after ``func`` applied, in order.
+    """
+    if len(texts) < 2 or any(sep in text for text in texts):
+        return [func(text) for text in texts]
+    results = func(sep.join(texts)).split(sep)
+    if len(results) != len(texts):
+        raise ValueError("separator %r changed by %r" % (sep, func))
+    return results
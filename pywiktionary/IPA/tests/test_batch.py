@@ -0,0 +1,126 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for batch.py and to_IPA_many of language modules.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from ..batch import convert_many, convert_batches
+from .. import fr_pron
+from .. import ru_pron
+from .. import hi_pron
+from .. import es_pron
+from .. import cmn_pron
+from . import test_fr_pron
+from . import test_ru_pron
+from . import test_hi_pron
+from . import test_es_pron
+from . import test_cmn_pron
+
+
+class TestBatch(unittest.TestCase):
+    """TestBatch class
+    """
+    def test_convert_many(self):
+        """Duplicates are converted once, results are yielded in order.
+        """
+        calls = []
+        def convert(text, sep="-"):
+            calls.append((text, sep))
+            return sep.join(text)
+        self.assertEqual(
+            list(convert_many(
+                convert,
+                iter(["ab", "ab", ("ab", {"sep": "."}), "cd"]),
+                {"sep": "+"},
+            )),
+            ["a+b", "a+b", "a.b", "c+d"],
+        )
+        self.assertEqual(calls, [("ab", "+"), ("ab", "."), ("cd", "+")])
+
+    def test_convert_batches(self):
+        """Distinct spellings not converted before are batched.
+        """
+        batches = []
+        def convert_batch(items):
+            batches.append(items)
+            return [options["sep"].join(text) for text, options in items]
+        self.assertEqual(
+            list(convert_batches(
+                convert_batch,
+                ["ab", "cd", "ab", ("ab", {"sep": "."}), "cd"],
+                {"sep": "+"},
+                size=2,
+            )),
+            ["a+b", "c+d", "a+b", "a.b", "c+d"],
+        )
+        self.assertEqual(batches, [
+            [("ab", {"sep": "+"}), ("cd", {"sep": "+"})],
+            [("ab", {"sep": "."})],
+        ])
+
+    def test_fr_to_IPA_many(self):
+        """Batch French conversion equals conversion one by one.
+        """
+        items = [
+            (args[0], {"pos": args[1]}) if len(args) > 1 else args[0]
+            for args, _ in test_fr_pron.TESTCASES
+        ]
+        self.assertEqual(
+            list(fr_pron.to_IPA_many(items + items)),
+            [ipa for _, ipa in test_fr_pron.TESTCASES] * 2,
+        )
+        self.assertEqual(
+            list(fr_pron.to_IPA_many(["portions"], pos="v")),
+            [fr_pron.to_IPA("portions", pos="v")],
+        )
+
+    def test_ru_to_IPA_many(self):
+        """Batch Russian conversion equals conversion one by one.
+        """
+        items = []
+        for args, _ in test_ru_pron.TESTCASES:
+            if len(args) > 1:
+                text, pos, gem = args
+                items.append((text, {"gem": gem, "pos": pos}))
+            else:
+                items.append(args[0])
+        self.assertEqual(
+            list(ru_pron.to_IPA_many(items + items)),
+            [ipa for _, ipa in test_ru_pron.TESTCASES] * 2,
+        )
+        # multipart pos is not modified between texts
+        texts = ["по́ небу", "по́ небу", "не́бо"]
+        self.assertEqual(
+            list(ru_pron.to_IPA_many(texts, pos="n/pre")),
+            [ru_pron.to_IPA(text, pos="n/pre") for text in texts],
+        )
+        self.assertEqual(list(ru_pron.to_IPA_many(["а"], gem="x")), [""])
+        # words assimilating across spaces, but not across texts
+        texts = ["от сада", "сад", "по́ небу", "-сад", "ра́нчо, с", "брат ждёт"]
+        self.assertEqual(
+            list(ru_pron.to_IPA_many(texts, bracket="y")),
+            [ru_pron.to_IPA(text, bracket="y") for text in texts],
+        )
+        self.assertEqual(ru_pron.convert_batch([]), [])
+
+    def test_to_IPA_many(self):
+        """Batch conversion of other languages equals one by one.
+        """
+        for module, tests in [
+                (hi_pron, test_hi_pron), (es_pron, test_es_pron),
+                (cmn_pron, test_cmn_pron)]:
+            texts = [case[0] for case in tests.TESTCASES]
+            self.assertEqual(
+                list(module.to_IPA_many(texts)),
+                [module.to_IPA(text) for text in texts],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for rules.py
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+import time
+
+import regex as re
+
+from ..rules import Rule, Cascade, fixed_point, map_joined, set_deadline
+
+
+class TestRules(unittest.TestCase):
+    """TestRules class
+    """
+    def test_rule(self):
+        """Test rule with fixed and overriding replacement.
+        """
+        rule = Rule("([aeiou])", r"\1\1")
+        self.assertEqual(rule("kat"), "kaat")
+        self.assertEqual(rule("kat", lambda x: x.group(1).upper()), "kAt")
+        self.assertTrue(rule.search("kat"))
+        self.assertIsNone(rule.search("kt"))
+
+    def test_cascade(self):
+        """Test rules applied in order.
+        """
+        cascade = Cascade([
+            ("a", "b"),
+            Rule("b", "c"),
+        ])
+        self.assertEqual(len(cascade), 2)
+        self.assertEqual(cascade("ab"), "cc")
+        self.assertEqual(
+            [rule.pattern.pattern for rule in cascade], ["a", "b"]
+        )
+
+    def test_fixed_point(self):
+        """Test rules applied until text no longer changes.
+        """
+        # each pass splits one more syllable of overlapping matches
+        self.assertEqual(
+            fixed_point(Rule("([aeiou])([aeiou])", r"\1.\2"), "aeiou"),
+            "a.e.i.o.u"
+        )
+        # right to left, one match per pass
+        rule = Rule("i([aeiou])", r"j\1", re.REVERSE, 1)
+        self.assertEqual(rule("iiia"), "iija")
+        self.assertEqual(fixed_point(rule, "iiia"), "jija")
+        self.assertEqual(
+            fixed_point(Rule("^(.*)i([aeiou])", r"\1j\2"), "iiia"),
+            "jija"
+        )
+        # rules in each pass, with replacement returning match unchanged
+        cascade = Cascade([
+            ("(a)", lambda x: x.group(1)),
+            ("ab", "a"),
+        ])
+        self.assertEqual(fixed_point(cascade, "abbb"), "a")
+        # stopped by maximum number of passes
+        self.assertEqual(fixed_point(Rule("a", "aa"), "a", 3), "aaaaaaaa")
+
+    def test_map_joined(self):
+        """Test rules applied to texts joined in one buffer.
+        """
+        cascade = Cascade([
+            Rule("d⁀$", "t⁀", re.MULTILINE),
+            ("a([ ⁀]*)a", r"a\1ː"),
+        ])
+        texts = ["⁀pad⁀", "⁀a⁀", "⁀a⁀ ⁀ad⁀", "⁀⁀"]
+        self.assertEqual(
+            map_joined(cascade, texts),
+            [cascade(text) for text in texts]
+        )
+        self.assertEqual(
+            map_joined(cascade, texts),
+            ["⁀pat⁀", "⁀a⁀", "⁀a⁀ ⁀ːt⁀", "⁀⁀"]
+        )
+        # texts containing separator processed one by one
+        self.assertEqual(map_joined(cascade, ["a\na", "aa"]), ["a\na", "aː"])
+        self.assertEqual(map_joined(cascade, []), [])
+        with self.assertRaises(ValueError):
+            map_joined(Rule("\n", ""), ["a", "b"])
+
+    def test_deadline(self):
+        """Test rewriting interrupted past deadline.
+        """
+        stalling = Rule("(a|aa)+c", "")
+        counting = Rule("[0-9]+", lambda x: str(int(x.group()) + 1))
+        try:
+            set_deadline(time.time() + 0.05)
+            with self.assertRaises(TimeoutError):
+                stalling("a" * 40)
+            set_deadline(time.time() + 0.05)
+            with self.assertRaises(TimeoutError):
+                fixed_point(counting, "0", 10 ** 9)
+            set_deadline(time.time() + 60)
+            self.assertEqual(Cascade([counting, counting])("1"), "3")
+        finally:
+            self.assertIsNotNone(set_deadline(None))
+        self.assertEqual(fixed_point(counting, "0", 3), "3")
+
+
+if __name__ == "__main__":
+    unittest.main()
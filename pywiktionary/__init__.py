@@ -8,7 +8,10 @@ to cmudict format. Support `IPA`_ and `X-SAMPA`_ format at present.
 """
 
 from .wiktionary import Wiktionary
-from .parser import Parser
+from .async_wiktionary import AsyncWiktionary
+from .parser import Parser, Budget
+from .results import PageResult, Pron, Status
+from .dump import DumpIndex
 from .IPA import IPA
 
 
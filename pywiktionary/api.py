@@ -0,0 +1,177 @@
+"""HTTP client for Wiktionary API with persistent connections.
+
+Requests are sent over HTTP/1.1 keep-alive connections which are kept in
+a pool and reused, instead of opening a new connection per request.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+import os
+import socket
+import threading
+try:
+    import httplib
+    from urllib import urlencode
+    from urlparse import urlsplit
+except ImportError:
+    import http.client as httplib
+    from urllib.parse import urlencode, urlsplit
+
+
+USER_AGENT = "wikt2pron (https://github.com/abuccts/wikt2pron)"
+
+
+class APIError(IOError):
+    """Error response from Wiktionary API.
+
+    Parameters
+    ----------
+    status : int
+        HTTP status code of response.
+    headers : dict
+        HTTP headers of response.
+    """
+    def __init__(self, status, headers):
+        super(APIError, self).__init__("HTTP Error %d" % status)
+        self.status = status
+        self.headers = headers
+
+
+class ConnectionPool(object):
+    """Pool of keep-alive HTTP connections.
+
+    Idle connections are kept per host, and are dropped when the pool is
+    pickled or inherited by a forked worker process.
+
+    Parameters
+    ----------
+    size : int
+        Maximum number of idle connections kept per host.
+    timeout : float
+        Seconds to wait for connecting and reading response.
+    """
+    def __init__(self, size=8, timeout=60.0):
+        self.size = size
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["idle"] = {}
+        state["lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def get_connection(self, scheme, netloc):
+        """Get an idle connection to host, or open a new one.
+
+        Parameters
+        ----------
+        scheme : string
+            String of URL scheme, ``http`` or ``https``.
+        netloc : string
+            String of host and port.
+
+        Returns
+        -------
+        HTTPConnection
+            Connection to host.
+        """
+        with self.lock:
+            if self.pid != os.getpid():
+                self.idle = {}
+                self.pid = os.getpid()
+            idle = self.idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        if scheme == "https":
+            return httplib.HTTPSConnection(netloc, timeout=self.timeout)
+        return httplib.HTTPConnection(netloc, timeout=self.timeout)
+
+    def put_connection(self, scheme, netloc, conn):
+        """Return connection to pool for reuse.
+
+        Parameters
+        ----------
+        scheme : string
+            String of URL scheme, ``http`` or ``https``.
+        netloc : string
+            String of host and port.
+        conn : HTTPConnection
+            Connection to host.
+        """
+        with self.lock:
+            idle = self.idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, url, param):
+        """Post parameters to URL.
+
+        A request on a reused connection which has been closed by server
+        is retried once on a new connection.
+
+        Parameters
+        ----------
+        url : string
+            String of API URL.
+        param : dict
+            Dict of request parameters.
+
+        Returns
+        -------
+        tuple
+            Tuple of response ``(status, headers, body)``.
+        """
+        parts = urlsplit(url)
+        body = urlencode(param).encode()
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "User-Agent": USER_AGENT,
+        }
+        for attempt in range(2):
+            conn = self.get_connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("POST", parts.path or "/", body, headers)
+                res = conn.getresponse()
+                data = res.read()
+            except (httplib.HTTPException, socket.error):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            if res.will_close:
+                conn.close()
+            else:
+                self.put_connection(parts.scheme, parts.netloc, conn)
+            return res.status, dict(res.getheaders()), data
+
+    def query(self, url, param):
+        """Post parameters to API URL and decode JSON response.
+
+        Parameters
+        ----------
+        url : string
+            String of API URL.
+        param : dict
+            Dict of request parameters.
+
+        Returns
+        -------
+        dict
+            Decoded JSON response.
+        """
+        status, headers, data = self.request(url, param)
+        if status != 200:
+            raise APIError(status, headers)
+        return json.loads(data.decode("utf-8"))
@@ -0,0 +1,393 @@
+"""Asynchronous client to look up IPA of many words through Wiktionary API.
+
+Requests are run concurrently in a thread pool over keep-alive connections
+of a :class:`~pywiktionary.api.ConnectionPool`, while pages are parsed one
+at a time in a separate thread, so the event loop is never blocked.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import asyncio
+import json
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from .api import APIError
+from .cache import normalize_template
+from .parser import PendingTemplate
+from .results import PageResult
+from .wiktionary import Wiktionary
+
+
+def get_retry_after(headers):
+    """Get seconds to wait from ``Retry-After`` header.
+
+    Parameters
+    ----------
+    headers : dict
+        HTTP headers of response.
+
+    Returns
+    -------
+    float
+        Seconds to wait, None if not given.
+    """
+    for name, value in headers.items():
+        if name.lower() == "retry-after":
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+class AsyncWiktionary(object):
+    """Asynchronous Wiktionary client for concurrent lookup and expansion.
+
+    Up to ``concurrency`` requests to Wiktionary API are run at a time.
+    Requests carry the ``maxlag`` parameter; when the API reports that
+    replication lag exceeds it, or responds with HTTP 429 or 503, the
+    request is retried after ``Retry-After`` seconds, or after an
+    exponential backoff starting from ``backoff`` seconds, at most
+    ``retries`` times.
+
+    Parameters
+    ----------
+    lang : string
+        String of language type.
+    XSAMPA : boolean
+        Option for IPA to X-SAMPA conversion.
+    cache : object
+        Cache of expanded templates, with ``get`` and ``set`` methods.
+    concurrency : int
+        Maximum number of concurrent requests.
+    timeout : float
+        Seconds to wait for response of Wiktionary API.
+    maxlag : int
+        Maximum replication lag in seconds accepted by requests, None to
+        disable.
+    retries : int
+        Maximum number of retries of a rate limited request.
+    backoff : float
+        Seconds to wait before the first retry.
+    pool : ConnectionPool
+        Pool of connections to Wiktionary API.
+    budget : Budget
+        Limits of work spent on a page, default is no limit.
+    compact : boolean
+        Option for returning ``PageResult`` records instead of dicts.
+
+    Examples
+    --------
+    >>> wikt = AsyncWiktionary(lang="English", concurrency=8)
+    >>> async def main(words):
+    ...     for future in wikt.lookup_many(words):
+    ...         word, pronunciation = await future
+    ...         print(word, pronunciation)
+    >>> asyncio.get_event_loop().run_until_complete(main(["present"]))
+    """
+    def __init__(self, lang=None, XSAMPA=False, cache=None, concurrency=8,
+                 timeout=60.0, maxlag=5, retries=5, backoff=1.0,
+                 pool=None, budget=None, compact=False):
+        self.wiktionary = Wiktionary(
+            lang=lang,
+            XSAMPA=XSAMPA,
+            cache=cache,
+            timeout=timeout,
+            pool=pool,
+            budget=budget,
+            compact=compact,
+        )
+        self.wiktionary.pool.size = concurrency
+        self.concurrency = concurrency
+        self.maxlag = maxlag
+        self.retries = retries
+        self.backoff = backoff
+        # semaphore of requests for each event loop running the client
+        self.semaphores = weakref.WeakKeyDictionary()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        # the parser keeps state of current page, so pages are parsed
+        # one at a time in a single thread
+        self.parser_executor = ThreadPoolExecutor(max_workers=1)
+
+    @property
+    def lang(self):
+        """Language of IPA to extract."""
+        return self.wiktionary.lang
+
+    @property
+    def parser(self):
+        """Parser of Wiktionary."""
+        return self.wiktionary.parser
+
+    def close(self):
+        """Shut down threads of client."""
+        self.executor.shutdown(wait=True)
+        self.parser_executor.shutdown(wait=True)
+
+    async def run_parser(self, func, *args):
+        """Run parser method in parser thread.
+
+        Parameters
+        ----------
+        func : function
+            Method of parser.
+        args : list
+            Arguments of method.
+
+        Returns
+        -------
+        object
+            Return value of method.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.parser_executor, func, *args)
+
+    async def query(self, api, param):
+        """Post parameters to Wiktionary API, retrying when rate limited.
+
+        Parameters
+        ----------
+        api : string
+            String of API URL.
+        param : dict
+            Dict of request parameters.
+
+        Returns
+        -------
+        dict
+            Decoded JSON response.
+        """
+        loop = asyncio.get_event_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            self.semaphores[loop] = semaphore
+        if self.maxlag is not None:
+            param = dict(param, maxlag=self.maxlag)
+        for attempt in range(self.retries + 1):
+            async with semaphore:
+                status, headers, data = await loop.run_in_executor(
+                    self.executor,
+                    self.wiktionary.pool.request,
+                    api,
+                    param,
+                )
+            if status == 200:
+                content = json.loads(data.decode("utf-8"))
+                if content.get("error", {}).get("code") != "maxlag":
+                    return content
+            elif status not in (429, 503):
+                raise APIError(status, headers)
+            if attempt == self.retries:
+                raise APIError(status, headers)
+            delay = get_retry_after(headers)
+            if delay is None:
+                delay = self.backoff * 2 ** attempt
+            await asyncio.sleep(delay)
+
+    async def request_expansion(self, text):
+        """Expand wiki text through Wiktionary API.
+
+        Parameters
+        ----------
+        text : string
+            String of wiki text with templates.
+
+        Returns
+        -------
+        string
+            String of expanded wiki text.
+        """
+        param = dict(self.parser.param, text=text.encode("utf-8"))
+        content = await self.query(self.parser.api, param)
+        return content["expandtemplates"]["wikitext"]
+
+    async def expand_batch(self, batch):
+        """Expand a batch of templates and cache results.
+
+        Parameters
+        ----------
+        batch : list of tuple
+            List of ``(key, text)`` of templates.
+
+        Returns
+        -------
+        dict
+            Dict of IPA lists, keyed by normalized template text.
+        """
+        texts = [text for _, text in batch]
+        html = await self.request_expansion(self.parser.join_templates(texts))
+        html_lst = self.parser.split_templates(html, len(texts))
+        if html_lst is None:
+            # separators were mangled, expand one by one instead
+            html_lst = await asyncio.gather(*[
+                self.request_expansion(text) for text in texts
+            ])
+        return await self.run_parser(
+            self.parser.cache_templates,
+            [key for key, _ in batch],
+            html_lst,
+        )
+
+    async def expand_templates(self, texts):
+        """Expand IPA Templates through Wiktionary API concurrently.
+
+        Templates not found in cache are expanded in batches of parser's
+        ``batch_size``, with batches requested concurrently.
+
+        Parameters
+        ----------
+        texts : list of string
+            List of template text inside "{{" and "}}".
+
+        Returns
+        -------
+        list of list of string
+            List of expanded IPA text for each template.
+        """
+        expanded = await self.expand_missing(texts)
+        return [list(expanded[normalize_template(text)]) for text in texts]
+
+    async def expand_missing(self, texts):
+        """Look up templates in cache, expanding missing ones concurrently.
+
+        Results are returned from the cache lookup and the API responses,
+        without reading the cache again, where they may have been evicted
+        in the meantime.
+
+        Parameters
+        ----------
+        texts : list of string
+            List of template text inside "{{" and "}}".
+
+        Returns
+        -------
+        dict
+            Dict of IPA lists, keyed by normalized template text.
+        """
+        expanded, missing = await self.run_parser(
+            self.parser.lookup_templates, texts
+        )
+        batch_size = self.parser.batch_size
+        for batch_expanded in await asyncio.gather(*[
+                self.expand_batch(missing[i:i + batch_size])
+                for i in range(0, len(missing), batch_size)]):
+            expanded.update(batch_expanded)
+        return expanded
+
+    async def parse(self, wiki_text, title=None):
+        """Parse wiki text, expanding templates concurrently.
+
+        Parameters
+        ----------
+        wiki_text : string
+            String of XML entry wiki text.
+        title: string
+            String of wiki entry title.
+
+        Returns
+        -------
+        dict
+            Dict of parsed IPA results, see :meth:`Parser.parse`.
+        """
+        parse_result = await self.run_parser(
+            self.parser.parse_pending,
+            wiki_text,
+            title,
+        )
+        pending = [
+            item.text for pronunciation in parse_result.values()
+            if isinstance(pronunciation, list)
+            for item in pronunciation if isinstance(item, PendingTemplate)
+        ]
+        expanded = await self.expand_missing(pending) if pending else {}
+        return await self.run_parser(
+            self.parser.resolve_page, parse_result, expanded
+        )
+
+    async def get_entry_pronunciation(self, wiki_text, title=None):
+        """Extraction IPA for entry in wiki text.
+
+        Parameters
+        ----------
+        wiki_text : string
+            String of XML entry wiki text.
+        title: string
+            String of wiki entry title.
+
+        Returns
+        -------
+        dict
+            Dict of word's IPA results.
+            Key: language name; Value: list of IPA text.
+        """
+        parse_result = await self.parse(wiki_text, title=title)
+        if self.lang:
+            return parse_result[self.lang]
+        return parse_result
+
+    async def lookup(self, word):
+        """Look up IPA of word through Wiktionary API.
+
+        Parameters
+        ----------
+        word : string
+            String of a word to be looked up.
+
+        Returns
+        -------
+        dict or PageResult
+            Dict of word's IPA results.
+            Key: language name; Value: list of IPA text.
+            Or :class:`~pywiktionary.results.PageResult` if ``compact``
+            is set.
+        """
+        param = dict(self.wiktionary.param, titles=word.encode("utf-8"))
+        content = await self.query(self.wiktionary.api, param)
+        try:
+            val = list(content["query"]["pages"].values())
+            wiki_text = val[0]["revisions"][0]["*"]
+        except (KeyError, IndexError):
+            return self.wiktionary.get_word_pronunciation(word, None)
+        if self.wiktionary.compact:
+            return PageResult.from_parse(
+                val[0].get("pageid"),
+                word,
+                await self.parse(wiki_text, title=word),
+            )
+        return await self.get_entry_pronunciation(wiki_text, title=word)
+
+    async def lookup_pair(self, word):
+        """Look up IPA of word, paired with the word.
+
+        Parameters
+        ----------
+        word : string
+            String of a word to be looked up.
+
+        Returns
+        -------
+        tuple
+            Tuple of word and its IPA results.
+        """
+        return word, await self.lookup(word)
+
+    def lookup_many(self, words):
+        """Look up IPA of many words concurrently.
+
+        Must be called in a running event loop.
+
+        Parameters
+        ----------
+        words : list of string
+            List of words to be looked up.
+
+        Returns
+        -------
+        iterator
+            Iterator of awaitables in the order they complete, each
+            resulting in a ``(word, pronunciation)`` tuple.
+        """
+        return asyncio.as_completed([self.lookup_pair(word) for word in words])
@@ -0,0 +1,232 @@
+"""Caches for results of template expansion through Wiktionary API.
+
+Expanding an IPA template costs a round trip to Wiktionary API, while the
+same templates occur over and over in a dump and across runs over it.
+:class:`Parser` looks up expanded templates in a cache before calling the
+API; any object with ``get`` and ``set`` methods can be used as a cache.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+import json
+import os
+import sqlite3
+
+import regex as re
+
+
+# Template name, up to the first "|" or the closing "}}"
+TEMPLATE_NAME_RE = re.compile(r"^\{\{\s*([^{}|]*?)\s*(?=\||\}\}$)")
+
+
+def normalize_template(text):
+    """Normalize template text to be used as cache key.
+
+    Only whitespace ignored by MediaWiki is removed, so that templates
+    expanded differently never share a key: whitespace around the text
+    and around the template name. Line breaks in arguments are kept.
+
+    Parameters
+    ----------
+    text : string
+        String of template text, including "{{" and "}}".
+
+    Returns
+    -------
+    string
+        Template text without spaces around it and its name.
+    """
+    return TEMPLATE_NAME_RE.sub(r"{{\1", text.strip())
+
+
+class MemoryCache(object):
+    """Least recently used cache in memory.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of cached items.
+    """
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.items = collections.OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default=None):
+        """Get cached value of key.
+
+        Parameters
+        ----------
+        key : string
+            String of cache key.
+        default : object
+            Value returned if key is not cached.
+
+        Returns
+        -------
+        object
+            Cached value.
+        """
+        if key not in self.items:
+            return default
+        value = self.items.pop(key)
+        self.items[key] = value
+        return value
+
+    def set(self, key, value):
+        """Cache value of key, evicting least recently used item if full.
+
+        Parameters
+        ----------
+        key : string
+            String of cache key.
+        value : object
+            Value to be cached.
+        """
+        self.items.pop(key, None)
+        self.items[key] = value
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached items."""
+        self.items.clear()
+
+
+class SQLiteCache(object):
+    """Cache stored in SQLite database, shared between processes and runs.
+
+    Values are stored as JSON, keyed by ``tag`` and key, so expansions of
+    different Wiktionary dumps or versions can be kept apart in one
+    database. Recently used values are also kept in a :class:`MemoryCache`.
+
+    Parameters
+    ----------
+    path : string
+        Path of SQLite database file.
+    tag : string
+        String of dump or version tag.
+    maxsize : int
+        Maximum number of items cached in memory.
+    timeout : float
+        Seconds to wait for database lock held by other processes.
+    autocommit : bool
+        Commit each value when set, otherwise values are committed by
+        :meth:`commit` or :meth:`close`, for caches set very often.
+    """
+    def __init__(self, path, tag="", maxsize=10000, timeout=30.0,
+                 autocommit=True):
+        self.path = path
+        self.tag = tag
+        self.timeout = timeout
+        self.autocommit = autocommit
+        self.memory = MemoryCache(maxsize=maxsize)
+        self.conn = None
+        self.pid = os.getpid()
+
+    def __getstate__(self):
+        # connections cannot be shared with worker processes,
+        # reconnect on first use instead
+        state = self.__dict__.copy()
+        state["conn"] = None
+        return state
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def connect(self):
+        """Connect to database, creating cache table if necessary.
+
+        Returns
+        -------
+        sqlite3.Connection
+            Connection to database.
+        """
+        if self.pid != os.getpid():
+            # workers forked by multiprocessing inherit the connection
+            # without pickling, which must not be used in the child
+            self.conn = None
+            self.pid = os.getpid()
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, timeout=self.timeout)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "tag TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (tag, key))"
+            )
+            self.conn.commit()
+        return self.conn
+
+    def get(self, key, default=None):
+        """Get cached value of key.
+
+        Parameters
+        ----------
+        key : string
+            String of cache key.
+        default : object
+            Value returned if key is not cached.
+
+        Returns
+        -------
+        object
+            Cached value.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        row = self.connect().execute(
+            "SELECT value FROM cache WHERE tag = ? AND key = ?",
+            (self.tag, key),
+        ).fetchone()
+        if row is None:
+            return default
+        value = json.loads(row[0])
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        """Cache value of key.
+
+        Parameters
+        ----------
+        key : string
+            String of cache key.
+        value : object
+            JSON serializable value to be cached.
+        """
+        self.memory.set(key, value)
+        conn = self.connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (tag, key, value) VALUES (?, ?, ?)",
+            (self.tag, key, json.dumps(value, ensure_ascii=False)),
+        )
+        if self.autocommit:
+            conn.commit()
+
+    def clear(self):
+        """Remove all cached items of tag."""
+        self.memory.clear()
+        conn = self.connect()
+        conn.execute("DELETE FROM cache WHERE tag = ?", (self.tag,))
+        conn.commit()
+
+    def commit(self):
+        """Commit values set to database."""
+        if self.conn is not None and self.pid == os.getpid():
+            self.conn.commit()
+
+    def close(self):
+        """Commit values set and close connection to database."""
+        if self.conn is not None and self.pid == os.getpid():
+            self.conn.commit()
+            self.conn.close()
+        self.conn = None
@@ -0,0 +1,584 @@
+"""Readers for Wiktionary XML dump, plain or bz2 compressed.
+
+Wiktionary publishes ``*-pages-articles-multistream.xml.bz2`` dumps
+which are concatenations of independent bz2 streams of about 100 pages
+each, together with a ``*-multistream-index.txt.bz2`` index file whose
+lines are in ``offset:page_id:title`` format, where ``offset`` is the
+byte offset of the stream holding the page. Each stream can therefore
+be read and decompressed on its own.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import bisect
+import bz2
+import io
+import os
+
+import mwxml
+
+
+PAGE_START = b"<page>"
+PAGE_END = b"</page>"
+FOOTER = b"</mediawiki>\n"
+
+
+def open_dump(dump_file):
+    """Open Wiktionary XML dump, decompressing bz2 dump on the fly.
+
+    Parameters
+    ----------
+    dump_file : string
+        Path of Wiktionary XML dump file, ``.xml`` or ``.xml.bz2``.
+
+    Returns
+    -------
+    file object
+        Binary file object of XML dump.
+    """
+    if dump_file.endswith(".bz2"):
+        return bz2.open(dump_file, "rb")
+    return open(dump_file, "rb")
+
+
+def filter_pages(data, contains):
+    """Drop pages without a byte string from XML fragment.
+
+    Parameters
+    ----------
+    data : bytes
+        XML fragment of ``<page>`` elements.
+    contains : bytes
+        Byte string to be found in raw XML of kept pages.
+
+    Returns
+    -------
+    bytes
+        XML fragment of kept pages, with text between pages unchanged.
+    """
+    kept = []
+    pos = 0
+    start = data.find(PAGE_START)
+    while start != -1:
+        end = data.find(PAGE_END, start)
+        if end == -1:
+            break
+        end += len(PAGE_END)
+        kept.append(data[pos:start])
+        if data.find(contains, start, end) != -1:
+            kept.append(data[start:end])
+        pos = end
+        start = data.find(PAGE_START, pos)
+    kept.append(data[pos:])
+    return b"".join(kept)
+
+
+class PageFilter(io.RawIOBase):
+    """Binary file object dropping pages without a byte string.
+
+    Pages are filtered on raw XML while reading, so dropped pages are
+    never parsed.
+
+    Parameters
+    ----------
+    f : file object
+        Binary file object of XML dump.
+    contains : bytes
+        Byte string to be found in raw XML of kept pages.
+    chunk_size : int
+        Number of bytes read from ``f`` at a time.
+    """
+    def __init__(self, f, contains, chunk_size=1 << 20):
+        super(PageFilter, self).__init__()
+        self.f = f
+        self.contains = contains
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.output = bytearray()
+        self.eof = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self.output and not self.eof:
+            self.fill()
+        if not self.output and self.buffer:
+            # truncated dump, pass remaining bytes through
+            self.output += self.buffer
+            del self.buffer[:]
+        size = min(len(b), len(self.output))
+        b[:size] = self.output[:size]
+        del self.output[:size]
+        return size
+
+    def fill(self):
+        """Read a chunk and move complete kept pages to output."""
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return
+        self.buffer += data
+        end = self.buffer.rfind(PAGE_END)
+        if end == -1:
+            if PAGE_START not in self.buffer:
+                # keep a possibly partial start tag
+                size = max(len(self.buffer) - len(PAGE_START), 0)
+                self.output += self.buffer[:size]
+                del self.buffer[:size]
+            return
+        end += len(PAGE_END)
+        self.output += filter_pages(bytes(self.buffer[:end]), self.contains)
+        del self.buffer[:end]
+
+
+def iter_pages(dump_file, contains=None, revision=False):
+    """Iterate main namespace pages in Wiktionary XML dump.
+
+    Parameters
+    ----------
+    dump_file : string
+        Path of Wiktionary XML dump file, ``.xml`` or ``.xml.bz2``.
+    contains : bytes
+        Byte string to be found in raw XML of pages, other pages are
+        skipped before parsing; default is keeping all pages.
+    revision : boolean
+        Whether include revision id and SHA-1 of text in pages.
+
+    Yields
+    ------
+    tuple
+        Tuple of page ``(id, title, text)``, or
+        ``(id, title, text, revision_id, sha1)`` with ``revision``.
+    """
+    with open_dump(dump_file) as f:
+        if contains is not None:
+            f = io.BufferedReader(PageFilter(f, contains))
+        for page in _iter_dump_pages(f, revision=revision):
+            yield page
+
+
+def _iter_dump_pages(f, revision=False):
+    """Iterate main namespace pages in XML dump file object."""
+    dump = mwxml.Dump.from_file(f)
+    for page in dump:
+        for each_revision in page:
+            if each_revision.page.namespace != 0:
+                continue
+            if revision:
+                yield (
+                    each_revision.page.id,
+                    each_revision.page.title,
+                    each_revision.text,
+                    each_revision.id,
+                    each_revision.sha1,
+                )
+            else:
+                yield (
+                    each_revision.page.id,
+                    each_revision.page.title,
+                    each_revision.text,
+                )
+
+
+def find_index_file(dump_file):
+    """Find multistream index file next to bz2 multistream dump.
+
+    Parameters
+    ----------
+    dump_file : string
+        Path of ``*-pages-articles-multistream.xml.bz2`` dump file.
+
+    Returns
+    -------
+    string
+        Path of ``*-pages-articles-multistream-index.txt.bz2`` index
+        file, or None if not found.
+    """
+    suffix = "-multistream.xml.bz2"
+    if not dump_file.endswith(suffix):
+        return None
+    index_file = dump_file[:-len(suffix)] + "-multistream-index.txt.bz2"
+    if not os.path.exists(index_file):
+        return None
+    return index_file
+
+
+def read_index(index_file):
+    """Read multistream index file.
+
+    Parameters
+    ----------
+    index_file : string
+        Path of multistream index file, ``.txt`` or ``.txt.bz2``.
+
+    Yields
+    ------
+    tuple
+        Tuple of ``(offset, page_id, title)``.
+    """
+    if index_file.endswith(".bz2"):
+        f = bz2.open(index_file, "rt", encoding="utf-8")
+    else:
+        f = io.open(index_file, "rt", encoding="utf-8")
+    with f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            offset, page_id, title = line.split(":", 2)
+            yield int(offset), int(page_id), title
+
+
+def stream_offsets(index_file):
+    """Get byte offsets of page streams from multistream index file.
+
+    Parameters
+    ----------
+    index_file : string
+        Path of multistream index file.
+
+    Returns
+    -------
+    list of int
+        Sorted list of distinct stream offsets.
+    """
+    return sorted(set(offset for offset, _, _ in read_index(index_file)))
+
+
+def read_stream(dump_file, start, end=None):
+    """Read and decompress bz2 streams in a byte range of dump.
+
+    Parameters
+    ----------
+    dump_file : string
+        Path of bz2 multistream dump file.
+    start : int
+        Byte offset of the first stream.
+    end : int
+        Byte offset after the last stream, default is end of file.
+
+    Returns
+    -------
+    bytes
+        Decompressed XML fragment.
+    """
+    with open(dump_file, "rb") as f:
+        f.seek(start)
+        data = f.read() if end is None else f.read(end - start)
+    return bz2.decompress(data)
+
+
+def read_header(dump_file):
+    """Read XML header of bz2 multistream dump.
+
+    The header holds the ``<mediawiki>`` root element and ``<siteinfo>``,
+    which are needed to parse pages of any stream.
+
+    Parameters
+    ----------
+    dump_file : string
+        Path of bz2 multistream dump file.
+
+    Returns
+    -------
+    bytes
+        XML text before the first ``<page>`` element.
+    """
+    decompressor = bz2.BZ2Decompressor()
+    header = b""
+    with open(dump_file, "rb") as f:
+        while not decompressor.eof:
+            data = f.read(65536)
+            if not data:
+                break
+            header += decompressor.decompress(data)
+            if PAGE_START in header:
+                break
+    index = header.find(PAGE_START)
+    if index != -1:
+        header = header[:index]
+    return header
+
+
+def parse_stream(header, data, contains=None, revision=False):
+    """Parse pages in a decompressed stream of multistream dump.
+
+    Parameters
+    ----------
+    header : bytes
+        XML header returned by :func:`read_header`.
+    data : bytes
+        Decompressed XML fragment returned by :func:`read_stream`.
+    contains : bytes
+        Byte string to be found in raw XML of pages, other pages are
+        skipped before parsing; default is keeping all pages.
+    revision : boolean
+        Whether include revision id and SHA-1 of text in pages.
+
+    Yields
+    ------
+    tuple
+        Tuple of page ``(id, title, text)``, or
+        ``(id, title, text, revision_id, sha1)`` with ``revision``.
+    """
+    if contains is not None:
+        data = filter_pages(data, contains)
+    start = data.find(PAGE_START)
+    end = data.rfind(PAGE_END)
+    if start == -1 or end == -1:
+        return
+    xml = header + data[start:end + len(PAGE_END)] + b"\n" + FOOTER
+    for page in _iter_dump_pages(io.BytesIO(xml), revision=revision):
+        yield page
+
+
+def find_stream(index_file, page_id):
+    """Find byte offset of the stream holding a page in multistream dump.
+
+    Parameters
+    ----------
+    index_file : string
+        Path of multistream index file.
+    page_id : int
+        Page id.
+
+    Returns
+    -------
+    int
+        Byte offset of stream, None if the page is not in index.
+    """
+    for offset, each_id, _ in read_index(index_file):
+        if each_id == page_id:
+            return offset
+    return None
+
+
+def skip_pages(pages, after):
+    """Skip pages up to and including the page of id ``after``.
+
+    Parameters
+    ----------
+    pages : iterable
+        Iterable of ``(id, title, text)`` pages.
+    after : int
+        Page id, None to skip nothing.
+
+    Yields
+    ------
+    tuple
+        Tuple of page ``(id, title, text)`` after the page.
+
+    Raises
+    ------
+    ValueError
+        If the page of id ``after`` is not in ``pages``.
+    """
+    pages = iter(pages)
+    if after is not None:
+        for page in pages:
+            if page[0] == after:
+                break
+        else:
+            raise ValueError("Page %s not in dump" % after)
+    for page in pages:
+        yield page
+
+
+def iter_streams(dump_file, index_file, start=0):
+    """Iterate byte ranges of page streams in multistream dump.
+
+    Parameters
+    ----------
+    dump_file : string
+        Path of bz2 multistream dump file.
+    index_file : string
+        Path of multistream index file.
+    start : int
+        Byte offset of the first stream, earlier streams are skipped.
+
+    Yields
+    ------
+    tuple
+        Tuple of stream ``(start, end)`` byte offsets, ``end`` is None
+        for the last stream.
+    """
+    offsets = stream_offsets(index_file)
+    offsets = offsets[bisect.bisect_left(offsets, start):]
+    for i, offset in enumerate(offsets):
+        end = offsets[i + 1] if i + 1 < len(offsets) else None
+        yield offset, end
+
+
+def iter_multistream_pages(dump_file, index_file, contains=None, start=0,
+                           revision=False):
+    """Iterate main namespace pages in multistream dump stream by stream.
+
+    Parameters
+    ----------
+    dump_file : string
+        Path of bz2 multistream dump file.
+    index_file : string
+        Path of multistream index file.
+    contains : bytes
+        Byte string to be found in raw XML of pages, other pages are
+        skipped before parsing; default is keeping all pages.
+    start : int
+        Byte offset of the first stream to read.
+    revision : boolean
+        Whether include revision id and SHA-1 of text in pages.
+
+    Yields
+    ------
+    tuple
+        Tuple of page ``(id, title, text)``, or
+        ``(id, title, text, revision_id, sha1)`` with ``revision``.
+    """
+    header = read_header(dump_file)
+    for offset, end in iter_streams(dump_file, index_file, start=start):
+        data = read_stream(dump_file, offset, end)
+        for page in parse_stream(header, data, contains=contains,
+                                 revision=revision):
+            yield page
+
+
+def find_page(data, page_id):
+    """Find XML of a page in decompressed stream of multistream dump.
+
+    Parameters
+    ----------
+    data : bytes
+        Decompressed XML fragment returned by :func:`read_stream`.
+    page_id : int
+        Page id to be found.
+
+    Returns
+    -------
+    bytes
+        XML of ``<page>`` element, or None if not found.
+    """
+    page_id_tag = b"<id>%d</id>" % page_id
+    start = data.find(PAGE_START)
+    while start != -1:
+        end = data.find(PAGE_END, start)
+        if end == -1:
+            return None
+        end += len(PAGE_END)
+        # page id is the first id in page, before revision and user ids
+        id_start = data.find(b"<id>", start, end)
+        if data.startswith(page_id_tag, id_start):
+            return data[start:end]
+        start = data.find(PAGE_START, end)
+    return None
+
+
+class DumpIndex(object):
+    """Random access to pages of bz2 multistream dump by title.
+
+    The multistream index maps each title to the offset of the bz2 stream
+    holding the page, so looking up a title only decompresses that stream
+    of about 100 pages instead of scanning the whole dump.
+
+    Parameters
+    ----------
+    dump_file : string
+        Path of bz2 multistream dump file.
+    index_file : string
+        Path of multistream index file, default is looked up next to
+        the dump.
+
+    Examples
+    --------
+    >>> index = DumpIndex("enwiktionary-latest-pages-articles-multistream.xml.bz2")
+    >>> wikt = Wiktionary(lang="English")
+    >>> wikt.lookup("dictionary", source=index)
+    [{'IPA': '/ˈdɪkʃ(ə)n(ə)ɹɪ/', 'lang': 'en'},
+     {'IPA': '/ˈdɪkʃənɛɹi/', 'lang': 'en'}]
+    """
+    def __init__(self, dump_file, index_file=None):
+        if index_file is None:
+            index_file = find_index_file(dump_file)
+        if index_file is None:
+            raise ValueError(
+                "Multistream index file not found for %s." % dump_file
+            )
+        self.dump_file = dump_file
+        self.index_file = index_file
+        self.titles = {}
+        offsets = set()
+        for offset, page_id, title in read_index(index_file):
+            self.titles[title] = (offset, page_id)
+            offsets.add(offset)
+        self.offsets = sorted(offsets)
+        self.header = None
+        # last decompressed stream, pages are often looked up in order
+        self.stream = (None, None)
+
+    def __contains__(self, title):
+        return title in self.titles
+
+    def __len__(self):
+        return len(self.titles)
+
+    def read_stream(self, offset):
+        """Read and decompress the stream at offset.
+
+        Parameters
+        ----------
+        offset : int
+            Byte offset of stream in dump.
+
+        Returns
+        -------
+        bytes
+            Decompressed XML fragment.
+        """
+        if self.stream[0] != offset:
+            i = bisect.bisect_right(self.offsets, offset)
+            end = self.offsets[i] if i < len(self.offsets) else None
+            self.stream = (offset, read_stream(self.dump_file, offset, end))
+        return self.stream[1]
+
+    def get_page(self, title):
+        """Get page of title from dump.
+
+        Parameters
+        ----------
+        title : string
+            String of page title.
+
+        Returns
+        -------
+        tuple
+            Tuple of page ``(id, title, text)``, or None if not found.
+        """
+        if title not in self.titles:
+            return None
+        offset, page_id = self.titles[title]
+        page = find_page(self.read_stream(offset), page_id)
+        if page is None:
+            return None
+        if self.header is None:
+            self.header = read_header(self.dump_file)
+        for entry in parse_stream(self.header, page):
+            return entry
+        return None
+
+    def get_text(self, title):
+        """Get wiki text of title from dump.
+
+        Parameters
+        ----------
+        title : string
+            String of page title.
+
+        Returns
+        -------
+        string
+            String of page wiki text, or None if not found.
+        """
+        page = self.get_page(title)
+        if page is None:
+            return None
+        return page[2]
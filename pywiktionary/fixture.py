@@ -0,0 +1,261 @@
+"""Record and replay responses of Wiktionary API.
+
+Responses of template expansion and lookup requests can be recorded to a
+fixture file by :class:`RecordingPool`, then replayed without network,
+either in-process by :class:`ReplayPool`, or by :class:`FixtureServer`, a
+local stand-in of Wiktionary API. The fixture file has one JSON record
+per line, and is gzip compressed if its name ends with ``.gz``.
+
+Examples
+--------
+>>> wikt = Wiktionary(pool=RecordingPool("fixture.jsonl.gz"))
+>>> wikt.lookup("present")
+>>> wikt = Wiktionary(pool=ReplayPool("fixture.jsonl.gz"))
+>>> wikt.lookup("present")
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import gzip
+import io
+import json
+import threading
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    from urllib import urlencode
+    from urlparse import parse_qsl
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlencode, parse_qsl
+
+from .api import ConnectionPool
+
+
+# Parameters which do not change response content
+IGNORED_PARAMS = ("maxlag",)
+
+
+def request_key(param):
+    """Get key of request to look up its recorded response.
+
+    Parameters
+    ----------
+    param : dict
+        Dict of request parameters.
+
+    Returns
+    -------
+    string
+        String of sorted and url encoded parameters.
+    """
+    items = []
+    for name, value in param.items():
+        if name in IGNORED_PARAMS:
+            continue
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        items.append((name, "%s" % value))
+    return urlencode(sorted(items))
+
+
+def open_fixture(path, mode):
+    """Open fixture file as text, gzip compressed if ends with ``.gz``.
+
+    Parameters
+    ----------
+    path : string
+        Path of fixture file.
+    mode : string
+        Mode of ``r``, ``w`` or ``a``.
+
+    Returns
+    -------
+    file
+        File object of fixture.
+    """
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="utf-8")
+    return io.open(path, mode, encoding="utf-8")
+
+
+def read_fixture(path):
+    """Read recorded responses from fixture file.
+
+    Parameters
+    ----------
+    path : string
+        Path of fixture file.
+
+    Returns
+    -------
+    dict
+        Dict of ``(status, body)`` of responses, keyed by request key.
+    """
+    responses = {}
+    with open_fixture(path, "r") as f:
+        for line in f:
+            record = json.loads(line)
+            responses[record["request"]] = (record["status"], record["body"])
+    return responses
+
+
+class RecordingPool(ConnectionPool):
+    """Connection pool which records successful responses to fixture file.
+
+    Records are appended, so a fixture can be recorded over several runs.
+
+    Parameters
+    ----------
+    path : string
+        Path of fixture file.
+    size : int
+        Maximum number of idle connections kept per host.
+    timeout : float
+        Seconds to wait for connecting and reading response.
+    """
+    def __init__(self, path, size=8, timeout=60.0):
+        super(RecordingPool, self).__init__(size=size, timeout=timeout)
+        self.path = path
+        self.recorded = set()
+
+    def request(self, url, param):
+        """Post parameters to URL, and record response.
+
+        Parameters
+        ----------
+        url : string
+            String of API URL.
+        param : dict
+            Dict of request parameters.
+
+        Returns
+        -------
+        tuple
+            Tuple of response ``(status, headers, body)``.
+        """
+        status, headers, data = super(RecordingPool, self).request(
+            url, param
+        )
+        key = request_key(param)
+        if status == 200 and key not in self.recorded:
+            record = json.dumps({
+                "request": key,
+                "status": status,
+                "body": data.decode("utf-8"),
+            }, ensure_ascii=False)
+            with self.lock:
+                self.recorded.add(key)
+                with open_fixture(self.path, "a") as f:
+                    f.write(record + "\n")
+        return status, headers, data
+
+
+class ReplayPool(ConnectionPool):
+    """Connection pool which replays responses from fixture file.
+
+    No request is sent to network.
+
+    Parameters
+    ----------
+    path : string
+        Path of fixture file.
+    """
+    def __init__(self, path):
+        super(ReplayPool, self).__init__()
+        self.path = path
+        self.responses = read_fixture(path)
+
+    def request(self, url, param):
+        """Replay recorded response of request.
+
+        Parameters
+        ----------
+        url : string
+            String of API URL, ignored.
+        param : dict
+            Dict of request parameters.
+
+        Returns
+        -------
+        tuple
+            Tuple of response ``(status, headers, body)``.
+
+        Raises
+        ------
+        KeyError
+            If the request is not recorded.
+        """
+        key = request_key(param)
+        if key not in self.responses:
+            raise KeyError("Request not recorded in %s: %s" % (self.path, key))
+        status, body = self.responses[key]
+        return status, {"Content-Type": "application/json"}, \
+            body.encode("utf-8")
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    """Handler of requests to :class:`FixtureServer`."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self): # pylint: disable=invalid-name
+        """Replay recorded response of posted parameters."""
+        length = int(self.headers["Content-Length"])
+        param = dict(parse_qsl(self.rfile.read(length).decode("utf-8")))
+        key = request_key(param)
+        if key in self.server.responses:
+            status, body = self.server.responses[key]
+        else:
+            status, body = 404, json.dumps({"error": {
+                "code": "notrecorded",
+                "info": "Request not recorded: %s" % key,
+            }})
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): # pylint: disable=arguments-differ
+        pass
+
+
+class FixtureServer(ThreadingMixIn, HTTPServer):
+    """Local stand-in of Wiktionary API replaying fixture file.
+
+    Point ``api`` of :class:`Wiktionary` and :class:`Parser` to
+    :attr:`api` of the server to replay responses over HTTP.
+
+    Parameters
+    ----------
+    path : string
+        Path of fixture file.
+    address : tuple
+        Tuple of host and port to listen on, default is a free port on
+        localhost.
+    """
+    daemon_threads = True
+
+    def __init__(self, path, address=("127.0.0.1", 0)):
+        HTTPServer.__init__(self, address, FixtureRequestHandler)
+        self.responses = read_fixture(path)
+        self.thread = None
+
+    @property
+    def api(self):
+        """URL of API served."""
+        return "http://%s:%d/w/api.php" % self.server_address[:2]
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop serving and close server."""
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,111 @@
+"""Handlers of pronunciation templates implemented locally.
+
+A handler is called with the :class:`~pywiktionary.templates.Arguments`
+of a template and the page title, and returns a list of IPA dicts in
+``{"IPA": "", "lang": ""}`` format. Handlers are registered by template
+name in :class:`Parser`, see :meth:`Parser.register_template`.
+
+Spellings are converted by the memoized converters of language modules,
+see :mod:`pywiktionary.memo`.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from .memo import converters
+
+
+def spellings(values, title):
+    """Drop empty template arguments, default to page title.
+
+    Parameters
+    ----------
+    values : list of string
+        List of argument values.
+    title : string
+        String of page title.
+
+    Returns
+    -------
+    list of string
+        List of non-empty values.
+    """
+    values = [value for value in values if value]
+    if not values and title:
+        values = [title]
+    return values
+
+
+def IPA_handler(args, title): # pylint: disable=unused-argument
+    """Handle ``{{IPA}}`` template, whose arguments are IPA already."""
+    lang = args.get("lang", "Unknown")
+    return [
+        {"IPA": each_ipa, "lang": lang}
+        for each_ipa in args.positional if each_ipa
+    ]
+
+
+def fr_IPA_handler(args, title):
+    """Handle ``{{fr-IPA}}`` template."""
+    pos = args.get("pos")
+    return [
+        {"IPA": converters["fr"](each_ipa, pos=pos), "lang": "fr"}
+        for each_ipa in spellings(args.positional, title)
+    ]
+
+
+def ru_IPA_handler(args, title):
+    """Handle ``{{ru-IPA}}`` template."""
+    # phonetic respelling is used as spelling
+    values = [
+        value for name, value in args.items
+        if name is None or name == "phon"
+    ]
+    return [
+        {
+            "IPA": converters["ru"](
+                each_ipa,
+                adj=args.get("noadj"),
+                gem=args.get("gem"),
+                bracket=args.get("bracket"),
+                pos=args.get("pos"),
+            ),
+            "lang": "ru",
+        } for each_ipa in spellings(values, title)
+    ]
+
+
+def hi_IPA_handler(args, title):
+    """Handle ``{{hi-IPA}}`` template."""
+    return [
+        {"IPA": converters["hi"](each_ipa), "lang": "hi"}
+        for each_ipa in spellings(args.positional, title)
+    ]
+
+
+def es_IPA_handler(args, title):
+    """Handle ``{{es-IPA}}`` template."""
+    return [
+        {"IPA": converters["es"](each_ipa), "lang": "es"}
+        for each_ipa in spellings(args.positional, title)
+    ]
+
+
+def zh_pron_handler(args, title): # pylint: disable=unused-argument
+    """Handle ``{{zh-pron}}`` template, Mandarin in ``m=`` only."""
+    return [
+        {"IPA": converters["cmn"](each_ipa), "lang": "zh"}
+        for each_ipa in args.get("m").split(",")
+        if each_ipa and "=" not in each_ipa
+    ]
+
+
+# Bundled handlers, registered in every Parser
+TEMPLATE_HANDLERS = {
+    "IPA": IPA_handler,
+    "fr-IPA": fr_IPA_handler,
+    "ru-IPA": ru_IPA_handler,
+    "hi-IPA": hi_IPA_handler,
+    "es-IPA": es_IPA_handler,
+    "zh-pron": zh_pron_handler,
+}
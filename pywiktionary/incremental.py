@@ -0,0 +1,271 @@
+"""Incremental IPA extraction from newer dumps.
+
+Results of pages are kept in a :class:`ResultStore` with the revision id
+and SHA-1 of the text they were extracted from. When a newer dump, or a
+daily adds-changes dump, is extracted into the store, only pages whose
+text changed are parsed again, and a changeset of pronunciations added
+and removed is returned, see :meth:`Wiktionary.update_IPA`.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+import json
+import sqlite3
+
+
+# Change of a pronunciation:
+# action, "added" or "removed";
+# page_id, id of page;
+# title, title of page;
+# language, language name;
+# ipa, IPA text;
+# lang, language code of template.
+Change = collections.namedtuple(
+    "Change", ["action", "page_id", "title", "language", "ipa", "lang"]
+)
+
+
+def iter_prons(entry, lang=None):
+    """Iterate pronunciations in extracted IPA result of a page.
+
+    Parameters
+    ----------
+    entry : dict
+        Result of a page in ``{"id": "", "title": "", "pronunciation": ""}``
+        format, or dict of :class:`~pywiktionary.results.PageResult`.
+    lang : string
+        String of language name, if ``pronunciation`` is a list of one
+        language.
+
+    Yields
+    ------
+    tuple
+        Tuple of ``(language, ipa, lang)``.
+    """
+    if entry is None:
+        return
+    if "pronunciations" in entry:
+        for language, prons in entry["pronunciations"].items():
+            for pron in prons:
+                yield language, pron["ipa"], pron["lang"]
+        return
+    pronunciation = entry["pronunciation"]
+    if isinstance(pronunciation, list):
+        pronunciation = {lang: pronunciation}
+    elif not isinstance(pronunciation, dict):
+        return
+    for language, prons in pronunciation.items():
+        if isinstance(prons, list):
+            for pron in prons:
+                yield language, pron["IPA"], pron["lang"]
+
+
+def diff_entries(page_id, title, old, new, lang=None):
+    """Compare pronunciations in results of a page.
+
+    Parameters
+    ----------
+    page_id : int
+        Id of page.
+    title : string
+        String of page title.
+    old : dict
+        Previous result of page, None if the page is new.
+    new : dict
+        Current result of page, None if the page is deleted.
+    lang : string
+        String of language name, see :func:`iter_prons`.
+
+    Returns
+    -------
+    list of Change
+        List of pronunciations removed, then added.
+    """
+    old_prons = list(collections.OrderedDict.fromkeys(iter_prons(old, lang)))
+    new_prons = list(collections.OrderedDict.fromkeys(iter_prons(new, lang)))
+    old_set = set(old_prons)
+    new_set = set(new_prons)
+    changes = [
+        Change("removed", page_id, title, *pron)
+        for pron in old_prons if pron not in new_set
+    ]
+    changes += [
+        Change("added", page_id, title, *pron)
+        for pron in new_prons if pron not in old_set
+    ]
+    return changes
+
+
+class ResultStore(object):
+    """Store of extracted IPA results of pages in SQLite database.
+
+    Parameters
+    ----------
+    path : string
+        Path of SQLite database file.
+    timeout : float
+        Seconds to wait for database lock held by other processes.
+    """
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self.conn = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["conn"] = None
+        return state
+
+    def __len__(self):
+        return self.connect().execute(
+            "SELECT COUNT(*) FROM pages"
+        ).fetchone()[0]
+
+    def connect(self):
+        """Connect to database, creating pages table if necessary.
+
+        Returns
+        -------
+        sqlite3.Connection
+            Connection to database.
+        """
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, timeout=self.timeout)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "page_id INTEGER PRIMARY KEY, title TEXT NOT NULL, "
+                "revision_id INTEGER, sha1 TEXT, result TEXT NOT NULL, "
+                "seen INTEGER NOT NULL DEFAULT 0)"
+            )
+            self.conn.commit()
+        return self.conn
+
+    def get_revision(self, page_id):
+        """Get revision of page which the result is extracted from.
+
+        Parameters
+        ----------
+        page_id : int
+            Id of page.
+
+        Returns
+        -------
+        tuple
+            Tuple of ``(revision_id, sha1)``, None if not stored.
+        """
+        row = self.connect().execute(
+            "SELECT revision_id, sha1 FROM pages WHERE page_id = ?",
+            (page_id,),
+        ).fetchone()
+        return None if row is None else tuple(row)
+
+    def get(self, page_id):
+        """Get result of page.
+
+        Parameters
+        ----------
+        page_id : int
+            Id of page.
+
+        Returns
+        -------
+        dict
+            Result of page, None if not stored.
+        """
+        row = self.connect().execute(
+            "SELECT result FROM pages WHERE page_id = ?", (page_id,),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, page_id, title, revision_id, sha1, result, seen=0):
+        """Store result of page.
+
+        Parameters
+        ----------
+        page_id : int
+            Id of page.
+        title : string
+            String of page title.
+        revision_id : int
+            Id of revision the result is extracted from.
+        sha1 : string
+            SHA-1 of revision text.
+        result : dict
+            JSON serializable result of page.
+        seen : int
+            Mark of the update which saw the page.
+        """
+        self.connect().execute(
+            "INSERT OR REPLACE INTO pages "
+            "(page_id, title, revision_id, sha1, result, seen) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (page_id, title, revision_id, sha1,
+             json.dumps(result, ensure_ascii=False), seen),
+        )
+
+    def mark_seen(self, page_id, revision_id, seen):
+        """Mark page as seen in an update, with unchanged text.
+
+        Parameters
+        ----------
+        page_id : int
+            Id of page.
+        revision_id : int
+            Id of revision, which may change while text does not.
+        seen : int
+            Mark of the update.
+        """
+        self.connect().execute(
+            "UPDATE pages SET revision_id = ?, seen = ? WHERE page_id = ?",
+            (revision_id, seen, page_id),
+        )
+
+    def next_mark(self):
+        """Get a mark for a new update, greater than all marks stored.
+
+        Returns
+        -------
+        int
+            Mark of update.
+        """
+        row = self.connect().execute("SELECT MAX(seen) FROM pages").fetchone()
+        return (row[0] or 0) + 1
+
+    def pop_unseen(self, seen):
+        """Remove pages not seen in an update.
+
+        Parameters
+        ----------
+        seen : int
+            Mark of the update.
+
+        Returns
+        -------
+        list of tuple
+            List of ``(page_id, title, result)`` of removed pages.
+        """
+        conn = self.connect()
+        rows = conn.execute(
+            "SELECT page_id, title, result FROM pages WHERE seen < ?",
+            (seen,),
+        ).fetchall()
+        conn.execute("DELETE FROM pages WHERE seen < ?", (seen,))
+        return [
+            (page_id, title, json.loads(result))
+            for page_id, title, result in rows
+        ]
+
+    def commit(self):
+        """Commit changes to database."""
+        if self.conn is not None:
+            self.conn.commit()
+
+    def close(self):
+        """Commit changes and close connection to database."""
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
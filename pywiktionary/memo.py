@@ -0,0 +1,169 @@
+"""Memoized IPA converters of language modules.
+
+The same spellings are converted again and again in a dump: ``{{fr-IPA}}``
+without arguments falls back to the page title, inflected forms share
+respellings, and common words recur across entries. The bundled template
+handlers convert spellings through the :class:`MemoizedConverter` of each
+language in :data:`converters`, which caches results keyed by language,
+text and options.
+
+Results are cached in memory by default, bounded per language. To keep
+them between runs, use a :class:`~pywiktionary.cache.SQLiteCache`, see
+:func:`set_cache`.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+import json
+
+from .cache import MemoryCache
+from .IPA import fr_pron
+from .IPA import ru_pron
+from .IPA import hi_pron
+from .IPA import es_pron
+from .IPA import cmn_pron
+
+
+# Default maximum number of results cached in memory per language
+MAXSIZE = 100000
+
+# Statistics of converter cache:
+# hits, number of results found in cache;
+# misses, number of results converted.
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses"])
+
+
+class MemoizedConverter(object):
+    """Converter from spelling to IPA with results cached.
+
+    Parameters
+    ----------
+    func : function
+        ``to_IPA`` function of language module.
+    name : string
+        String of language module name, part of cache keys.
+    cache : object
+        Cache with ``get`` and ``set`` methods, default is a
+        :class:`~pywiktionary.cache.MemoryCache` of ``maxsize`` results.
+    maxsize : int
+        Maximum number of results cached in memory.
+    """
+    def __init__(self, func, name, cache=None, maxsize=MAXSIZE):
+        self.func = func
+        self.name = name
+        self.maxsize = maxsize
+        self.cache = cache if cache is not None else MemoryCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return "MemoizedConverter(%r)" % self.name
+
+    def key(self, text, options):
+        """Build cache key of text and options.
+
+        Parameters
+        ----------
+        text : string
+            String of spelling text.
+        options : dict
+            Dict of keyword arguments of ``to_IPA``.
+
+        Returns
+        -------
+        string
+            JSON string of ``[name, text, options]``.
+        """
+        return json.dumps(
+            [self.name, text, sorted(options.items())], ensure_ascii=False
+        )
+
+    def __call__(self, text, **options):
+        """Convert text to IPA, using cached result if any.
+
+        Parameters
+        ----------
+        text : string
+            String of spelling text.
+        **options
+            Keyword arguments of ``to_IPA`` of language module.
+
+        Returns
+        -------
+        string
+            Converted IPA.
+        """
+        key = self.key(text, options)
+        ipa = self.cache.get(key)
+        if ipa is not None:
+            self.hits += 1
+            return ipa
+        self.misses += 1
+        ipa = self.func(text, **options)
+        self.cache.set(key, ipa)
+        return ipa
+
+    def cache_info(self):
+        """Get statistics of cache since last cleared.
+
+        Returns
+        -------
+        CacheInfo
+            Numbers of hits and misses.
+        """
+        return CacheInfo(self.hits, self.misses)
+
+    def clear(self):
+        """Remove cached results and reset statistics."""
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Memoized converters used by template handlers, keyed by module name
+converters = {
+    "fr": MemoizedConverter(fr_pron.to_IPA, "fr"),
+    "ru": MemoizedConverter(ru_pron.to_IPA, "ru"),
+    "hi": MemoizedConverter(hi_pron.to_IPA, "hi"),
+    "es": MemoizedConverter(es_pron.to_IPA, "es"),
+    "cmn": MemoizedConverter(cmn_pron.to_IPA, "cmn"),
+}
+
+
+def set_cache(cache=None, maxsize=MAXSIZE):
+    """Set cache of all converters.
+
+    Cache keys include module name, so one persistent cache can be
+    shared by all converters.
+
+    Parameters
+    ----------
+    cache : object
+        Cache with ``get`` and ``set`` methods, e.g. a
+        :class:`~pywiktionary.cache.SQLiteCache` with ``autocommit``
+        disabled. None to cache results in memory of each converter.
+    maxsize : int
+        Maximum number of results cached in memory per converter, if
+        ``cache`` is None.
+    """
+    for converter in converters.values():
+        converter.maxsize = maxsize
+        converter.cache = cache if cache is not None else MemoryCache(maxsize)
+        converter.hits = 0
+        converter.misses = 0
+
+
+def cache_info():
+    """Get statistics of caches of all converters.
+
+    Returns
+    -------
+    dict
+        Dict of :class:`CacheInfo`, keyed by module name.
+    """
+    return {
+        name: converter.cache_info()
+        for name, converter in converters.items()
+    }
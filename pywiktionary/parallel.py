@@ -0,0 +1,223 @@
+"""Multi-process IPA extraction for Wiktionary XML dump.
+
+The reading process streams pages out of the dump and dispatches them in
+chunks to a pool of worker processes, each holding its own copy of the
+:class:`Wiktionary` object (and thus its own :class:`Parser`). For bz2
+multistream dump, only stream offsets are dispatched and workers read and
+decompress the streams themselves.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import itertools
+import multiprocessing
+import threading
+
+from .dump import read_header, read_stream, parse_stream, iter_streams, \
+    skip_pages
+
+
+# Wiktionary object of the current worker process, set by _init_worker.
+_wiktionary = None
+
+
+def _init_worker(wiktionary):
+    """Initialize worker process with its own Wiktionary object."""
+    global _wiktionary # pylint: disable=global-statement
+    _wiktionary = wiktionary
+
+
+def _parse_pages(pages):
+    """Parse ``(id, title, text)`` pages in worker process."""
+    return [
+        _wiktionary.get_entry(page_id, title, text)
+        for page_id, title, text in pages
+    ]
+
+
+def _parse_stream(task):
+    """Read, decompress and parse a multistream dump stream in worker."""
+    dump_file, header, start, end, contains, after = task
+    data = read_stream(dump_file, start, end)
+    return _parse_pages(skip_pages(
+        parse_stream(header, data, contains=contains),
+        after,
+    ))
+
+
+def chunked(iterable, size):
+    """Split iterable into lists of at most ``size`` items.
+
+    Parameters
+    ----------
+    iterable : iterable
+        Items to be split.
+    size : int
+        Maximum number of items in each chunk.
+
+    Yields
+    ------
+    list
+        List of consecutive items.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap_chunks(func, tasks, workers=None, max_pending=None, ordered=True,
+                initializer=None, initargs=()):
+    """Map function over tasks in a pool of worker processes.
+
+    At most ``max_pending`` tasks are dispatched but not yet consumed at
+    any time, so a fast reader cannot flood the pool queues when workers
+    fall behind.
+
+    Parameters
+    ----------
+    func : function
+        Picklable function applied to each task in worker process.
+    tasks : iterable
+        Tasks to be mapped, consumed lazily.
+    workers : int
+        Number of worker processes, default is the number of CPUs.
+    max_pending : int
+        Maximum number of tasks in flight, default is twice the number
+        of workers.
+    ordered : boolean
+        Whether yield results in the order of tasks.
+    initializer : function
+        Function called in each worker process on start.
+    initargs : tuple
+        Arguments of ``initializer``.
+
+    Yields
+    ------
+    object
+        Result of ``func`` for each task.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    max_pending = max_pending or 2 * workers
+    pending = threading.BoundedSemaphore(max_pending)
+    stop = threading.Event()
+
+    def feed():
+        for task in tasks:
+            while not pending.acquire(timeout=0.1):
+                if stop.is_set():
+                    return
+            yield task
+
+    pool = multiprocessing.Pool(workers, initializer, initargs)
+    try:
+        if ordered:
+            results = pool.imap(func, feed())
+        else:
+            results = pool.imap_unordered(func, feed())
+        for result in results:
+            pending.release()
+            yield result
+        pool.close()
+    finally:
+        stop.set()
+        pool.terminate()
+        pool.join()
+
+
+def iter_parallel(wiktionary, pages, workers=None, chunk_size=64,
+                  max_pending=None, ordered=True):
+    """Extract IPA from pages in parallel.
+
+    Parameters
+    ----------
+    wiktionary : Wiktionary
+        Wiktionary object copied to each worker process.
+    pages : iterable
+        Iterable of ``(id, title, text)`` tuples.
+    workers : int
+        Number of worker processes, default is the number of CPUs.
+    chunk_size : int
+        Number of pages dispatched to a worker at a time.
+    max_pending : int
+        Maximum number of chunks in flight.
+    ordered : boolean
+        Whether yield results in the order of pages in dump.
+
+    Yields
+    ------
+    dict or PageResult
+        Extracted IPA result of one page, see :meth:`Wiktionary.iter_IPA`.
+    """
+    results = imap_chunks(
+        _parse_pages,
+        chunked(pages, chunk_size),
+        workers=workers,
+        max_pending=max_pending,
+        ordered=ordered,
+        initializer=_init_worker,
+        initargs=(wiktionary,),
+    )
+    for chunk in results:
+        for entry in chunk:
+            yield entry
+
+
+def iter_parallel_streams(wiktionary, dump_file, index_file, workers=None,
+                          max_pending=None, ordered=True, contains=None,
+                          start=0, after=None):
+    """Extract IPA from bz2 multistream dump in parallel.
+
+    Each worker process seeks to a stream, decompresses and parses it,
+    so decompression is spread over all workers as well.
+
+    Parameters
+    ----------
+    wiktionary : Wiktionary
+        Wiktionary object copied to each worker process.
+    dump_file : string
+        Path of bz2 multistream dump file.
+    index_file : string
+        Path of multistream index file.
+    workers : int
+        Number of worker processes, default is the number of CPUs.
+    max_pending : int
+        Maximum number of streams in flight.
+    ordered : boolean
+        Whether yield results in the order of pages in dump.
+    contains : bytes
+        Byte string to be found in raw XML of pages, other pages are
+        skipped before parsing.
+    start : int
+        Byte offset of the first stream to parse.
+    after : int
+        Id of a page in the first stream, pages up to and including it
+        are skipped.
+
+    Yields
+    ------
+    dict or PageResult
+        Extracted IPA result of one page, see :meth:`Wiktionary.iter_IPA`.
+    """
+    header = read_header(dump_file)
+    tasks = (
+        (dump_file, header, offset, end, contains, after if i == 0 else None)
+        for i, (offset, end) in enumerate(
+            iter_streams(dump_file, index_file, start=start)
+        )
+    )
+    results = imap_chunks(
+        _parse_stream,
+        tasks,
+        workers=workers,
+        max_pending=max_pending,
+        ordered=ordered,
+        initializer=_init_worker,
+        initargs=(wiktionary,),
+    )
+    for chunk in results:
+        for entry in chunk:
+            yield entry
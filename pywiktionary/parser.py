@@ -6,21 +6,48 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
-import json
-try:
-    from urllib import urlencode, urlopen
-except ImportError:
-    from urllib.parse import urlencode
-    from urllib.request import urlopen
+import collections
+import time
 
 import regex as re
 from bs4 import BeautifulSoup
+from .api import ConnectionPool
+from .cache import MemoryCache, normalize_template
+from .sections import Outline
+from .templates import scan_templates
 from .IPA import IPA
-from .IPA import fr_pron
-from .IPA import ru_pron
-from .IPA import hi_pron
-from .IPA import es_pron
-from .IPA import cmn_pron
+from .IPA.rules import set_deadline
+from .handlers import TEMPLATE_HANDLERS
+from .results import Pron
+
+
+# Separator of templates expanded together in one API request; the index
+# is checked when splitting the expanded text back.
+TEMPLATE_SEPARATOR = "\n@@wikt2pron-split-%d@@\n"
+TEMPLATE_SEPARATOR_RE = re.compile(r"\n?@@wikt2pron-split-(\d+)@@\n?")
+
+# Template to be expanded through Wiktionary API, kept in parse result
+# until all templates of a page are expanded in a batch.
+PendingTemplate = collections.namedtuple(
+    "PendingTemplate", ["text", "lang", "template"]
+)
+
+# Limits of work spent on a page, None for no limit:
+# page_size, maximum characters of wiki text of a page;
+# template_size, maximum characters of a pronunciation template;
+# seconds, maximum seconds spent parsing a page, not counting requests to
+# Wiktionary API; also interrupts conversion rules of bundled templates.
+Budget = collections.namedtuple(
+    "Budget", ["page_size", "template_size", "seconds"]
+)
+Budget.__new__.__defaults__ = (None, None, None)
+
+
+class PageSkipped(Exception):
+    """Raised when parsing a page exceeds its :class:`Budget`."""
+    def __init__(self, reason):
+        super(PageSkipped, self).__init__(reason)
+        self.reason = reason
 
 
 class Parser(object):
@@ -31,16 +58,57 @@ class Parser(object):
 
     To convert IPA text to X-SAMPA text, use ``XSAMPA`` parameter.
 
+    Templates expanded through Wiktionary API are cached in ``cache``,
+    default is an in-memory :class:`~pywiktionary.cache.MemoryCache`. Use
+    :class:`~pywiktionary.cache.SQLiteCache` to keep them between runs or
+    share them between processes.
+
+    Templates which are not implemented locally are collected for a whole
+    page and expanded together, ``batch_size`` templates per API request.
+    Requests are sent over keep-alive connections of ``pool``.
+
+    Templates implemented locally, ``{{IPA}}``, ``{{fr-IPA}}``,
+    ``{{ru-IPA}}``, ``{{hi-IPA}}``, ``{{es-IPA}}`` and ``{{zh-pron}}``,
+    are converted without Wiktionary API; more can be added by
+    :meth:`register_template`.
+
+    Work spent on a page is limited by ``budget``. A page exceeding it,
+    e.g. a huge page or one with a huge template, is not parsed, and every
+    language in it gets ``"Page skipped: <reason>."`` as result.
+
+    IPA text is returned in ``{"IPA": "", "X-SAMPA": "", "lang": ""}``
+    dicts, or in :class:`~pywiktionary.results.Pron` tuples if ``compact``
+    is set, which also record the template name and take much less memory.
+
     Parameters
     ----------
     lang : string
         String of language type.
     XSAMPA : boolean
         Option for IPA to X-SAMPA conversion.
+    cache : object
+        Cache of expanded templates, with ``get`` and ``set`` methods.
+    batch_size : int
+        Maximum number of templates expanded in one API request.
+    pool : ConnectionPool
+        Pool of connections to Wiktionary API.
+    budget : Budget
+        Limits of work spent on a page, default is no limit.
+    compact : boolean
+        Option for returning IPA in ``Pron`` tuples instead of dicts.
     """
-    def __init__(self, lang=None, XSAMPA=False):
+    def __init__(self, lang=None, XSAMPA=False, cache=None, batch_size=50,
+                 pool=None, budget=None, compact=False):
         self.lang = lang
         self.XSAMPA = XSAMPA
+        self.cache = cache if cache is not None else MemoryCache()
+        self.batch_size = batch_size
+        self.pool = pool if pool is not None else ConnectionPool()
+        self.handlers = dict(TEMPLATE_HANDLERS)
+        self.title = None
+        self.budget = budget if budget is not None else Budget()
+        self.deadline = None
+        self.compact = compact
         self.api = "https://en.wiktionary.org/w/api.php"
         self.param = {
             "action": "expandtemplates",
@@ -49,15 +117,199 @@ class Parser(object):
             "format": "json"
         }
         self.regex = {
-            "lang": re.compile("\|lang=([^\|]+)"),
-            "node": re.compile("(?<brackets>{{(?:[^{}]+|(?&brackets))*}})"),
             "IPA-node": re.compile("^(([\w]+\-)?(IPA|pron))(?=\||\n|\Z)"),
-            "h2": re.compile("(?:\A|\n)={2}([\p{L}0-9 -]+)={2}\n"),
-            "h3": re.compile("\n={3}([\p{L}0-9 -]+)={3}\n"),
-            "h4": re.compile("\n={4}([\p{L}0-9 -]+)={4}\n"),
             "IPA": re.compile("<span[^>]*>([^<]+)<\/span>")
         }
 
+    def register_template(self, name, handler):
+        """Register handler of template implemented locally.
+
+        Parameters
+        ----------
+        name : string
+            String of template name.
+        handler : function
+            Function called with :class:`~pywiktionary.templates.Arguments`
+            of template and page title, returning list of IPA dicts in
+            ``{"IPA": "", "lang": ""}`` format.
+
+        Examples
+        --------
+        >>> parser = Parser()
+        >>> parser.register_template(
+        ...     "xx-IPA",
+        ...     lambda args, title: [
+        ...         {"IPA": ipa, "lang": "xx"} for ipa in args.positional
+        ...     ],
+        ... )
+        """
+        self.handlers[name] = handler
+
+    def request_expansion(self, text):
+        """Expand wiki text through Wiktionary API.
+
+        Parameters
+        ----------
+        text : string
+            String of wiki text with templates.
+
+        Returns
+        -------
+        string
+            String of expanded wiki text.
+        """
+        self.param["text"] = text.encode("utf-8")
+        content = self.pool.query(self.api, self.param)
+        return content["expandtemplates"]["wikitext"]
+
+    @staticmethod
+    def find_IPA(html):
+        """Find IPA text in expanded template.
+
+        Parameters
+        ----------
+        html : string
+            String of expanded template.
+
+        Returns
+        -------
+        list of string
+            List of IPA text.
+        """
+        # Use BeautifulSoup instead of raw regex expr
+        # return self.regex["IPA"].findall(html)
+        soup = BeautifulSoup(html, "html.parser")
+        span = soup.find_all("span", {"class": "IPA"})
+        return list(map(lambda x: x.text, span))
+
+    def expand_templates(self, texts):
+        """Expand IPA Templates through Wiktionary API in batches.
+
+        Templates not found in cache are joined with separators and
+        expanded in one API request per ``batch_size`` templates, then
+        the expanded text is split back per template.
+
+        Parameters
+        ----------
+        texts : list of string
+            List of template text inside "{{" and "}}".
+
+        Returns
+        -------
+        list of list of string
+            List of expanded IPA text for each template.
+        """
+        expanded, missing = self.lookup_templates(texts)
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            batch_texts = [text for _, text in batch]
+            html_lst = self.split_templates(
+                self.request_expansion(self.join_templates(batch_texts)),
+                len(batch),
+            )
+            if html_lst is None:
+                # separators were mangled, expand one by one instead
+                html_lst = [
+                    self.request_expansion(text) for text in batch_texts
+                ]
+            expanded.update(self.cache_templates(
+                [key for key, _ in batch], html_lst
+            ))
+        return [list(expanded[normalize_template(text)]) for text in texts]
+
+    def lookup_templates(self, texts):
+        """Look up templates in cache.
+
+        Parameters
+        ----------
+        texts : list of string
+            List of template text inside "{{" and "}}".
+
+        Returns
+        -------
+        tuple
+            Tuple of dict of cached IPA lists keyed by normalized template
+            text, and list of ``(key, text)`` of templates not found in
+            cache, without duplicates.
+        """
+        expanded = {}
+        missing = collections.OrderedDict()
+        for text in texts:
+            key = normalize_template(text)
+            if key in expanded or key in missing:
+                continue
+            IPA_lst = self.cache.get(key)
+            if IPA_lst is None:
+                missing[key] = text
+            else:
+                expanded[key] = IPA_lst
+        return expanded, list(missing.items())
+
+    @staticmethod
+    def join_templates(texts):
+        """Join templates with separators to be expanded in one request.
+
+        Parameters
+        ----------
+        texts : list of string
+            List of template text inside "{{" and "}}".
+
+        Returns
+        -------
+        string
+            String of joined wiki text.
+        """
+        if len(texts) == 1:
+            return texts[0]
+        return "".join(
+            TEMPLATE_SEPARATOR % i + text for i, text in enumerate(texts)
+        )
+
+    @staticmethod
+    def split_templates(html, size):
+        """Split expanded text of templates joined by :meth:`join_templates`.
+
+        Parameters
+        ----------
+        html : string
+            String of expanded wiki text.
+        size : int
+            Number of joined templates.
+
+        Returns
+        -------
+        list of string
+            List of expanded text for each template, or None if the
+            separators were mangled in expansion.
+        """
+        if size == 1:
+            return [html]
+        html_lst = TEMPLATE_SEPARATOR_RE.split(html)
+        if html_lst[1::2] != [str(i) for i in range(size)]:
+            return None
+        return html_lst[2::2]
+
+    def cache_templates(self, keys, html_lst):
+        """Find IPA text in expanded templates and cache it.
+
+        Parameters
+        ----------
+        keys : list of string
+            List of normalized template text.
+        html_lst : list of string
+            List of expanded text for each template.
+
+        Returns
+        -------
+        dict
+            Dict of IPA lists, keyed by normalized template text.
+        """
+        expanded = {}
+        for key, html in zip(keys, html_lst):
+            expanded[key] = self.find_IPA(html)
+            self.cache.set(key, expanded[key])
+        return expanded
+
     def expand_template(self, text):
         """Expand IPA Template through Wiktionary API.
 
@@ -80,15 +332,84 @@ class Parser(object):
         >>> parser.expand_template(template)
         ['/tʰeːˈsau̯.rus/', '[tʰeːˈsau̯.rʊs]', '/teˈsau̯.rus/']
         """
-        self.param["text"] = text.encode("utf-8")
-        res = urlopen(self.api, urlencode(self.param).encode()).read()
-        content = json.loads(res.decode("utf-8"))
-        html = content["expandtemplates"]["wikitext"]
-        # Use BeautifulSoup instead of raw regex expr
-        # return self.regex["IPA"].findall(html)
-        soup = BeautifulSoup(html, "html.parser")
-        span = soup.find_all("span", {"class": "IPA"})
-        return list(map(lambda x: x.text, span))
+        return self.expand_templates([text])[0]
+
+    def resolve_templates(self, parse_results, expanded=None):
+        """Expand pending templates in parse results.
+
+        All pending templates are expanded together by
+        :meth:`expand_templates`, unless already expanded in ``expanded``,
+        and X-SAMPA is added if required.
+
+        Parameters
+        ----------
+        parse_results : list of list
+            List of parse result lists, with ``Pron`` and
+            ``PendingTemplate`` items.
+        expanded : dict
+            Dict of IPA lists of all pending templates, keyed by
+            normalized template text, as returned by
+            :meth:`cache_templates`. None to expand them.
+
+        Returns
+        -------
+        list of list
+            List of parse result lists, with IPA dicts, or ``Pron`` items
+            if ``compact`` is set.
+        """
+        pending = [
+            item.text for parse_result in parse_results
+            for item in parse_result if isinstance(item, PendingTemplate)
+        ]
+        if expanded is None:
+            IPA_lsts = self.expand_templates(pending)
+        else:
+            IPA_lsts = [
+                list(expanded[normalize_template(text)]) for text in pending
+            ]
+        IPA_lsts = iter(IPA_lsts)
+        resolved_results = []
+        for parse_result in parse_results:
+            resolved = []
+            for item in parse_result:
+                if isinstance(item, PendingTemplate):
+                    resolved += [
+                        Pron(each_ipa, None, item.lang, item.template)
+                        for each_ipa in next(IPA_lsts)
+                    ]
+                else:
+                    resolved.append(item)
+            if self.XSAMPA:
+                resolved = [
+                    item._replace(xsampa=IPA.IPA_to_XSAMPA(item.ipa))
+                    for item in resolved
+                ]
+            resolved_results.append(self.export(resolved))
+        return resolved_results
+
+    def export(self, prons):
+        """Convert ``Pron`` tuples to result format.
+
+        Parameters
+        ----------
+        prons : list of Pron
+            List of extracted IPA.
+
+        Returns
+        -------
+        list
+            List of IPA dicts in ``{"IPA": "", "X-SAMPA": "", "lang": ""}``
+            format, or the ``Pron`` tuples if ``compact`` is set.
+        """
+        if self.compact:
+            return prons
+        result = []
+        for pron in prons:
+            item = {"IPA": pron.ipa, "lang": pron.lang}
+            if self.XSAMPA:
+                item["X-SAMPA"] = pron.xsampa
+            result.append(item)
+        return result
 
     def parse(self, wiki_text, title=None):
         """Parse Wiktionary wiki text.
@@ -109,23 +430,123 @@ class Parser(object):
             Dict of parsed IPA results.
             Key: language name; Value: list of IPA text.
         """
+        return self.resolve_page(self.parse_pending(wiki_text, title=title))
+
+    def parse_pending(self, wiki_text, title=None):
+        """Parse Wiktionary wiki text, keep pending templates.
+
+        Same as :meth:`parse`, except that templates to be expanded
+        through Wiktionary API are kept as ``PendingTemplate`` items
+        until :meth:`resolve_page`.
+
+        Parameters
+        ----------
+        wiki_text : string
+            String of Wiktionary wiki text, from XML dump or Wiktionary API.
+        title: string
+            String of wiki entry title.
+
+        Returns
+        -------
+        dict
+            Dict of parse results with pending templates.
+        """
         self.title = title
-        parse_result = {}
-        h2_lst = self.regex["h2"].findall(wiki_text)
-        if self.lang and self.lang not in h2_lst:
+        self.deadline = None
+        # A language header always contains "==lang==", reject pages
+        # without it in one pass before any regex work
+        if self.lang and "==%s==" % self.lang not in wiki_text:
+            return {self.lang: "Language not found."}
+        outline = Outline(wiki_text)
+        h2_lst = outline.sections(2)
+        if self.lang and self.lang not in [h2.name for h2 in h2_lst]:
             parse_result = {self.lang: "Language not found."}
             return parse_result
-        h2_split = self.regex["h2"].split(wiki_text)
-        i = 0
-        while i < len(h2_split):
-            if h2_split[i] in h2_lst:
-                if not self.lang or h2_split[i] == self.lang:
-                    pronunciation = self.parse_detail(h2_split[i+1])
-                    if not pronunciation:
-                        pronunciation = "IPA not found."
-                    parse_result[h2_split[i]] = pronunciation
-                i += 1
-            i += 1
+        h2_lst = [h2 for h2 in h2_lst if not self.lang or h2.name == self.lang]
+        parse_result = {}
+        try:
+            self.check_budget(len(wiki_text), "page")
+            if self.budget.seconds is not None:
+                self.deadline = time.time() + self.budget.seconds
+                set_deadline(self.deadline)
+            for h2 in h2_lst:
+                parse_result[h2.name] = self._parse_detail(
+                    wiki_text,
+                    outline=outline,
+                    start=h2.start,
+                    end=h2.end,
+                )
+        except PageSkipped as err:
+            parse_result = {
+                h2.name: "Page skipped: %s." % err.reason for h2 in h2_lst
+            }
+        finally:
+            if self.deadline is not None:
+                set_deadline(None)
+            self.deadline = None
+        return parse_result
+
+    def check_budget(self, size=None, kind="page"):
+        """Check that parsing the current page is within budget.
+
+        Parameters
+        ----------
+        size : int
+            Number of characters of page or template to be parsed.
+        kind : string
+            String of ``page`` or ``template``.
+
+        Raises
+        ------
+        PageSkipped
+            If the size or parsing time exceeds the budget.
+        """
+        limit = getattr(self.budget, kind + "_size")
+        if size is not None and limit is not None and size > limit:
+            raise PageSkipped("%s of %d characters exceeds limit of %d" % (
+                kind, size, limit
+            ))
+        if self.deadline is not None and time.time() > self.deadline:
+            raise self.time_exceeded()
+
+    def time_exceeded(self):
+        """Build exception of parsing time exceeding the budget."""
+        return PageSkipped("parsing exceeds limit of %g seconds" % (
+            self.budget.seconds
+        ))
+
+    def resolve_page(self, parse_result, expanded=None):
+        """Expand pending templates in parse results of a page.
+
+        Templates of all languages in the page are expanded together.
+
+        Parameters
+        ----------
+        parse_result : dict
+            Dict of parse results returned by :meth:`parse_pending`.
+        expanded : dict
+            Dict of IPA lists of pending templates already expanded, see
+            :meth:`resolve_templates`.
+
+        Returns
+        -------
+        dict
+            Dict of parsed IPA results.
+            Key: language name; Value: list of IPA text.
+        """
+        parse_result = dict(parse_result)
+        lang_lst = [
+            lang for lang, pronunciation in parse_result.items()
+            if isinstance(pronunciation, list)
+        ]
+        resolved = self.resolve_templates(
+            [parse_result[lang] for lang in lang_lst], expanded
+        )
+        for lang, pronunciation in zip(lang_lst, resolved):
+            parse_result[lang] = pronunciation
+        for lang, pronunciation in parse_result.items():
+            if not pronunciation:
+                parse_result[lang] = "IPA not found."
         return parse_result
 
     def parse_detail(self, wiki_text, depth=3):
@@ -142,29 +563,45 @@ class Parser(object):
 
         Returns
         -------
-        list of dict
+        list
             List of extracted IPA text in
-            ``{"IPA": "", "X-SAMPA": "", "lang": ""}`` format.
+            ``{"IPA": "", "X-SAMPA": "", "lang": ""}`` format, or
+            ``Pron`` tuples if ``compact`` is set.
         """
+        parse_result = self._parse_detail(wiki_text, depth=depth)
+        if isinstance(parse_result, list):
+            parse_result = self.resolve_templates([parse_result])[0]
+        return parse_result
+
+    def _parse_detail(self, wiki_text, depth=3, outline=None, start=0,
+                      end=None):
+        """Parse the section of a certain language, keep pending templates.
+
+        The section is the span from ``start`` to ``end`` in ``outline``
+        of wiki text, default is the whole wiki text.
+        """
+        if outline is None:
+            outline = Outline(wiki_text)
         parse_result = []
-        detail_lst = self.regex["h" + str(depth)].findall(wiki_text)
-        detail_split = self.regex["h" + str(depth)].split(wiki_text)
+        detail_lst = outline.sections(depth, start=start, end=end)
         # To avoid maximum recursion depth exceeded.
-        if len(detail_split) > 99999:
+        if 2 * len(detail_lst) + 1 > 99999:
             return "Maximum recursion depth exceeded in wiki text."
-        i = 0
-        while i < len(detail_split):
-            if detail_split[i] in detail_lst:
-                header_name = detail_split[i].lower()
-                if header_name == "pronunciation":
-                    parse_result += \
-                        self.parse_pronunciation(detail_split[i+1])
-                elif ("etymology" in header_name and
-                      header_name != "etymology"):
-                    parse_result += \
-                        self.parse_detail(detail_split[i+1], depth=4)
-                i += 1
-            i += 1
+        for detail in detail_lst:
+            header_name = detail.name.lower()
+            if header_name == "pronunciation":
+                parse_result += self._parse_pronunciation(
+                    wiki_text[detail.start:detail.end]
+                )
+            elif ("etymology" in header_name and
+                  header_name != "etymology"):
+                parse_result += self._parse_detail(
+                    wiki_text,
+                    depth=4,
+                    outline=outline,
+                    start=detail.start,
+                    end=detail.end,
+                )
         return parse_result
 
     def parse_pronunciation(self, wiki_text):
@@ -179,146 +616,46 @@ class Parser(object):
 
         Returns
         -------
-        list of dict
+        list
             List of extracted IPA text in
-            ``{"IPA": "", "X-SAMPA": "", "lang": ""}`` format.
+            ``{"IPA": "", "X-SAMPA": "", "lang": ""}`` format, or
+            ``Pron`` tuples if ``compact`` is set.
+        """
+        return self.resolve_templates(
+            [self._parse_pronunciation(wiki_text)]
+        )[0]
+
+    def _parse_pronunciation(self, wiki_text):
+        """Parse pronunciation section, keep pending templates.
+
+        Templates not implemented locally are left in result as
+        ``PendingTemplate`` items, see :meth:`resolve_templates`.
         """
         parse_result = []
-        node_lst = re.findall(self.regex["node"], wiki_text)
-        for node in node_lst:
-            node = node[2:-2]
-            tag = re.findall(self.regex["IPA-node"], node)
+        for template in scan_templates(wiki_text):
+            self.check_budget(template.end - template.start, "template")
+            name = template.name
+            handler = self.handlers.get(name)
+            if handler is not None:
+                # conversion rules raise TimeoutError past the deadline
+                try:
+                    items = handler(template.arguments, self.title)
+                except TimeoutError:
+                    raise self.time_exceeded()
+                parse_result += [
+                    Pron(item["IPA"], None, item["lang"], name)
+                    for item in items
+                ]
+                continue
+            node = template.inner
+            tag = self.regex["IPA-node"].findall(node)
             if tag:
                 tag = tag[0][0]
-                if tag in [
-                    "IPA", "fr-IPA", "ru-IPA", "hi-IPA", "zh-pron",
-                ]:
-                    node = re.sub("\n", "", node)
-                    node = re.sub(self.regex["IPA-node"], "", node)
-                    node = re.sub(self.regex["node"], "", node) #FIXME
-                    lang = re.findall(self.regex["lang"], node)
-                    lang = lang[0] if lang else "Unknown"
-                    node = re.sub(self.regex["lang"], "", node)
-                    node = re.sub("\|qual\d?=[^\|]*", "", node)
-                    node = re.sub("\|n\d?=[^\|]*", "", node)
-                    if tag == "IPA":
-                        node = node[1:]
-                        node_detail = node.split("|")
-                        for each_ipa in node_detail:
-                            if not each_ipa:
-                                continue
-                            parse_result.append({
-                                "IPA": each_ipa,
-                                "lang": lang,
-                            })
-                    elif tag == "fr-IPA":
-                        lang = "fr"
-                        pos = re.findall("\|pos=([^\|]+)", node)
-                        pos = pos[0] if pos else ""
-                        node = re.sub("\|pos=([^\|]+)", "", node)
-                        node = node[1:]
-                        if not node and self.title:
-                            node = self.title
-                        node_detail = node.split("|")
-                        for each_ipa in node_detail:
-                            if not each_ipa:
-                                continue
-                            parse_result.append({
-                                "IPA": fr_pron.to_IPA(
-                                    each_ipa,
-                                    pos=pos
-                                ),
-                                "lang": lang,
-                            })
-                    elif tag == "ru-IPA":
-                        lang = "ru"
-                        node = re.sub("\|phon=", "", node)
-                        noadj = re.findall("\|noadj=([^\|]+)", node)
-                        noadj = noadj[0] if noadj else ""
-                        node = re.sub("\|noadj=([^\|]+)", "", node)
-                        noshto = re.findall("\|noshto=([^\|]+)", node)
-                        noshto = noshto[0] if noshto else ""
-                        node = re.sub("\|noshto=([^\|]+)", "", node)
-                        gem = re.findall("\|gem=([^\|]+)", node)
-                        gem = gem[0] if gem else ""
-                        node = re.sub("\|gem=([^\|]+)", "", node)
-                        pos = re.findall("\|pos=([^\|]+)", node)
-                        pos = pos[0] if pos else ""
-                        node = re.sub("\|pos=([^\|]+)", "", node)
-                        node = re.sub("\|raw=([^\|]+)", "", node)
-                        node = re.sub("\|ann=([^\|]+)", "", node)
-                        bracket = re.findall("\|bracket=([^\|]+)", node)
-                        bracket = bracket[0] if bracket else ""
-                        node = re.sub("\|bracket=([^\|]+)", "", node)
-                        node = node[1:]
-                        if not node and self.title:
-                            node = self.title
-                        node_detail = node.split("|")
-                        for each_ipa in node_detail:
-                            if not each_ipa:
-                                continue
-                            parse_result.append({
-                                "IPA": ru_pron.to_IPA(
-                                    each_ipa,
-                                    adj=noadj,
-                                    gem=gem,
-                                    bracket=bracket,
-                                    pos=pos
-                                ),
-                                "lang": lang,
-                            })
-                    elif tag == "hi-IPA":
-                        lang = "hi"
-                        node = node[1:]
-                        if not node and self.title:
-                            node = self.title
-                        node_detail = node.split("|")
-                        for each_ipa in node_detail:
-                            if not each_ipa:
-                                continue
-                            parse_result.append({
-                                "IPA": hi_pron.to_IPA(each_ipa),
-                                "lang": lang,
-                            })
-                    elif tag == "es-IPA":
-                        lang = "es"
-                        node = node[1:]
-                        if not node and self.title:
-                            node = self.title
-                        node_detail = node.split("|")
-                        for each_ipa in node_detail:
-                            if not each_ipa:
-                                continue
-                            parse_result.append({
-                                "IPA": es_pron.to_IPA(each_ipa),
-                                "lang": lang,
-                            })
-                    elif tag == "zh-pron":
-                        lang = "zh"
-                        node = re.findall("\|m=([^\|]+)", node)
-                        node = node[0] if node else ""
-                        node_detail = node.split(",")
-                        for each_ipa in node_detail:
-                            if not each_ipa or "=" in each_ipa:
-                                continue
-                            parse_result.append({
-                                "IPA": cmn_pron.to_IPA(each_ipa),
-                                "lang": lang,
-                            })
-                else:
-                    if "|" not in node:
-                        node = "{}|{}".format(node, self.title)
-                    extend_lst = self.expand_template("{{%s}}" % node)
-                    lang = tag.split("-")
-                    lang = lang[0] if lang else "Unknown"
-                    for each_ipa in extend_lst:
-                        parse_result.append({
-                            "IPA": each_ipa,
-                            "lang": lang,
-                        })
-        if self.XSAMPA:
-            for item in parse_result:
-                item.update({
-                    "X-SAMPA": IPA.IPA_to_XSAMPA(item["IPA"]),
-                })
+                if "|" not in node:
+                    node = "{}|{}".format(node, self.title)
+                lang = tag.split("-")
+                lang = lang[0] if lang else "Unknown"
+                parse_result.append(
+                    PendingTemplate("{{%s}}" % node, lang, tag)
+                )
         return parse_result
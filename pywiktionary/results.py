@@ -0,0 +1,147 @@
+"""Compact records of extracted IPA results.
+
+Instead of nested dicts with sentinel strings, a page is described by one
+:class:`PageResult` holding a :class:`Status` and :class:`Pron` tuples,
+which take a fraction of memory of the dicts and need no type checks.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+import enum
+
+
+# Pronunciation extracted from a template:
+# ipa, IPA text;
+# xsampa, X-SAMPA text, None if not converted;
+# lang, language code of template, e.g. "en";
+# template, name of template, e.g. "en-IPA".
+Pron = collections.namedtuple("Pron", ["ipa", "xsampa", "lang", "template"])
+
+
+class Status(enum.Enum):
+    """Status of page result, valued by legacy result string."""
+    FOUND = "IPA found."
+    IPA_NOT_FOUND = "IPA not found."
+    LANGUAGE_NOT_FOUND = "Language not found."
+    WORD_NOT_FOUND = "Word not found."
+    SKIPPED = "Page skipped."
+
+
+class PageResult(object):
+    """IPA result of a page.
+
+    Parameters
+    ----------
+    id : int
+        Page id, None if not known.
+    title : string
+        String of page title.
+    status : Status
+        Status of result.
+    pronunciations : dict
+        Dict of tuple of :class:`Pron`, keyed by language name, only
+        languages with IPA found are included.
+    reason : string
+        String of reason why the page is skipped.
+    """
+    __slots__ = ("id", "title", "status", "pronunciations", "reason")
+
+    def __init__(self, id, title, status, pronunciations=None, reason=None):
+        # pylint: disable=redefined-builtin
+        self.id = id
+        self.title = title
+        self.status = status
+        self.pronunciations = pronunciations or {}
+        self.reason = reason
+
+    def __repr__(self):
+        return "PageResult(%s)" % ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self.__slots__
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, PageResult):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__slots__
+        )
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def records(self):
+        """Iterate pronunciations of page.
+
+        Yields
+        ------
+        tuple
+            Tuple of language name and :class:`Pron`.
+        """
+        for language, prons in self.pronunciations.items():
+            for pron in prons:
+                yield language, pron
+
+    def to_dict(self):
+        """Convert page result to dict for serialization.
+
+        Returns
+        -------
+        dict
+            Dict of page result, with status name and pronunciations in
+            ``{"ipa": "", "xsampa": "", "lang": "", "template": ""}``
+            format.
+        """
+        entry = {
+            "id": self.id,
+            "title": self.title,
+            "status": self.status.name,
+            "pronunciations": {
+                language: [dict(pron._asdict()) for pron in prons]
+                for language, prons in self.pronunciations.items()
+            },
+        }
+        if self.reason is not None:
+            entry["reason"] = self.reason
+        return entry
+
+    @classmethod
+    def from_parse(cls, page_id, title, parse_result):
+        """Build page result from result of :meth:`Parser.parse`.
+
+        Parameters
+        ----------
+        page_id : int
+            Page id, None if not known.
+        title : string
+            String of page title.
+        parse_result : dict
+            Dict of list of :class:`Pron` or result string, keyed by
+            language name, as returned by a compact :class:`Parser`.
+
+        Returns
+        -------
+        PageResult
+            Result of page.
+        """
+        pronunciations = {}
+        reason = None
+        status = Status.LANGUAGE_NOT_FOUND
+        for language, prons in parse_result.items():
+            if not isinstance(prons, str):
+                pronunciations[language] = tuple(prons)
+            elif prons == Status.IPA_NOT_FOUND.value:
+                if status is Status.LANGUAGE_NOT_FOUND:
+                    status = Status.IPA_NOT_FOUND
+            elif prons != Status.LANGUAGE_NOT_FOUND.value:
+                # page skipped, or too deep to be parsed
+                status = Status.SKIPPED
+                reason = prons
+        if pronunciations:
+            return cls(page_id, title, Status.FOUND, pronunciations)
+        return cls(page_id, title, status, reason=reason)
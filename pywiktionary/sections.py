@@ -0,0 +1,87 @@
+"""Single-pass tokenizer of section headers in wiki text.
+
+Wiki text is scanned once for ``==h2==``, ``===h3===`` and ``====h4====``
+header lines, and sections of a level are then looked up by offset in the
+resulting outline, without splitting or copying the text.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import bisect
+import collections
+
+import regex as re
+
+
+HEADER_RE = re.compile(r"^(={2,4})([\p{L}0-9 -]+)\1$", flags=re.M)
+
+# Header line, ``end`` is the offset of the line break after the header.
+Header = collections.namedtuple("Header", ["level", "name", "start", "end"])
+
+# Section under a header, ``start`` and ``end`` are offsets of its body.
+Section = collections.namedtuple("Section", ["name", "start", "end"])
+
+
+class Outline(object):
+    """Outline of section headers in wiki text.
+
+    Parameters
+    ----------
+    text : string
+        String of wiki text.
+    """
+    def __init__(self, text):
+        self.text = text
+        # a header line must end with a line break
+        self.headers = [
+            Header(len(m.group(1)), m.group(2), m.start(), m.end())
+            for m in HEADER_RE.finditer(text) if m.end() < len(text)
+        ]
+        self.starts = [header.start for header in self.headers]
+
+    def __len__(self):
+        return len(self.headers)
+
+    def sections(self, level, start=0, end=None):
+        """Find sections of header level in a span of wiki text.
+
+        A header takes the line breaks before and after it, so a header
+        right after the start of span, or right after another header of
+        the same level, is part of the text of the previous section, as
+        well as a header without line break before the end of span. Only
+        level 2 headers may start at the beginning of span.
+
+        Parameters
+        ----------
+        level : int
+            Level of headers, 2, 3 or 4.
+        start : int
+            Offset of the beginning of span.
+        end : int
+            Offset of the end of span, default is end of text.
+
+        Returns
+        -------
+        list of Section
+            List of sections in order, with offsets of their bodies.
+        """
+        if end is None:
+            end = len(self.text)
+        first = bisect.bisect_left(self.starts, start)
+        last = bisect.bisect_left(self.starts, end)
+        sections = []
+        consumed = -1
+        for header in self.headers[first:last]:
+            if header.level != level or header.end >= end:
+                continue
+            if header.start == start:
+                if level != 2:
+                    continue
+            elif header.start - 1 == consumed:
+                continue
+            if sections:
+                sections[-1] = sections[-1]._replace(end=header.start - 1)
+            sections.append(Section(header.name, header.end + 1, end))
+            consumed = header.end
+        return sections
@@ -0,0 +1,220 @@
+"""Linear-time scanner of ``{{...}}`` templates in wiki text.
+
+Templates are found the same way as the recursive regex
+``(?<brackets>{{(?:[^{}]+|(?&brackets))*}})`` would find them: a template
+is ``{{`` followed by text without braces and nested templates, closed by
+``}}``, and a stray brace inside makes the template invalid. The scan
+never backtracks, and keeps an explicit stack instead of recursing, so it
+terminates in linear time on any input, including the unbalanced braces
+common in real dumps.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import regex as re
+
+
+BRACE_RE = re.compile("[{}]")
+ARGUMENT_RE = re.compile(r"\||\[\[|\]\]")
+
+
+class Arguments(object):
+    """Arguments of a template invocation.
+
+    Parameters
+    ----------
+    items : list of tuple
+        List of ``(name, value)`` of arguments in order, ``name`` is None
+        for positional arguments.
+    """
+    __slots__ = ("items", "named")
+
+    def __init__(self, items):
+        self.items = items
+        self.named = {}
+        for name, value in items:
+            # the first non-empty one is used if an argument is repeated
+            if name is not None and value and name not in self.named:
+                self.named[name] = value
+
+    def __repr__(self):
+        return "Arguments(%r)" % self.items
+
+    @property
+    def positional(self):
+        """List of positional argument values."""
+        return [value for name, value in self.items if name is None]
+
+    def get(self, name, default=""):
+        """Get value of named argument.
+
+        Parameters
+        ----------
+        name : string
+            String of argument name.
+        default : string
+            Value returned if the argument is not given or empty.
+
+        Returns
+        -------
+        string
+            String of argument value.
+        """
+        return self.named.get(name) or default
+
+
+def parse_arguments(text):
+    """Split template text into name and arguments in one pass.
+
+    Arguments are separated by "|" outside ``[[...]]`` links, and an
+    argument with "=" is a named one.
+
+    Parameters
+    ----------
+    text : string
+        String of template text inside "{{" and "}}", without nested
+        templates.
+
+    Returns
+    -------
+    tuple
+        Tuple of template name and its :class:`Arguments`.
+    """
+    parts = []
+    pos = 0
+    depth = 0
+    for match in ARGUMENT_RE.finditer(text):
+        token = match.group()
+        if token == "[[":
+            depth += 1
+        elif token == "]]":
+            depth = max(depth - 1, 0)
+        elif not depth:
+            parts.append(text[pos:match.start()])
+            pos = match.end()
+    parts.append(text[pos:])
+    items = []
+    for part in parts[1:]:
+        if "=" in part:
+            name, value = part.split("=", 1)
+            items.append((name, value))
+        else:
+            items.append((None, part))
+    return parts[0], Arguments(items)
+
+
+class Template(object):
+    """Template node in wiki text.
+
+    Parameters
+    ----------
+    text : string
+        String of wiki text holding the template.
+    start : int
+        Offset of the opening ``{{``.
+    end : int
+        Offset after the closing ``}}``.
+    children : list of Template
+        List of templates nested directly in the template.
+    """
+    __slots__ = ("text", "start", "end", "children")
+
+    def __init__(self, text, start, end, children):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.children = children
+
+    def __repr__(self):
+        return "Template(%r)" % self.text[self.start:self.end]
+
+    @property
+    def inner(self):
+        """Text inside "{{" and "}}"."""
+        return self.text[self.start + 2:self.end - 2]
+
+    @property
+    def flat(self):
+        """Text inside "{{" and "}}", without nested templates."""
+        pieces = []
+        pos = self.start + 2
+        for child in self.children:
+            pieces.append(self.text[pos:child.start])
+            pos = child.end
+        pieces.append(self.text[pos:self.end - 2])
+        return "".join(pieces)
+
+    @property
+    def name(self):
+        """Template name, before the first "|"."""
+        return self.flat.split("|", 1)[0].strip()
+
+    @property
+    def arguments(self):
+        """Arguments of template, without nested templates and line
+        breaks."""
+        return parse_arguments(self.flat.replace("\n", ""))[1]
+
+
+def scan_templates(text):
+    """Find templates in wiki text.
+
+    Parameters
+    ----------
+    text : string
+        String of wiki text.
+
+    Returns
+    -------
+    list of Template
+        List of outermost templates in order, with nested templates as
+        their children.
+    """
+    # template or None for each "{{" offset already scanned
+    scanned = {}
+    templates = []
+    pos = text.find("{{")
+    while pos != -1:
+        template = _scan_template(text, pos, scanned)
+        if template is None:
+            pos = text.find("{{", pos + 1)
+        else:
+            templates.append(template)
+            pos = text.find("{{", template.end)
+    return templates
+
+
+def _scan_template(text, start, scanned):
+    """Scan the template opened at offset, None if it is not closed."""
+    # stack of [start, offset to scan from, children]
+    stack = [[start, start + 2, []]]
+    while stack:
+        frame = stack[-1]
+        match = BRACE_RE.search(text, frame[1])
+        if match is None:
+            break
+        pos = match.start()
+        if text[pos] == "}":
+            if not text.startswith("}}", pos):
+                break
+            template = Template(text, frame[0], pos + 2, frame[2])
+            scanned[frame[0]] = template
+            stack.pop()
+            if not stack:
+                return template
+            stack[-1][1] = template.end
+            stack[-1][2].append(template)
+        elif not text.startswith("{{", pos):
+            break
+        elif pos in scanned:
+            if scanned[pos] is None:
+                break
+            frame[1] = scanned[pos].end
+            frame[2].append(scanned[pos])
+        else:
+            stack.append([pos, pos + 2, []])
+    # a nested template is not closed, so none of the enclosing ones is
+    for frame in stack:
+        scanned[frame[0]] = None
+    return None
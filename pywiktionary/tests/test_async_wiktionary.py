@@ -0,0 +1,157 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for async_wiktionary.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import asyncio
+import threading
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+try:
+    from BaseHTTPServer import HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import HTTPServer
+    from socketserver import ThreadingMixIn
+
+from ..async_wiktionary import AsyncWiktionary
+from .test_parser import StubAPIHandler, EXPAND_PAGE, EXPAND_RESULT
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Threading stub server of Wiktionary API."""
+    daemon_threads = True
+
+
+class StubQueryHandler(StubAPIHandler):
+    """Stub of ``action=query`` and ``action=expandtemplates``.
+
+    Every page has the wiki text of ``EXPAND_PAGE``, except page
+    "missing". The first request is rejected for replication lag.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def respond(self, param):
+        """Respond to posted query."""
+        self.server.clients.add(self.client_address)
+        with self.server.lock:
+            lagged = not self.server.lagged
+            self.server.lagged = True
+        if lagged:
+            self.send_json({"error": {"code": "maxlag", "lag": 6}},
+                           {"Retry-After": "0"})
+        elif param["action"] == ["query"]:
+            self.server.requests.append(param)
+            title = param["titles"][0]
+            if title == "missing":
+                pages = {"-1": {"title": title, "missing": ""}}
+            else:
+                pages = {"1": {"title": title,
+                               "revisions": [{"*": EXPAND_PAGE}]}}
+            self.send_json({"query": {"pages": pages}})
+        else:
+            super(StubQueryHandler, self).respond(param)
+
+
+class TestAsyncWiktionary(unittest.TestCase):
+    """TestAsyncWiktionary class
+    """
+    def setUp(self):
+        self.server = StubServer(("127.0.0.1", 0), StubQueryHandler)
+        self.server.requests = []
+        self.server.clients = set()
+        self.server.lagged = False
+        self.server.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.api = "http://127.0.0.1:%d/w/api.php" % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_lookup_many(self):
+        """Words are looked up concurrently over pooled connections.
+        """
+        wikt = AsyncWiktionary(concurrency=4, backoff=0)
+        wikt.wiktionary.api = self.api
+        wikt.parser.api = self.api
+        words = ["test%d" % i for i in range(20)] + ["missing"]
+
+        async def lookup_all():
+            results = {}
+            for future in wikt.lookup_many(words):
+                word, pronunciation = await future
+                results[word] = pronunciation
+            return results
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(lookup_all())
+        finally:
+            loop.close()
+            wikt.close()
+        self.assertEqual(results.pop("missing"), "Word not found.")
+        for word in words[:-1]:
+            # {{de-IPA}} without argument is expanded from title
+            self.assertEqual(results[word], {
+                "English": EXPAND_RESULT["English"],
+                "German": [EXPAND_RESULT["German"][0],
+                           {"IPA": word, "lang": "de"}],
+            })
+        # the request rejected for lag is retried, and templates of each
+        # page are expanded in one request
+        queries = [param for param in self.server.requests
+                   if param["action"] == ["query"]]
+        self.assertEqual(len(queries), len(words))
+        self.assertEqual(len(self.server.requests) - len(queries), 20)
+        # keep-alive connections are reused
+        self.assertLessEqual(len(self.server.clients), 4)
+
+    def test_cache_evicted(self):
+        """Expanded templates are not requested again if evicted from
+        cache, and the client runs in successive event loops.
+        """
+        wikt = AsyncWiktionary(cache=NullCache(), backoff=0)
+        wikt.wiktionary.api = self.api
+        wikt.parser.api = self.api
+        loops = [asyncio.new_event_loop() for _ in range(3)]
+        try:
+            for word, loop in zip(["test0", "test1"], loops):
+                self.assertEqual(loop.run_until_complete(wikt.lookup(word)), {
+                    "English": EXPAND_RESULT["English"],
+                    "German": [EXPAND_RESULT["German"][0],
+                               {"IPA": word, "lang": "de"}],
+                })
+            self.assertEqual(
+                loops[2].run_until_complete(
+                    wikt.expand_templates(["{{en-IPA|/a/|/b/}}"])
+                ),
+                [["/a/", "/b/"]],
+            )
+        finally:
+            for loop in loops:
+                loop.close()
+            wikt.close()
+        expansions = [param for param in self.server.requests
+                      if param["action"] != ["query"]]
+        self.assertEqual(len(expansions), 3)
+
+
+class NullCache(object):
+    """Cache evicting every item at once."""
+    def get(self, key): # pylint: disable=unused-argument
+        return None
+
+    def set(self, key, value):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for cache.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import pickle
+import shutil
+import tempfile
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from ..cache import MemoryCache, SQLiteCache, normalize_template
+from ..parser import Parser
+from ..wiktionary import Wiktionary
+from .test_wiktionary import XML_DUMP_FILE, XML_DUMP_CASES
+
+
+class ProcessCache(SQLiteCache):
+    """SQLite cache recording the process opening its connection."""
+    opened = None
+    opened_pid = None
+
+    def connect(self):
+        conn = super(ProcessCache, self).connect()
+        if conn is not self.opened:
+            self.opened = conn
+            self.opened_pid = os.getpid()
+        return conn
+
+    def get(self, key, default=None):
+        value = super(ProcessCache, self).get(key, default)
+        if self.opened_pid != os.getpid():
+            return ["/connection of process %d/" % self.opened_pid]
+        return value
+
+
+class TestCache(unittest.TestCase):
+    """TestCache class
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "cache.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_memory_cache(self):
+        """Least recently used items are evicted.
+        """
+        cache = MemoryCache(maxsize=2)
+        cache.set("a", [1])
+        cache.set("b", [2])
+        self.assertEqual(cache.get("a"), [1])
+        cache.set("c", [3])
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("a"), [1])
+        self.assertEqual(cache.get("c"), [3])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_sqlite_cache(self):
+        """Items are kept between connections and separated by tag.
+        """
+        cache = SQLiteCache(self.path, tag="20170701")
+        cache.set("{{en-IPA|a}}", ["/eɪ/"])
+        cache.set("{{en-IPA|b}}", [])
+        cache.close()
+        cache = SQLiteCache(self.path, tag="20170701")
+        self.assertEqual(cache.get("{{en-IPA|a}}"), ["/eɪ/"])
+        self.assertEqual(cache.get("{{en-IPA|b}}"), [])
+        self.assertIsNone(SQLiteCache(self.path, tag="latest").get(
+            "{{en-IPA|a}}"
+        ))
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(copy.get("{{en-IPA|a}}"), ["/eɪ/"])
+        cache.clear()
+        self.assertIsNone(cache.get("{{en-IPA|b}}"))
+
+    def test_sqlite_cache_commit(self):
+        """Values are committed on close if autocommit is disabled.
+        """
+        cache = SQLiteCache(self.path, autocommit=False)
+        cache.set("{{en-IPA|a}}", ["/eɪ/"])
+        self.assertIsNone(SQLiteCache(self.path).get("{{en-IPA|a}}"))
+        cache.close()
+        self.assertEqual(
+            SQLiteCache(self.path).get("{{en-IPA|a}}"), ["/eɪ/"]
+        )
+
+    def test_expand_template_cached(self):
+        """Cached templates are not expanded through Wiktionary API.
+        """
+        parser = Parser(lang="English", cache=SQLiteCache(self.path))
+        template = "{{en-IPA|/ˈtɛst/}}"
+        self.assertEqual(normalize_template("{{en-IPA\n|/ˈtɛst/}}"),
+                         template)
+        self.assertEqual(normalize_template(" {{ en-IPA }}\n"), "{{en-IPA}}")
+        # arguments are kept as is
+        self.assertNotEqual(normalize_template("{{x|a\nb}}"),
+                            normalize_template("{{x|ab}}"))
+        self.assertEqual(normalize_template("{{x|a\n|{{y}} }}"),
+                         "{{x|a\n|{{y}} }}")
+        parser.cache.set(template, ["/ˈtɛst/"])
+        self.assertEqual(
+            parser.parse("==English==\n\n===Pronunciation===\n"
+                         "* {{en-IPA\n|/ˈtɛst/}}\n"),
+            {"English": [{"IPA": "/ˈtɛst/", "lang": "en"}]},
+        )
+
+    def test_sqlite_cache_workers(self):
+        """Workers reconnect instead of using connection of parent.
+        """
+        with io.open(XML_DUMP_FILE, encoding="utf-8") as f:
+            xml = f.read()
+        dump_file = os.path.join(self.tmpdir, "dump.xml")
+        with io.open(dump_file, "w", encoding="utf-8") as f:
+            f.write(xml.replace("{{IPA|/ˈdæzəl/|lang=en}}",
+                                "{{en-IPA|/ˈdæzəl/}}"))
+        SQLiteCache(self.path).set("{{en-IPA|/ˈdæzəl/}}", ["/ˈdæzəl/"])
+        cache = ProcessCache(self.path)
+        # connect in parent before workers are forked
+        self.assertIsNone(cache.get("{{en-IPA|/a/}}"))
+        wikt = Wiktionary(lang="English", cache=cache)
+        self.assertEqual(
+            wikt.extract_IPA(dump_file, workers=2, chunk_size=1),
+            XML_DUMP_CASES,
+        )
+        self.assertEqual(cache.opened_pid, os.getpid())
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
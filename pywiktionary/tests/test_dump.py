@@ -0,0 +1,166 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for dump.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import bz2
+import os
+import shutil
+import tempfile
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import regex as re
+
+from ..dump import iter_pages, read_index, stream_offsets, find_index_file, \
+    filter_pages, PageFilter, DumpIndex
+from ..wiktionary import Wiktionary
+from .test_wiktionary import XML_DUMP_FILE, XML_DUMP_CASES
+
+
+def make_multistream(xml_file, dump_file, pages_per_stream=2):
+    """Build bz2 multistream dump and its index from XML dump.
+
+    Parameters
+    ----------
+    xml_file : string
+        Path of Wiktionary XML dump file.
+    dump_file : string
+        Path of ``*-multistream.xml.bz2`` dump file to be written.
+    pages_per_stream : int
+        Number of pages in each bz2 stream.
+
+    Returns
+    -------
+    string
+        Path of written ``*-multistream-index.txt.bz2`` index file.
+    """
+    with open(xml_file, "rb") as f:
+        xml = f.read()
+    pages = re.findall(b"  <page>.*?</page>\n", xml, flags=re.S)
+    header = xml[:xml.index(b"  <page>")]
+    footer = xml[xml.rindex(b"</page>\n") + len(b"</page>\n"):]
+    index = []
+    with open(dump_file, "wb") as f:
+        f.write(bz2.compress(header))
+        for i in range(0, len(pages), pages_per_stream):
+            offset = f.tell()
+            for page in pages[i:i + pages_per_stream]:
+                page_id = re.search(b"<id>(\\d+)</id>", page).group(1)
+                title = re.search(b"<title>(.*?)</title>", page).group(1)
+                index.append(b"%d:%s:%s\n" % (offset, page_id, title))
+            f.write(bz2.compress(b"".join(pages[i:i + pages_per_stream])))
+        f.write(bz2.compress(footer))
+    index_file = dump_file.replace(
+        "-multistream.xml.bz2",
+        "-multistream-index.txt.bz2",
+    )
+    with open(index_file, "wb") as f:
+        f.write(bz2.compress(b"".join(index)))
+    return index_file
+
+
+class TestDump(unittest.TestCase):
+    """TestDump class
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dump_file = os.path.join(
+            self.tmpdir,
+            "enwiktionary-test-pages-articles-multistream.xml.bz2",
+        )
+        self.index_file = make_multistream(XML_DUMP_FILE, self.dump_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_index(self):
+        """Index is read into offsets, page ids and titles.
+        """
+        index = list(read_index(self.index_file))
+        self.assertEqual(
+            [(page_id, title) for _, page_id, title in index],
+            [(case["id"], case["title"]) for case in XML_DUMP_CASES],
+        )
+        self.assertEqual(len(stream_offsets(self.index_file)), 2)
+        self.assertEqual(find_index_file(self.dump_file), self.index_file)
+
+    def test_iter_pages_bz2(self):
+        """Pages of bz2 dump are the same as uncompressed dump.
+        """
+        self.assertEqual(
+            list(iter_pages(self.dump_file)),
+            list(iter_pages(XML_DUMP_FILE)),
+        )
+
+    def test_extract_IPA_multistream(self):
+        """IPA extraction from multistream dump, sequential and parallel.
+        """
+        wikt = Wiktionary(lang="English", XSAMPA=False)
+        self.assertEqual(wikt.extract_IPA(self.dump_file), XML_DUMP_CASES)
+        self.assertEqual(
+            wikt.extract_IPA(self.dump_file, workers=2),
+            XML_DUMP_CASES,
+        )
+
+    def test_dump_index(self):
+        """Pages are looked up by title in multistream dump.
+        """
+        index = DumpIndex(self.dump_file)
+        self.assertEqual(len(index), len(XML_DUMP_CASES))
+        self.assertIn("murder", index)
+        self.assertNotIn("present", index)
+        for page_id, title, text in iter_pages(XML_DUMP_FILE):
+            self.assertEqual(index.get_page(title), (page_id, title, text))
+        self.assertIsNone(index.get_text("present"))
+        wikt = Wiktionary(lang="English", XSAMPA=False)
+        for case in XML_DUMP_CASES:
+            self.assertEqual(
+                wikt.lookup(case["title"], source=index),
+                case["pronunciation"],
+            )
+        self.assertEqual(
+            wikt.lookup("present", source=index),
+            "Word not found.",
+        )
+
+    def test_prefilter(self):
+        """Pages without language header are skipped before parsing.
+        """
+        contains = b"<title>murder</title>"
+        with open(XML_DUMP_FILE, "rb") as f:
+            xml = f.read()
+            f.seek(0)
+            # small chunks split tags and pages
+            self.assertEqual(
+                PageFilter(f, contains, chunk_size=7).read(),
+                filter_pages(xml, contains),
+            )
+        self.assertEqual(
+            [title for _, title, _ in iter_pages(XML_DUMP_FILE, contains)],
+            ["murder"],
+        )
+        for lang, cases in (("English", XML_DUMP_CASES), ("French", [])):
+            wikt = Wiktionary(lang=lang, XSAMPA=False)
+            for dump_file in (XML_DUMP_FILE, self.dump_file):
+                self.assertEqual(
+                    wikt.extract_IPA(dump_file, prefilter=True),
+                    cases,
+                )
+            self.assertEqual(
+                wikt.extract_IPA(self.dump_file, workers=2, prefilter=True),
+                cases,
+            )
+        self.assertEqual(
+            Wiktionary(lang="French").get_entry_pronunciation(xml.decode()),
+            "Language not found.",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
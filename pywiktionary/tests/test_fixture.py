@@ -0,0 +1,85 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for fixture.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import threading
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+try:
+    from BaseHTTPServer import HTTPServer
+except ImportError:
+    from http.server import HTTPServer
+
+from ..api import APIError
+from ..fixture import RecordingPool, ReplayPool, FixtureServer, request_key
+from ..parser import Parser
+from .test_parser import StubAPIHandler, EXPAND_PAGE, EXPAND_RESULT
+
+
+class TestFixture(unittest.TestCase):
+    """TestFixture class
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "fixture.jsonl.gz")
+        # record expansion of page from stub API
+        server = HTTPServer(("127.0.0.1", 0), StubAPIHandler)
+        server.requests = []
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        parser = Parser(pool=RecordingPool(self.path))
+        parser.api = "http://127.0.0.1:%d/w/api.php" % server.server_port
+        self.assertEqual(parser.parse(EXPAND_PAGE, title="test"),
+                         EXPAND_RESULT)
+        server.shutdown()
+        server.server_close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_request_key(self):
+        """Request key does not depend on order, encoding or maxlag.
+        """
+        self.assertEqual(
+            request_key({"text": "{{IPA}}".encode("utf-8"), "maxlag": 5,
+                         "action": "expandtemplates"}),
+            request_key({"action": "expandtemplates", "text": "{{IPA}}"}),
+        )
+
+    def test_replay_pool(self):
+        """Recorded responses are replayed in-process.
+        """
+        parser = Parser(pool=ReplayPool(self.path))
+        self.assertEqual(parser.parse(EXPAND_PAGE, title="test"),
+                         EXPAND_RESULT)
+        with self.assertRaises(KeyError):
+            parser.expand_template("{{de-IPA|/tɛsts/}}")
+
+    def test_fixture_server(self):
+        """Recorded responses are replayed by local stand-in of API.
+        """
+        server = FixtureServer(self.path)
+        server.start()
+        try:
+            parser = Parser()
+            parser.api = server.api
+            self.assertEqual(parser.parse(EXPAND_PAGE, title="test"),
+                             EXPAND_RESULT)
+            with self.assertRaises(APIError):
+                parser.expand_template("{{de-IPA|/tɛsts/}}")
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
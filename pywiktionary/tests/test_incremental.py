@@ -0,0 +1,112 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for incremental.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import regex as re
+
+from ..incremental import ResultStore, Change
+from ..wiktionary import Wiktionary
+from .test_wiktionary import XML_DUMP_FILE
+
+
+class CountingWiktionary(Wiktionary):
+    """Wiktionary counting parsed pages."""
+    parsed = 0
+
+    def get_entry(self, page_id, title, wiki_text):
+        self.parsed += 1
+        return super(CountingWiktionary, self).get_entry(
+            page_id, title, wiki_text
+        )
+
+
+class TestIncremental(unittest.TestCase):
+    """TestIncremental class
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ResultStore(os.path.join(self.tmpdir, "store.db"))
+        with io.open(XML_DUMP_FILE, encoding="utf-8") as f:
+            self.xml = f.read()
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+
+    def write_dump(self, xml):
+        """Write XML dump to temporary file."""
+        path = os.path.join(self.tmpdir, "dump.xml")
+        with io.open(path, "w", encoding="utf-8") as f:
+            f.write(xml)
+        return path
+
+    def test_update_IPA(self):
+        """Only changed pages are parsed, and changes are reported.
+        """
+        wikt = CountingWiktionary(lang="English")
+        changes = wikt.update_IPA(XML_DUMP_FILE, self.store)
+        self.assertEqual(len(changes), 5)
+        self.assertTrue(all(change.action == "added" for change in changes))
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(wikt.parsed, 4)
+        # murder: text changed; dazzle: null edit; battleship: deleted
+        xml = self.xml.replace("/ˈmɝ.dɚ/", "/ˈmɝdɚ/")
+        xml = xml.replace("9aw2ymfjh4t10i9b54cyno07hlj33gv", "changed")
+        xml = xml.replace("<id>44281956</id>", "<id>44281957</id>")
+        xml = re.sub(r"  <page>\s*<title>battleship</title>.*?</page>\n",
+                     "", xml, flags=re.S)
+        wikt.parsed = 0
+        changes = wikt.update_IPA(self.write_dump(xml), self.store)
+        self.assertEqual(wikt.parsed, 1)
+        self.assertEqual(changes, [
+            Change("removed", 39478, "murder", "English", "/ˈmɝ.dɚ/", "en"),
+            Change("added", 39478, "murder", "English", "/ˈmɝdɚ/", "en"),
+        ])
+        self.assertEqual(len(self.store), 3)
+        self.assertIsNone(self.store.get_revision(65195))
+        self.assertEqual(self.store.get_revision(80141)[0], 44281957)
+        self.assertEqual(
+            self.store.get(39478)["pronunciation"][1]["IPA"],
+            "/ˈmɝdɚ/",
+        )
+        # adds-changes dump with murder only
+        xml = re.sub(
+            r"  <page>\s*<title>(dictionary|dazzle)</title>.*?</page>\n",
+            "", xml, flags=re.S,
+        )
+        xml = xml.replace("/ˈmɝdɚ/", "/ˈmɝ.dɚ/").replace("changed", "again")
+        wikt.parsed = 0
+        changes = wikt.update_IPA(self.write_dump(xml), self.store,
+                                  full=False)
+        self.assertEqual(wikt.parsed, 1)
+        self.assertEqual([change.action for change in changes],
+                         ["removed", "added"])
+        self.assertEqual(len(self.store), 3)
+
+    def test_update_IPA_compact(self):
+        """Compact results are stored as dicts.
+        """
+        wikt = Wiktionary(lang="English", compact=True)
+        changes = wikt.update_IPA(XML_DUMP_FILE, self.store)
+        self.assertEqual(changes[-1], Change(
+            "added", 80141, "dazzle", "English", "/ˈdæzəl/", "en",
+        ))
+        self.assertEqual(self.store.get(65195)["status"], "IPA_NOT_FOUND")
+        self.assertEqual(wikt.update_IPA(XML_DUMP_FILE, self.store), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for memo.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from .. import memo
+from ..cache import SQLiteCache
+from ..memo import MemoizedConverter, CacheInfo
+from ..parser import Parser
+from ..IPA import fr_pron
+
+
+class TestMemo(unittest.TestCase):
+    """TestMemo class
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "memo.sqlite")
+        memo.set_cache()
+
+    def tearDown(self):
+        memo.set_cache()
+        shutil.rmtree(self.tmpdir)
+
+    def test_memoized_converter(self):
+        """Results are cached by text and options.
+        """
+        calls = []
+        def to_IPA(text, pos=""):
+            calls.append((text, pos))
+            return fr_pron.to_IPA(text, pos=pos)
+        converter = MemoizedConverter(to_IPA, "fr", maxsize=2)
+        self.assertEqual(converter("portions"), "pɔʁ.sjɔ̃")
+        self.assertEqual(converter("portions"), "pɔʁ.sjɔ̃")
+        self.assertEqual(converter("portions", pos="v"), "pɔʁ.tjɔ̃")
+        self.assertEqual(calls, [("portions", ""), ("portions", "v")])
+        self.assertEqual(converter.cache_info(), CacheInfo(1, 2))
+        # least recently used result evicted
+        converter("patte")
+        converter("portions", pos="v")
+        converter("portions")
+        self.assertEqual(converter.cache_info(), CacheInfo(2, 4))
+        converter.clear()
+        self.assertEqual(converter.cache_info(), CacheInfo(0, 0))
+
+    def test_persistent_cache(self):
+        """Results are kept between runs in SQLite cache.
+        """
+        memo.set_cache(SQLiteCache(self.path, autocommit=False))
+        parser = Parser()
+        wiki_text = "==French==\n\n===Pronunciation===\n* {{fr-IPA}}\n"
+        self.assertEqual(
+            parser.parse(wiki_text, "patte"),
+            {"French": [{"IPA": "pat", "lang": "fr"}]}
+        )
+        parser.parse(wiki_text, "patte")
+        self.assertEqual(memo.cache_info()["fr"], CacheInfo(1, 1))
+        memo.converters["fr"].cache.close()
+        memo.set_cache(SQLiteCache(self.path))
+        # options as passed by {{fr-IPA}} handler
+        memo.converters["fr"]("patte", pos="")
+        self.assertEqual(memo.cache_info()["fr"], CacheInfo(1, 0))
+        memo.converters["fr"].cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
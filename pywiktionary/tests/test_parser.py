@@ -0,0 +1,241 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for parser.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+import threading
+import time
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from urlparse import parse_qs
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from urllib.parse import parse_qs
+
+import regex as re
+
+from ..parser import Parser, Budget
+from ..IPA.rules import Rule, fixed_point
+
+
+# Page with templates which are not implemented locally
+EXPAND_PAGE = """==English==
+
+===Pronunciation===
+* {{en-IPA|/ˈtɛst/|/ˈtɛsts/}}
+* {{en-IPA|/ˈtɛst/|/ˈtɛsts/}}
+
+==German==
+
+===Etymology 1===
+
+====Pronunciation====
+* {{de-IPA|/tɛst/}}
+
+===Etymology 2===
+
+====Pronunciation====
+* {{de-IPA}}
+"""
+EXPAND_RESULT = {
+    "English": [
+        {"IPA": "/ˈtɛst/", "lang": "en"},
+        {"IPA": "/ˈtɛsts/", "lang": "en"},
+        {"IPA": "/ˈtɛst/", "lang": "en"},
+        {"IPA": "/ˈtɛsts/", "lang": "en"},
+    ],
+    "German": [
+        {"IPA": "/tɛst/", "lang": "de"},
+        {"IPA": "test", "lang": "de"},
+    ],
+}
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """Stub of ``action=expandtemplates`` in Wiktionary API.
+
+    Each template is expanded to a ``<span class="IPA">`` per argument.
+    """
+    def do_POST(self): # pylint: disable=invalid-name
+        """Respond to posted parameters."""
+        length = int(self.headers["Content-Length"])
+        self.respond(parse_qs(self.rfile.read(length).decode("utf-8")))
+
+    def respond(self, param):
+        """Expand templates in posted text."""
+        self.server.requests.append(param)
+        wikitext = re.sub(
+            "{{[^{}|]+((?:\\|[^{}|]*)*)}}",
+            lambda x: "".join(
+                '<span class="IPA">%s</span>' % arg
+                for arg in x.group(1).split("|")[1:]
+            ),
+            param["text"][0],
+        )
+        self.send_json({"expandtemplates": {"wikitext": wikitext}})
+
+    def send_json(self, content, headers=None):
+        """Send JSON response with extra headers."""
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): # pylint: disable=arguments-differ
+        pass
+
+
+class TestParser(unittest.TestCase):
+    """TestParser class
+    """
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), StubAPIHandler)
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.api = "http://127.0.0.1:%d/w/api.php" % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_expand_templates_batch(self):
+        """Templates of a page are expanded in one API request.
+        """
+        parser = Parser()
+        parser.api = self.api
+        self.assertEqual(parser.parse(EXPAND_PAGE, title="test"),
+                         EXPAND_RESULT)
+        self.assertEqual(len(self.server.requests), 1)
+        # expanded templates are cached
+        self.assertEqual(parser.parse(EXPAND_PAGE, title="test"),
+                         EXPAND_RESULT)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_expand_templates_batch_size(self):
+        """Templates are split into API requests of batch size.
+        """
+        parser = Parser(lang="German", XSAMPA=True, batch_size=1)
+        parser.api = self.api
+        self.assertEqual(
+            parser.parse(EXPAND_PAGE, title="test"),
+            {"German": [
+                {"IPA": "/tɛst/", "X-SAMPA": "/tEst/", "lang": "de"},
+                {"IPA": "test", "X-SAMPA": "test", "lang": "de"},
+            ]},
+        )
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(
+            parser.expand_template("{{de-IPA|/ˈʃtʊtɡaʁt/}}"),
+            ["/ˈʃtʊtɡaʁt/"],
+        )
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_parse_arguments(self):
+        """Template arguments of local templates are parsed.
+        """
+        parser = Parser()
+        self.assertEqual(
+            parser.parse_pronunciation(
+                "* {{IPA|/a/|lang=en|qual1=US|[[w:b|b]]}}\n"
+                "* {{IPA|lang=}}\n"
+                "* {{ru-IPA|phon=до́мик}}\n"
+                "* {{IPA|lang=|lang=en|/c/}}\n"
+                "* {{fr-IPA|pos=|pos=v|portions}}\n"
+            ),
+            [
+                {"IPA": "/a/", "lang": "en"},
+                {"IPA": "[[w:b|b]]", "lang": "en"},
+                {"IPA": "ˈdomʲɪk", "lang": "ru"},
+                {"IPA": "/c/", "lang": "en"},
+                {"IPA": "pɔʁ.tjɔ̃", "lang": "fr"},
+            ],
+        )
+
+    def test_register_template(self):
+        """Registered templates are converted without Wiktionary API.
+        """
+        parser = Parser()
+        parser.api = self.api
+        parser.register_template(
+            "xx-IPA",
+            lambda args, title: [
+                {"IPA": "/%s/" % value, "lang": "xx"}
+                for value in args.positional or [title]
+            ],
+        )
+        self.assertEqual(
+            parser.parse(
+                "==Spanish==\n\n===Pronunciation===\n"
+                "* {{es-IPA|hola}}\n* {{xx-IPA|a|b}}\n* {{xx-IPA}}\n",
+                title="c",
+            ),
+            {"Spanish": [
+                {"IPA": "ˈola", "lang": "es"},
+                {"IPA": "/a/", "lang": "xx"},
+                {"IPA": "/b/", "lang": "xx"},
+                {"IPA": "/c/", "lang": "xx"},
+            ]},
+        )
+        self.assertEqual(len(self.server.requests), 0)
+
+    def test_budget(self):
+        """Pages exceeding budget are skipped with reason.
+        """
+        page = (
+            "==Spanish==\n\n===Pronunciation===\n* {{es-IPA|hola}}\n"
+            "==French==\n\n===Pronunciation===\n* {{fr-IPA|%s}}\n"
+        ) % ("a" * 100)
+        parser = Parser(budget=Budget(page_size=100))
+        self.assertEqual(parser.parse(page), {
+            "Spanish": "Page skipped: page of 197 characters exceeds "
+                       "limit of 100.",
+            "French": "Page skipped: page of 197 characters exceeds "
+                      "limit of 100.",
+        })
+        parser = Parser(lang="Spanish", budget=Budget(template_size=100))
+        self.assertEqual(parser.parse(page),
+                         {"Spanish": [{"IPA": "ˈola", "lang": "es"}]})
+        parser = Parser(budget=Budget(template_size=100))
+        self.assertEqual(
+            parser.parse(page)["French"],
+            "Page skipped: template of 111 characters exceeds limit of 100.",
+        )
+        parser = Parser(budget=Budget(seconds=0.01))
+        parser.register_template(
+            "es-IPA", lambda args, title: time.sleep(0.02) or [],
+        )
+        self.assertEqual(
+            parser.parse(page)["Spanish"],
+            "Page skipped: parsing exceeds limit of 0.01 seconds.",
+        )
+        self.assertIsNone(parser.deadline)
+        # time runs out inside conversion rules of a template
+        stalling = Rule("[0-9]+", lambda x: str(int(x.group()) + 1))
+        parser.register_template(
+            "es-IPA",
+            lambda args, title: fixed_point(stalling, "0", 10 ** 9) and [],
+        )
+        self.assertEqual(
+            parser.parse(page)["Spanish"],
+            "Page skipped: parsing exceeds limit of 0.01 seconds.",
+        )
+        self.assertEqual(fixed_point(stalling, "0", 2), "2")
+        self.assertEqual(len(self.server.requests), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for results.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import pickle
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from ..parser import Parser, Budget
+from ..results import PageResult, Pron, Status
+
+
+PAGE = """==English==
+
+===Pronunciation===
+* {{IPA|/a/|lang=en}}
+
+==French==
+
+===Etymology===
+* {{fr-IPA}}
+
+==Spanish==
+
+===Pronunciation===
+* {{es-IPA|hola}}
+"""
+
+
+class TestResults(unittest.TestCase):
+    """TestResults class
+    """
+    def test_from_parse(self):
+        """Page status is derived from results of all languages.
+        """
+        parser = Parser(compact=True)
+        result = PageResult.from_parse(1, "a", parser.parse(PAGE, title="a"))
+        self.assertEqual(result.status, Status.FOUND)
+        self.assertEqual(list(result.records()), [
+            ("English", Pron("/a/", None, "en", "IPA")),
+            ("Spanish", Pron("ˈola", None, "es", "es-IPA")),
+        ])
+        self.assertEqual(pickle.loads(pickle.dumps(result)), result)
+        for lang, status in [
+                ("English", Status.FOUND),
+                ("French", Status.IPA_NOT_FOUND),
+                ("German", Status.LANGUAGE_NOT_FOUND),
+        ]:
+            parser = Parser(lang=lang, compact=True)
+            result = PageResult.from_parse(1, "a", parser.parse(PAGE))
+            self.assertEqual(result.status, status)
+        parser = Parser(compact=True, budget=Budget(page_size=10))
+        result = PageResult.from_parse(1, "a", parser.parse(PAGE))
+        self.assertEqual(result.status, Status.SKIPPED)
+        self.assertEqual(result.pronunciations, {})
+        self.assertTrue(result.reason.startswith("Page skipped: page of"))
+
+    def test_xsampa(self):
+        """X-SAMPA is filled in compact results only if converted.
+        """
+        parser = Parser(lang="English", XSAMPA=True, compact=True)
+        self.assertEqual(parser.parse(PAGE), {
+            "English": [Pron("/a/", "/a/", "en", "IPA")],
+        })
+        parser = Parser(lang="English", XSAMPA=True)
+        self.assertEqual(parser.parse(PAGE), {
+            "English": [{"IPA": "/a/", "X-SAMPA": "/a/", "lang": "en"}],
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for sections.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from ..sections import Outline
+
+
+WIKI_TEXT = """==English==
+
+===Etymology 1===
+====Pronunciation====
+* {{IPA|/a/|lang=en}}
+
+====Noun====
+====Pronunciation====
+* {{IPA|/b/|lang=en}}
+
+===Etymology 2===
+
+====Pronunciation====
+* {{IPA|/c/|lang=en}}
+==French==
+==German==
+===Pronunciation===
+"""
+
+
+class TestSections(unittest.TestCase):
+    """TestSections class
+    """
+    def test_outline(self):
+        """Sections are found by level within spans of outline.
+        """
+        outline = Outline(WIKI_TEXT)
+        self.assertEqual(len(outline), 10)
+        h2_lst = outline.sections(2)
+        # header right after another header of same level is kept in text
+        self.assertEqual([h2.name for h2 in h2_lst], ["English", "French"])
+        self.assertEqual(
+            WIKI_TEXT[h2_lst[1].start:h2_lst[1].end],
+            "==German==\n===Pronunciation===\n",
+        )
+        self.assertEqual(
+            [h3.name for h3 in outline.sections(3, h2_lst[1].start)],
+            ["Pronunciation"],
+        )
+        h3_lst = outline.sections(3, h2_lst[0].start, h2_lst[0].end)
+        self.assertEqual(
+            [h3.name for h3 in h3_lst],
+            ["Etymology 1", "Etymology 2"],
+        )
+        # header at start of span needs a line break before it, and
+        # header right after another one is in text of that section
+        self.assertEqual(
+            [
+                (h4.name, WIKI_TEXT[h4.start:h4.end])
+                for h4 in outline.sections(4, h3_lst[0].start, h3_lst[0].end)
+            ],
+            [("Noun", "====Pronunciation====\n* {{IPA|/b/|lang=en}}\n")],
+        )
+        self.assertEqual(
+            [
+                (h4.name, WIKI_TEXT[h4.start:h4.end])
+                for h4 in outline.sections(4, h3_lst[1].start, h3_lst[1].end)
+            ],
+            [("Pronunciation", "* {{IPA|/c/|lang=en}}")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
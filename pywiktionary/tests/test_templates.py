@@ -0,0 +1,74 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for templates.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from ..templates import scan_templates, parse_arguments
+
+
+class TestTemplates(unittest.TestCase):
+    """TestTemplates class
+    """
+    def test_scan_templates(self):
+        """Templates are found with nested templates as children.
+        """
+        text = "* {{a|{{b|x}}|{{c|{{d}}}}}} {{IPA|/e/|lang=en}}\n"
+        templates = scan_templates(text)
+        self.assertEqual(
+            [template.inner for template in templates],
+            ["a|{{b|x}}|{{c|{{d}}}}", "IPA|/e/|lang=en"],
+        )
+        self.assertEqual(
+            [child.inner for child in templates[0].children],
+            ["b|x", "c|{{d}}"],
+        )
+        self.assertEqual(templates[0].children[1].children[0].name, "d")
+        self.assertEqual(templates[0].flat, "a||")
+        self.assertEqual(templates[1].name, "IPA")
+
+    def test_scan_templates_unbalanced(self):
+        """Templates with stray braces are skipped, as by recursive regex.
+        """
+        self.assertEqual(
+            [template.inner for template in scan_templates(
+                "{{{x}}} {{a|b}c}} {{d|{{e}}} {{f"
+            )],
+            ["x", "e"],
+        )
+        # deep nesting and unclosed templates terminate without recursion
+        self.assertEqual(len(scan_templates("{{a|" * 100000)), 0)
+        text = "{{" * 100000 + "x" + "}}" * 100000
+        self.assertEqual(len(scan_templates(text)), 1)
+
+    def test_parse_arguments(self):
+        """Arguments are split into positional and named ones.
+        """
+        name, args = parse_arguments("IPA|/a/|lang=en|[[w:b|b]]||pos=n=v")
+        self.assertEqual(name, "IPA")
+        self.assertEqual(args.positional, ["/a/", "[[w:b|b]]", ""])
+        self.assertEqual(args.get("lang"), "en")
+        self.assertEqual(args.get("pos"), "n=v")
+        self.assertEqual(args.get("gem", "n"), "n")
+        _, args = parse_arguments("ru-IPA|phon=a|b|pos=")
+        self.assertEqual(args.items, [("phon", "a"), (None, "b"), ("pos", "")])
+        self.assertEqual(args.get("pos", "adj"), "adj")
+        # empty values of repeated arguments are skipped
+        _, args = parse_arguments("fr-IPA|pos=|pos=v|pos=n|portions")
+        self.assertEqual(args.get("pos"), "v")
+        _, args = parse_arguments("ru-IPA|gem=|gem=y|gem=")
+        self.assertEqual(args.get("gem", "n"), "y")
+        args = scan_templates("{{fr-IPA\n|a{{b}}|pos=v}}")[0].arguments
+        self.assertEqual(args.positional, ["a"])
+        self.assertEqual(args.get("pos"), "v")
+
+
+if __name__ == "__main__":
+    unittest.main()
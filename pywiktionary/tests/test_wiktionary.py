@@ -7,13 +7,20 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import os
+import threading
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
+try:
+    from BaseHTTPServer import HTTPServer
+except ImportError:
+    from http.server import HTTPServer
 from six import with_metaclass
 
 from ..wiktionary import Wiktionary
+from ..results import PageResult, Pron, Status
+from .test_parser import StubAPIHandler
 
 
 # Testcases for extracting IPA from XML dump
@@ -97,7 +104,143 @@ class TestWiktionary(
         with_metaclass(TestWiktionaryMeta, unittest.TestCase)):
     """TestWiktionary class
     """
-    pass
+    def test_iter_IPA(self):
+        """Streaming IPA extraction yields the same results one by one.
+        """
+        wikt = Wiktionary(lang="English", XSAMPA=False)
+        results = wikt.iter_IPA(XML_DUMP_FILE)
+        self.assertFalse(isinstance(results, list))
+        self.assertEqual(list(results), XML_DUMP_CASES)
+
+    def test_extract_IPA_parallel(self):
+        """Parallel IPA extraction gives the same results as sequential.
+        """
+        wikt = Wiktionary(lang="English", XSAMPA=False)
+        self.assertEqual(
+            wikt.extract_IPA(XML_DUMP_FILE, workers=2, chunk_size=1),
+            XML_DUMP_CASES,
+        )
+        results = wikt.extract_IPA(
+            XML_DUMP_FILE,
+            workers=2,
+            chunk_size=3,
+            ordered=False,
+        )
+        self.assertEqual(
+            sorted(results, key=lambda x: x["id"]),
+            sorted(XML_DUMP_CASES, key=lambda x: x["id"]),
+        )
+
+    def test_extract_IPA_compact(self):
+        """Compact IPA extraction gives the same results in records.
+        """
+        expected_results = []
+        for case in XML_DUMP_CASES:
+            if isinstance(case["pronunciation"], list):
+                expected_results.append(PageResult(
+                    case["id"], case["title"], Status.FOUND, {
+                        "English": tuple(
+                            Pron(item["IPA"], None, item["lang"], "IPA")
+                            for item in case["pronunciation"]
+                        ),
+                    },
+                ))
+            else:
+                expected_results.append(PageResult(
+                    case["id"], case["title"], Status.IPA_NOT_FOUND,
+                ))
+        wikt = Wiktionary(lang="English", compact=True)
+        self.assertEqual(wikt.extract_IPA(XML_DUMP_FILE), expected_results)
+        self.assertEqual(
+            wikt.extract_IPA(XML_DUMP_FILE, workers=2, chunk_size=1),
+            expected_results,
+        )
+
+
+class StubQueryHandler(StubAPIHandler):
+    """Stub of ``action=query`` in Wiktionary API.
+
+    Titles are normalized by replacing underscores, "tests" redirects to
+    "test", and wiki text of at most 2 pages is returned per response.
+    """
+    def respond(self, param):
+        """Query wiki text of posted titles."""
+        self.server.requests.append(param)
+        start = int(param.get("rvcontinue", ["0"])[0])
+        query = {"normalized": [], "redirects": [], "pages": {}}
+        found = 0
+        for i, title in enumerate(param["titles"][0].split("|")):
+            if "_" in title:
+                query["normalized"].append({
+                    "from": title,
+                    "to": title.replace("_", " "),
+                })
+                title = title.replace("_", " ")
+            if title == "tests":
+                query["redirects"].append({"from": title, "to": "test"})
+                title = "test"
+            page = {"title": title}
+            if title == "missing":
+                page["missing"] = ""
+            else:
+                if start <= found < start + 2:
+                    page["revisions"] = [{
+                        "*": "==English==\n\n===Pronunciation===\n"
+                             "* {{IPA|/%s/|lang=en}}\n" % title,
+                    }]
+                found += 1
+            query["pages"][str(-1 - i)] = page
+        content = {"query": query}
+        if found > start + 2:
+            content["continue"] = {
+                "rvcontinue": str(start + 2),
+                "continue": "||",
+            }
+        self.send_json(content)
+
+
+class TestLookup(unittest.TestCase):
+    """TestLookup class
+    """
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), StubQueryHandler)
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.api = "http://127.0.0.1:%d/w/api.php" % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_lookup_many(self):
+        """Words are looked up in batches of titles.
+        """
+        wikt = Wiktionary(lang="English")
+        wikt.api = self.api
+        words = ["a", "tests", "missing", "b_c", "a", "d", "e"]
+        self.assertEqual(list(wikt.lookup_many(words, batch_size=5)), [
+            ("a", [{"IPA": "/a/", "lang": "en"}]),
+            ("tests", [{"IPA": "/test/", "lang": "en"}]),
+            ("missing", "Word not found."),
+            ("b_c", [{"IPA": "/b c/", "lang": "en"}]),
+            ("a", [{"IPA": "/a/", "lang": "en"}]),
+            ("d", [{"IPA": "/d/", "lang": "en"}]),
+            ("e", [{"IPA": "/e/", "lang": "en"}]),
+        ])
+        self.assertEqual(
+            [param["titles"][0] for param in self.server.requests],
+            ["a|tests|missing|b_c"] * 2 + ["d|e"],
+        )
+        wikt = Wiktionary(lang="English", compact=True)
+        wikt.api = self.api
+        results = dict(wikt.lookup_many(["tests", "missing"]))
+        self.assertEqual(results["tests"].title, "test")
+        self.assertEqual(list(results["tests"].records()), [
+            ("English", Pron("/test/", None, "en", "IPA")),
+        ])
+        self.assertEqual(results["missing"].status, Status.WORD_NOT_FOUND)
 
 
 if __name__ == "__main__":
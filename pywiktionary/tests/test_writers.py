@@ -0,0 +1,297 @@
+# pylint: disable=no-init, too-few-public-methods
+"""Unittest for writers.py.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from ..wiktionary import Wiktionary
+from ..writers import pyarrow, zstandard, ArrowWriter, ShardedWriter, \
+    COLUMNS, read_checkpoint, write_checkpoint
+from .test_wiktionary import XML_DUMP_FILE, XML_DUMP_CASES
+from .test_dump import make_multistream
+
+
+# Rows of XML_DUMP_CASES
+XML_DUMP_ROWS = [
+    {
+        "page_id": case["id"],
+        "title": case["title"],
+        "language": "English",
+        "lang_code": "en",
+        "template": "IPA",
+        "ipa": item["IPA"],
+        "xsampa": None,
+        "cmubet": cmubet,
+    } for case, item, cmubet in zip(
+        [XML_DUMP_CASES[0]] * 2 + [XML_DUMP_CASES[2]] * 2 +
+        [XML_DUMP_CASES[3]],
+        XML_DUMP_CASES[0]["pronunciation"] +
+        XML_DUMP_CASES[2]["pronunciation"] +
+        XML_DUMP_CASES[3]["pronunciation"],
+        [
+            "D IH K SH AX N AX R IH", "D IH K SH AX N EH R IY",
+            "M ER D AX R", "M ER SIL D AXR", "D AE Z AX L",
+        ],
+    )
+]
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrowWriter(unittest.TestCase):
+    """TestArrowWriter class
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.wikt = Wiktionary(lang="English", compact=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_parquet(self):
+        """Pronunciations are written to Parquet file in row groups.
+        """
+        import pyarrow.parquet # pylint: disable=redefined-outer-name
+        path = os.path.join(self.tmpdir, "pron.parquet")
+        with ArrowWriter(path, row_group_size=2) as writer:
+            writer.write_all(self.wikt.iter_IPA(XML_DUMP_FILE))
+        self.assertEqual(writer.count, len(XML_DUMP_ROWS))
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        table = parquet_file.read()
+        self.assertEqual(table.column_names, COLUMNS)
+        self.assertEqual(table.to_pylist(), XML_DUMP_ROWS)
+
+    def test_arrow(self):
+        """Pronunciations are written to Arrow IPC file.
+        """
+        import pyarrow.ipc # pylint: disable=redefined-outer-name
+        path = os.path.join(self.tmpdir, "pron.arrow")
+        with ArrowWriter(path, format="arrow") as writer:
+            writer.write_all(self.wikt.iter_IPA(XML_DUMP_FILE))
+        with pyarrow.memory_map(path) as source:
+            table = pyarrow.ipc.open_file(source).read_all()
+        self.assertEqual(table.to_pylist(), XML_DUMP_ROWS)
+
+
+class TestShardedWriter(unittest.TestCase):
+    """TestShardedWriter class
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.wikt = Wiktionary(lang="English", compact=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_tsv(self):
+        """Pronunciations are written to TSV shards of at most 2 lines.
+        """
+        with ShardedWriter(self.tmpdir, format="tsv", max_records=2) as \
+                writer:
+            writer.write_all(self.wikt.iter_IPA(XML_DUMP_FILE))
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), [
+            "pron-00000.tsv", "pron-00001.tsv", "pron-00002.tsv",
+        ])
+        lines = []
+        for path in writer.shards:
+            with open(path, encoding="utf-8") as f:
+                lines.append(f.read().splitlines())
+        self.assertEqual(lines, [
+            ["dictionary\t%s" % row["ipa"] for row in XML_DUMP_ROWS[:2]],
+            ["murder\t%s" % row["ipa"] for row in XML_DUMP_ROWS[2:4]],
+            ["dazzle\t%s" % XML_DUMP_ROWS[4]["ipa"]],
+        ])
+
+    def test_jsonl(self):
+        """Pages are written to gzip compressed JSON Lines shards.
+        """
+        with ShardedWriter(self.tmpdir, max_bytes=1,
+                           compression="gzip") as writer:
+            writer.write_all(XML_DUMP_CASES)
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), [
+            "pron-%05d.jsonl.gz" % i for i in range(len(XML_DUMP_CASES))
+        ])
+        entries = []
+        for path in writer.shards:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entries += [json.loads(line) for line in f]
+        self.assertEqual(entries, XML_DUMP_CASES)
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        """Compact results are written to zstd compressed shards.
+        """
+        with ShardedWriter(self.tmpdir, compression="zstd") as writer:
+            writer.write_all(self.wikt.iter_IPA(XML_DUMP_FILE))
+        self.assertEqual(os.listdir(self.tmpdir), ["pron-00000.jsonl.zst"])
+        with open(writer.shards[0], "rb") as f:
+            data = zstandard.ZstdDecompressor().stream_reader(f).read()
+        entries = [json.loads(line) for line in data.splitlines()]
+        self.assertEqual(
+            [(entry["title"], entry["status"]) for entry in entries],
+            [("dictionary", "FOUND"), ("battleship", "IPA_NOT_FOUND"),
+             ("murder", "FOUND"), ("dazzle", "FOUND")],
+        )
+        self.assertEqual(entries[3]["pronunciations"], {"English": [{
+            "ipa": "/ˈdæzəl/", "xsampa": None, "lang": "en",
+            "template": "IPA",
+        }]})
+
+
+class FailingWriter(ShardedWriter):
+    """Sharded writer failing when writing the page of id ``fail``."""
+    def __init__(self, directory, fail, **kwargs):
+        super(FailingWriter, self).__init__(directory, **kwargs)
+        self.fail = fail
+
+    def write(self, result):
+        if result["id"] == self.fail:
+            raise IOError("Failed to write page %d" % self.fail)
+        super(FailingWriter, self).write(result)
+
+
+class TestCheckpoint(unittest.TestCase):
+    """TestCheckpoint class
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dump_file = os.path.join(
+            self.tmpdir,
+            "enwiktionary-test-pages-articles-multistream.xml.bz2",
+        )
+        make_multistream(XML_DUMP_FILE, self.dump_file)
+        self.checkpoint = os.path.join(self.tmpdir, "checkpoint.json")
+        self.output = os.path.join(self.tmpdir, "output")
+        self.wikt = Wiktionary(lang="English")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def read_output(self, writer):
+        """Read entries in complete shards."""
+        entries = []
+        for path in writer.shards:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entries += [json.loads(line) for line in f]
+        return entries
+
+    def check_resume(self, dump_file, workers=None):
+        """Interrupt extraction at the last page, then resume it."""
+        writer = FailingWriter(
+            self.output,
+            fail=XML_DUMP_CASES[-1]["id"],
+            max_records=2,
+            compression="gzip",
+        )
+        with self.assertRaises(IOError):
+            self.wikt.write_IPA(dump_file, writer, workers=workers,
+                                checkpoint=self.checkpoint)
+        self.assertEqual(read_checkpoint(self.checkpoint), {
+            "page_id": XML_DUMP_CASES[1]["id"],
+            "shard": 1,
+            "pages": 2,
+            "complete": False,
+        })
+        self.assertEqual(sorted(os.listdir(self.output)), [
+            "pron-00000.jsonl.gz", "pron-00001.jsonl.tmp",
+        ])
+        writer = ShardedWriter(self.output, max_records=2,
+                               compression="gzip")
+        self.assertEqual(
+            self.wikt.write_IPA(dump_file, writer, workers=workers,
+                                checkpoint=self.checkpoint, resume=True),
+            len(XML_DUMP_CASES),
+        )
+        self.assertEqual(sorted(os.listdir(self.output)), [
+            "pron-00000.jsonl.gz", "pron-00001.jsonl.gz",
+        ])
+        self.assertEqual(self.read_output(writer), XML_DUMP_CASES)
+        self.assertTrue(read_checkpoint(self.checkpoint)["complete"])
+        # complete extraction is not repeated
+        writer = FailingWriter(self.output, fail=XML_DUMP_CASES[0]["id"])
+        self.assertEqual(
+            self.wikt.write_IPA(dump_file, writer, workers=workers,
+                                checkpoint=self.checkpoint, resume=True),
+            len(XML_DUMP_CASES),
+        )
+
+    def test_resume(self):
+        """Interrupted extraction is resumed from checkpoint.
+        """
+        self.check_resume(XML_DUMP_FILE)
+
+    def test_resume_multistream(self):
+        """Interrupted extraction of multistream dump is resumed.
+        """
+        self.check_resume(self.dump_file)
+        shutil.rmtree(self.output)
+        os.remove(self.checkpoint)
+        self.check_resume(self.dump_file, workers=2)
+
+    def test_shard_synced_before_checkpoint(self):
+        """Shards are flushed to disk before checkpoint is written.
+        """
+        calls = []
+        fsync, rename, replace = os.fsync, os.rename, os.replace
+        def log(name, func):
+            def wrapper(*args):
+                calls.append((name,) + tuple(
+                    os.path.basename(arg) for arg in args
+                    if not isinstance(arg, int)
+                ))
+                return func(*args)
+            return wrapper
+        writer = ShardedWriter(self.output, max_records=2)
+        with mock.patch.object(os, "fsync", log("fsync", fsync)), \
+                mock.patch.object(os, "rename", log("rename", rename)), \
+                mock.patch.object(os, "replace", log("replace", replace)):
+            self.wikt.write_IPA(XML_DUMP_FILE, writer,
+                                checkpoint=self.checkpoint)
+        self.assertEqual(calls[:6], [
+            ("fsync",),
+            ("rename", "pron-00000.jsonl.tmp", "pron-00000.jsonl"),
+            ("fsync",),
+            ("fsync",),
+            ("replace", "checkpoint.json.tmp", "checkpoint.json"),
+            ("fsync",),
+        ])
+
+    def test_resume_page_not_found(self):
+        """Resuming fails if the checkpoint page is not in dump.
+        """
+        state = {
+            "page_id": 999999,
+            "shard": 1,
+            "pages": 2,
+            "complete": False,
+        }
+        write_checkpoint(self.checkpoint, state)
+        for dump_file, workers in [(XML_DUMP_FILE, None),
+                                   (XML_DUMP_FILE, 2),
+                                   (self.dump_file, None)]:
+            writer = ShardedWriter(self.output, max_records=2)
+            with self.assertRaises(ValueError):
+                self.wikt.write_IPA(dump_file, writer, workers=workers,
+                                    checkpoint=self.checkpoint,
+                                    resume=True)
+            self.assertEqual(read_checkpoint(self.checkpoint), state)
+
+
+if __name__ == "__main__":
+    unittest.main()
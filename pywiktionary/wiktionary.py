@@ -5,15 +5,18 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from __future__ import print_function
 
-import json
-try:
-    from urllib import urlencode, urlopen
-except ImportError:
-    from urllib.parse import urlencode
-    from urllib.request import urlopen
-
-import mwxml
+import collections
+import itertools
+from xml.sax.saxutils import escape
+
+from .api import ConnectionPool
 from .parser import Parser
+from .results import PageResult, Status
+from .writers import read_checkpoint, write_checkpoint
+from .incremental import diff_entries
+from .dump import iter_pages, iter_multistream_pages, find_index_file, \
+    find_stream, skip_pages
+from .parallel import iter_parallel, iter_parallel_streams
 
 
 class Wiktionary(object):
@@ -24,16 +27,46 @@ class Wiktionary(object):
 
     To convert IPA text to X-SAMPA text, use ``XSAMPA`` parameter.
 
+    To cache templates expanded through Wiktionary API, use ``cache``
+    parameter, see :class:`Parser`.
+
+    Requests to Wiktionary API reuse keep-alive connections of ``pool``
+    and time out after ``timeout`` seconds. To record or replay responses,
+    use a pool from :mod:`pywiktionary.fixture`.
+
+    To skip pathological pages instead of spending unbounded time on them,
+    use ``budget`` parameter, see :class:`Parser`.
+
+    To get results as compact :class:`~pywiktionary.results.PageResult`
+    records instead of nested dicts, use ``compact`` parameter.
+
     Parameters
     ----------
     lang : string
         String of language type.
     XSAMPA : boolean
         Option for IPA to X-SAMPA conversion.
+    cache : object
+        Cache of expanded templates, with ``get`` and ``set`` methods.
+    timeout : float
+        Seconds to wait for response of Wiktionary API.
+    pool : ConnectionPool
+        Pool of connections to Wiktionary API, ``timeout`` is ignored if
+        given.
+    budget : Budget
+        Limits of work spent on a page, default is no limit.
+    compact : boolean
+        Option for returning ``PageResult`` records instead of dicts.
     """
-    def __init__(self, lang=None, XSAMPA=False):
+    def __init__(self, lang=None, XSAMPA=False, cache=None, timeout=60.0,
+                 pool=None, budget=None, compact=False):
         self.lang = lang
         self.XSAMPA = XSAMPA
+        self.cache = cache
+        self.budget = budget
+        self.compact = compact
+        self.pool = pool if pool is not None else \
+            ConnectionPool(timeout=timeout)
         self.set_parser()
         self.api = "https://en.wiktionary.org/w/api.php"
         self.param = {
@@ -70,11 +103,16 @@ class Wiktionary(object):
     def set_parser(self):
         """Set parser for Wiktionary.
 
-        Use the Wiktionary ``lang`` and ``XSAMPA`` parameters.
+        Use the Wiktionary ``lang``, ``XSAMPA``, ``cache``, ``budget`` and
+        ``compact`` parameters.
         """
         self.parser = Parser(
             lang=self.lang,
             XSAMPA=self.XSAMPA,
+            cache=self.cache,
+            pool=self.pool,
+            budget=self.budget,
+            compact=self.compact,
         )
 
     def get_entry_pronunciation(self, wiki_text, title=None):
@@ -97,57 +135,458 @@ class Wiktionary(object):
             return self.parser.parse(wiki_text, title=title)[self.lang]
         return self.parser.parse(wiki_text, title=title)
 
-    def extract_IPA(self, dump_file):
+    def get_entry(self, page_id, title, wiki_text):
+        """Extraction IPA result of a page.
+
+        Parameters
+        ----------
+        page_id : int
+            Page id, None if not known.
+        title : string
+            String of page title.
+        wiki_text : string
+            String of page wiki text, None if the page is not found.
+
+        Returns
+        -------
+        dict or PageResult
+            Extracted IPA result of page in
+            ``{"id": "", "title": "", "pronunciation": ""}`` format, or
+            :class:`~pywiktionary.results.PageResult` if ``compact`` is
+            set.
+        """
+        if self.compact:
+            if wiki_text is None:
+                return PageResult(page_id, title, Status.WORD_NOT_FOUND)
+            return PageResult.from_parse(
+                page_id,
+                title,
+                self.parser.parse(wiki_text, title=title),
+            )
+        if wiki_text is None:
+            pronunciation = "Word not found."
+        else:
+            pronunciation = self.get_entry_pronunciation(
+                wiki_text,
+                title=title,
+            )
+        return {"id": page_id, "title": title, "pronunciation": pronunciation}
+
+    def get_word_pronunciation(self, word, wiki_text, page_id=None):
+        """Extraction IPA for a looked up word.
+
+        Parameters
+        ----------
+        word : string
+            String of the word, used as page title.
+        wiki_text : string
+            String of page wiki text, None if the word is not found.
+        page_id : int
+            Page id, None if not known.
+
+        Returns
+        -------
+        dict or PageResult
+            Dict of word's IPA results, or ``"Word not found."``; or
+            :class:`~pywiktionary.results.PageResult` if ``compact`` is
+            set.
+        """
+        entry = self.get_entry(page_id, word, wiki_text)
+        if self.compact:
+            return entry
+        return entry["pronunciation"]
+
+    def iter_IPA(self, dump_file, index_file=None, workers=None,
+                 chunk_size=64, ordered=True, prefilter=False, after=None):
+        """Iterate IPA results from Wiktionary XML dump.
+
+        Pages are parsed one at a time as they are read from the dump,
+        so memory usage does not grow with the size of the dump.
+
+        Both ``.xml`` and ``.xml.bz2`` dumps are supported. For bz2
+        multistream dump, the multistream index file is used to read
+        the dump stream by stream; it is looked up next to the dump
+        unless ``index_file`` is given.
+
+        To parse pages in parallel, specify ``workers`` parameter. The
+        current process reads the dump and dispatches pages in chunks of
+        ``chunk_size`` to a pool of worker processes; with multistream
+        index, each worker decompresses the streams it parses.
+
+        With ``lang`` set, ``prefilter`` skips pages without a header of
+        the language while reading the dump, before they are parsed; such
+        pages are not yielded at all.
+
+        To continue an interrupted extraction, give the id of the last
+        page extracted as ``after``. With multistream index, reading
+        starts from the stream holding the page; otherwise pages up to it
+        are read but not parsed.
+
+        Parameters
+        ----------
+        dump_file : string
+            Path of Wiktionary XML dump file.
+        index_file : string
+            Path of multistream index file for bz2 multistream dump.
+        workers : int
+            Number of worker processes, default is parsing in current
+            process.
+        chunk_size : int
+            Number of pages dispatched to a worker process at a time.
+        ordered : boolean
+            Whether yield results in the order of pages in dump when
+            parsing in parallel.
+        prefilter : boolean
+            Whether skip pages without language header of ``lang``.
+        after : int
+            Id of a page, pages up to and including it are skipped.
+
+        Yields
+        ------
+        dict or PageResult
+            Extracted IPA result of one page in
+            ``{"id": "", "title": "", "pronunciation": ""}`` format, or
+            :class:`~pywiktionary.results.PageResult` if ``compact`` is
+            set.
+        """
+        if index_file is None:
+            index_file = find_index_file(dump_file)
+        contains = None
+        if prefilter and self.lang:
+            contains = escape("==%s==" % self.lang).encode("utf-8")
+        start = 0
+        if after is not None and index_file:
+            start = find_stream(index_file, after)
+            if start is None:
+                raise ValueError("Page %s not in %s" % (after, index_file))
+        parallel = workers and workers > 1
+        if parallel and index_file:
+            results = iter_parallel_streams(
+                self, dump_file, index_file,
+                workers=workers,
+                ordered=ordered,
+                contains=contains,
+                start=start,
+                after=after,
+            )
+        elif parallel:
+            results = iter_parallel(
+                self, skip_pages(iter_pages(dump_file, contains=contains),
+                                 after),
+                workers=workers,
+                chunk_size=chunk_size,
+                ordered=ordered,
+            )
+        else:
+            if index_file:
+                pages = iter_multistream_pages(
+                    dump_file, index_file,
+                    contains=contains,
+                    start=start,
+                )
+            else:
+                pages = iter_pages(dump_file, contains=contains)
+            pages = skip_pages(pages, after)
+            results = (
+                self.get_entry(page_id, title, text)
+                for page_id, title, text in pages
+            )
+        for entry in results:
+            yield entry
+
+    def extract_IPA(self, dump_file, index_file=None, workers=None,
+                    chunk_size=64, ordered=True, prefilter=False):
         """Extraction IPA list from Wiktionary XML dump.
 
+        Collect all results of :meth:`iter_IPA` into a list.
+
         Parameters
         ----------
         dump_file : string
             Path of Wiktionary XML dump file.
+        index_file : string
+            Path of multistream index file for bz2 multistream dump.
+        workers : int
+            Number of worker processes, default is parsing in current
+            process.
+        chunk_size : int
+            Number of pages dispatched to a worker process at a time.
+        ordered : boolean
+            Whether keep the order of pages in dump when parsing in
+            parallel.
+        prefilter : boolean
+            Whether skip pages without language header of ``lang``.
 
         Returns
         -------
         list
             List of extracted IPA results in
-            ``{"id": "", "title": "", "pronunciation": ""}`` format.
+            ``{"id": "", "title": "", "pronunciation": ""}`` format, or
+            :class:`~pywiktionary.results.PageResult` records if
+            ``compact`` is set.
         """
-        dump = mwxml.Dump.from_file((open(dump_file, "rb")))
-        lst = []
-        for page in dump:
-            for revision in page:
-                if revision.page.namespace == 0:
-                    pronunciation = self.get_entry_pronunciation(
-                        revision.text,
-                        title=revision.page.title,
+        return list(self.iter_IPA(
+            dump_file,
+            index_file=index_file,
+            workers=workers,
+            chunk_size=chunk_size,
+            ordered=ordered,
+            prefilter=prefilter,
+        ))
+
+    def write_IPA(self, dump_file, writer, checkpoint=None, resume=False,
+                  index_file=None, workers=None, chunk_size=64,
+                  prefilter=False):
+        """Extract IPA from Wiktionary XML dump into sharded writer.
+
+        Each time the writer completes a shard, the id of the last page
+        in it and the index of the next shard are saved to ``checkpoint``.
+        With ``resume`` set, extraction continues after the checkpoint:
+        partial shards are removed and pages already written are skipped,
+        so an interrupted run does not start over.
+
+        Parameters
+        ----------
+        dump_file : string
+            Path of Wiktionary XML dump file.
+        writer : ShardedWriter
+            Writer of results, see :mod:`pywiktionary.writers`; it is
+            closed when extraction is complete, or aborted on error.
+        checkpoint : string
+            Path of checkpoint file, default is no checkpoint.
+        resume : boolean
+            Whether continue from ``checkpoint`` if it exists.
+        index_file : string
+            Path of multistream index file for bz2 multistream dump.
+        workers : int
+            Number of worker processes, default is parsing in current
+            process.
+        chunk_size : int
+            Number of pages dispatched to a worker process at a time.
+        prefilter : boolean
+            Whether skip pages without language header of ``lang``.
+
+        Returns
+        -------
+        int
+            Number of pages written, including those written before
+            resuming.
+        """
+        state = {"page_id": None, "shard": 0, "pages": 0, "complete": False}
+        if resume and checkpoint is not None:
+            state = read_checkpoint(checkpoint) or state
+        if state["complete"]:
+            return state["pages"]
+        writer.resume(state["shard"])
+        results = self.iter_IPA(
+            dump_file,
+            index_file=index_file,
+            workers=workers,
+            chunk_size=chunk_size,
+            prefilter=prefilter,
+            after=state["page_id"],
+        )
+        pages = state["pages"]
+        try:
+            for entry in results:
+                writer.write(entry)
+                pages += 1
+                if checkpoint is not None and writer.index != state["shard"]:
+                    state = {
+                        "page_id": entry.id if self.compact else entry["id"],
+                        "shard": writer.index,
+                        "pages": pages,
+                        "complete": False,
+                    }
+                    write_checkpoint(checkpoint, state)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+        if checkpoint is not None:
+            state = dict(state, shard=writer.index, pages=pages,
+                         complete=True)
+            write_checkpoint(checkpoint, state)
+        return pages
+
+    def update_IPA(self, dump_file, store, full=True, index_file=None,
+                   prefilter=False):
+        """Update stored IPA results from a newer Wiktionary XML dump.
+
+        Only pages whose text changed since the revision stored are
+        parsed, by comparing SHA-1 of revision text; the store is updated
+        in one transaction, so it is left as before if the update fails.
+
+        The dump is either a full dump, or a daily adds-changes dump with
+        ``full`` unset; with a full dump, pages not in it are deleted from
+        the store. An empty store is filled by extracting all pages.
+
+        Parameters
+        ----------
+        dump_file : string
+            Path of Wiktionary XML dump file.
+        store : ResultStore
+            Store of IPA results, see :mod:`pywiktionary.incremental`.
+        full : boolean
+            Whether the dump holds all pages.
+        index_file : string
+            Path of multistream index file for bz2 multistream dump.
+        prefilter : boolean
+            Whether skip pages without language header of ``lang``.
+
+        Returns
+        -------
+        list of Change
+            List of pronunciations removed and added.
+        """
+        if index_file is None:
+            index_file = find_index_file(dump_file)
+        contains = None
+        if prefilter and self.lang:
+            contains = escape("==%s==" % self.lang).encode("utf-8")
+        if index_file:
+            pages = iter_multistream_pages(
+                dump_file, index_file,
+                contains=contains,
+                revision=True,
+            )
+        else:
+            pages = iter_pages(dump_file, contains=contains, revision=True)
+        mark = store.next_mark()
+        changes = []
+        try:
+            for page_id, title, text, revision_id, sha1 in pages:
+                stored = store.get_revision(page_id)
+                if stored is not None and sha1 and stored[1] == sha1:
+                    store.mark_seen(page_id, revision_id, mark)
+                    continue
+                entry = self.get_entry(page_id, title, text)
+                if self.compact:
+                    entry = entry.to_dict()
+                changes += diff_entries(
+                    page_id, title, store.get(page_id), entry,
+                    lang=self.lang,
+                )
+                store.put(page_id, title, revision_id, sha1, entry, mark)
+            if full:
+                for page_id, title, entry in store.pop_unseen(mark):
+                    changes += diff_entries(
+                        page_id, title, entry, None,
+                        lang=self.lang,
                     )
-                    lst.append({
-                        "id": revision.page.id,
-                        "title": revision.page.title,
-                        "pronunciation": pronunciation,
-                    })
-        return lst
+        except BaseException:
+            store.connect().rollback()
+            raise
+        store.commit()
+        return changes
 
-    def lookup(self, word):
-        """Look up IPA of word through Wiktionary API.
+    def lookup(self, word, source=None):
+        """Look up IPA of word through Wiktionary API or local dump.
 
         Parameters
         ----------
         word : string
             String of a word to be looked up.
+        source : DumpIndex
+            Index of local bz2 multistream dump to look up the word in,
+            default is querying Wiktionary API.
 
         Returns
         -------
-        dict
+        dict or PageResult
             Dict of word's IPA results.
             Key: language name; Value: list of IPA text.
+            Or :class:`~pywiktionary.results.PageResult` if ``compact``
+            is set.
         """
+        if source is not None:
+            page = source.get_page(word)
+            if page is None:
+                return self.get_word_pronunciation(word, None)
+            return self.get_word_pronunciation(word, page[2], page[0])
         self.param["titles"] = word.encode("utf-8")
-        param = urlencode(self.param).encode()
-        res = urlopen(self.api, param).read()
-        content = json.loads(res.decode("utf-8"))
+        content = self.pool.query(self.api, self.param)
         try:
             val = list(content["query"]["pages"].values())
             wiki_text = val[0]["revisions"][0]["*"]
         except (KeyError, IndexError):
-            return "Word not found."
-        return self.get_entry_pronunciation(wiki_text, title=word)
+            return self.get_word_pronunciation(word, None)
+        return self.get_word_pronunciation(
+            word, wiki_text, val[0].get("pageid")
+        )
+
+    def query_texts(self, titles):
+        """Query wiki text of pages by titles in one batched API request.
+
+        Titles are normalized and redirects are followed as reported by
+        Wiktionary API; continued responses are requested until all pages
+        have their wiki text.
+
+        Parameters
+        ----------
+        titles : list of string
+            List of titles, at most 50 for one request.
+
+        Returns
+        -------
+        dict
+            Dict of ``(title, wiki_text)`` of page, keyed by requested
+            title; titles not found are not included.
+        """
+        param = dict(self.param, titles="|".join(titles).encode("utf-8"))
+        # rvlimit is only allowed for a single page
+        del param["rvlimit"]
+        param["redirects"] = 1
+        normalized = {}
+        redirects = {}
+        texts = {}
+        while True:
+            content = self.pool.query(self.api, param)
+            query = content.get("query", {})
+            for item in query.get("normalized", []):
+                normalized[item["from"]] = item["to"]
+            for item in query.get("redirects", []):
+                redirects[item["from"]] = item["to"]
+            for page in query.get("pages", {}).values():
+                if page.get("revisions"):
+                    texts[page["title"]] = page["revisions"][0]["*"]
+            if "continue" not in content:
+                break
+            param.update(content["continue"])
+        results = {}
+        for title in titles:
+            target = normalized.get(title, title)
+            target = redirects.get(target, target)
+            if target in texts:
+                results[title] = (target, texts[target])
+        return results
+
+    def lookup_many(self, words, batch_size=50):
+        """Look up IPA of many words through Wiktionary API in batches.
+
+        Up to ``batch_size`` titles are queried in one API request, which
+        is limited to 50 by Wiktionary API.
+
+        Parameters
+        ----------
+        words : list of string
+            List of words to be looked up.
+        batch_size : int
+            Number of words queried in one API request.
+
+        Yields
+        ------
+        tuple
+            Tuple of word and its IPA results, in the order of words.
+        """
+        words = iter(words)
+        while True:
+            batch = list(itertools.islice(words, batch_size))
+            if not batch:
+                return
+            pages = self.query_texts(list(collections.OrderedDict.fromkeys(
+                batch
+            )))
+            for word in batch:
+                title, wiki_text = pages.get(word, (word, None))
+                yield word, self.get_word_pronunciation(title, wiki_text)
@@ -0,0 +1,560 @@
+"""Writers of extracted IPA results to files.
+
+Writers take results as yielded by :meth:`Wiktionary.iter_IPA`; row
+formats need :class:`~pywiktionary.results.PageResult` records, yielded
+with ``compact`` set, and write one row per pronunciation.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import gzip
+import io
+import json
+import os
+import shutil
+import itertools
+import threading
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .results import PageResult
+from .IPA import IPA
+
+
+# Columns of a pronunciation row
+COLUMNS = [
+    "page_id", "title", "language", "lang_code", "template",
+    "ipa", "xsampa", "cmubet",
+]
+
+# File extensions of compressed shards
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def iter_rows(result, cmubet=True):
+    """Iterate pronunciation rows of a page result.
+
+    Parameters
+    ----------
+    result : PageResult
+        Result of a page.
+    cmubet : boolean
+        Option for converting IPA of English to CMUBET.
+
+    Yields
+    ------
+    tuple
+        Tuple of values in order of :data:`COLUMNS`, CMUBET is None for
+        other languages than English.
+    """
+    for language, pron in result.records():
+        yield (
+            result.id,
+            result.title,
+            language,
+            pron.lang,
+            pron.template,
+            pron.ipa,
+            pron.xsampa,
+            IPA.IPA_to_CMUBET(pron.ipa)
+            if cmubet and pron.lang == "en" else None,
+        )
+
+
+class ArrowWriter(object):
+    """Writer of pronunciation rows to a Parquet or Arrow IPC file.
+
+    Rows are buffered and written in row groups (record batches for
+    Arrow) of ``row_group_size`` rows, so memory usage stays bounded for a
+    full dump. Requires ``pyarrow``.
+
+    Parameters
+    ----------
+    path : string
+        Path of output file.
+    format : string
+        ``parquet`` or ``arrow`` for Arrow IPC file format.
+    row_group_size : int
+        Number of rows in a row group.
+    compression : string
+        Compression codec of Parquet file.
+    cmubet : boolean
+        Option for converting IPA of English to CMUBET.
+
+    Examples
+    --------
+    >>> wikt = Wiktionary(XSAMPA=True, compact=True)
+    >>> with ArrowWriter("pron.parquet") as writer:
+    ...     writer.write_all(wikt.iter_IPA(dump_file, workers=4))
+    """
+    def __init__(self, path, format="parquet", row_group_size=65536,
+                 compression="zstd", cmubet=True):
+        # pylint: disable=redefined-builtin
+        if pyarrow is None:
+            raise ImportError("pyarrow is required to write %s files, "
+                              "install pywiktionary[arrow]" % format)
+        if format not in ("parquet", "arrow"):
+            raise ValueError("Unknown format: %s" % format)
+        self.path = path
+        self.format = format
+        self.row_group_size = row_group_size
+        self.cmubet = cmubet
+        self.schema = pyarrow.schema([
+            ("page_id", pyarrow.int64()),
+            ("title", pyarrow.string()),
+            ("language", pyarrow.string()),
+            ("lang_code", pyarrow.string()),
+            ("template", pyarrow.string()),
+            ("ipa", pyarrow.string()),
+            ("xsampa", pyarrow.string()),
+            ("cmubet", pyarrow.string()),
+        ])
+        if format == "parquet":
+            self.writer = pyarrow.parquet.ParquetWriter(
+                path, self.schema, compression=compression,
+            )
+        else:
+            self.writer = pyarrow.ipc.new_file(path, self.schema)
+        self.rows = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, result):
+        """Write pronunciations of a page.
+
+        Parameters
+        ----------
+        result : PageResult
+            Result of a page.
+        """
+        self.rows.extend(iter_rows(result, cmubet=self.cmubet))
+        while len(self.rows) >= self.row_group_size:
+            self.write_group(self.rows[:self.row_group_size])
+            del self.rows[:self.row_group_size]
+
+    def write_all(self, results):
+        """Write pronunciations of pages.
+
+        Parameters
+        ----------
+        results : iterable
+            Iterable of :class:`~pywiktionary.results.PageResult`.
+        """
+        for result in results:
+            self.write(result)
+
+    def write_group(self, rows):
+        """Write rows as one row group.
+
+        Parameters
+        ----------
+        rows : list of tuple
+            List of rows in order of :data:`COLUMNS`.
+        """
+        batch = pyarrow.RecordBatch.from_arrays([
+            pyarrow.array([row[i] for row in rows], type=field.type)
+            for i, field in enumerate(self.schema)
+        ], schema=self.schema)
+        if self.format == "parquet":
+            self.writer.write_table(pyarrow.Table.from_batches([batch]))
+        else:
+            self.writer.write_batch(batch)
+        self.count += len(rows)
+
+    def close(self):
+        """Write remaining rows and close file."""
+        if self.writer is None:
+            return
+        if self.rows:
+            self.write_group(self.rows)
+            self.rows = []
+        self.writer.close()
+        self.writer = None
+
+
+def read_checkpoint(path):
+    """Read checkpoint of extraction.
+
+    Parameters
+    ----------
+    path : string
+        Path of checkpoint file.
+
+    Returns
+    -------
+    dict
+        Dict of checkpoint state, None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with io.open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_checkpoint(path, state):
+    """Write checkpoint of extraction atomically.
+
+    Parameters
+    ----------
+    path : string
+        Path of checkpoint file.
+    state : dict
+        Dict of checkpoint state.
+    """
+    tmp = path + ".tmp"
+    with io.open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(state, ensure_ascii=False))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    sync_directory(os.path.dirname(path))
+
+
+def sync_file(path):
+    """Flush content of closed file to disk.
+
+    Parameters
+    ----------
+    path : string
+        Path of file.
+    """
+    with open(path, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def sync_directory(directory):
+    """Flush entries of directory, e.g. renamed files, to disk.
+
+    Directories cannot be opened for fsync on Windows, where this does
+    nothing.
+
+    Parameters
+    ----------
+    directory : string
+        Path of directory, "" for current directory.
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory or os.curdir, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def compress_file(src, dst, compression):
+    """Compress file, then remove the source file.
+
+    The compressed file is written to a temporary file first, and renamed
+    to ``dst`` when complete and flushed to disk; the source file is
+    removed only then.
+
+    Parameters
+    ----------
+    src : string
+        Path of file to be compressed.
+    dst : string
+        Path of compressed file.
+    compression : string
+        ``gzip`` or ``zstd``.
+    """
+    tmp = dst + ".tmp"
+    with open(src, "rb") as fin:
+        if compression == "gzip":
+            with gzip.open(tmp, "wb") as fout:
+                shutil.copyfileobj(fin, fout)
+        else:
+            with open(tmp, "wb") as fout:
+                zstandard.ZstdCompressor().copy_stream(fin, fout)
+    sync_file(tmp)
+    os.rename(tmp, dst)
+    sync_directory(os.path.dirname(dst))
+    os.remove(src)
+
+
+class ShardedWriter(object):
+    """Writer of IPA results to rotated JSON Lines or TSV shards.
+
+    JSON Lines shards have one page per line. TSV shards have one
+    pronunciation per line in ``columns``, by default the title and IPA
+    as in cmudict, which needs compact results.
+
+    A shard is written to a ``.tmp`` file, flushed to disk and renamed
+    when complete, so a shard with its final name is never partial; on
+    error, the current shard is left as ``.tmp`` file. A new shard is
+    started after ``max_records`` lines or ``max_bytes`` bytes. Complete
+    shards are compressed by ``compression`` in a background thread, so
+    compression does not stall parsing.
+
+    Parameters
+    ----------
+    directory : string
+        Directory of shards, created if not exists.
+    format : string
+        ``jsonl`` or ``tsv``.
+    prefix : string
+        Prefix of shard names, shards are named like ``pron-00000.jsonl``.
+    max_records : int
+        Maximum number of lines in a shard, None for no limit.
+    max_bytes : int
+        Maximum bytes of a shard before compression, None for no limit.
+    compression : string
+        ``gzip``, ``zstd`` or None.
+    columns : list of string
+        Columns of TSV shards, from :data:`COLUMNS`.
+    cmubet : boolean
+        Option for converting IPA of English to CMUBET in TSV shards.
+
+    Examples
+    --------
+    >>> wikt = Wiktionary(lang="English", compact=True)
+    >>> with ShardedWriter("pron", max_records=100000,
+    ...                    compression="gzip") as writer:
+    ...     writer.write_all(wikt.iter_IPA(dump_file, workers=4))
+    """
+    def __init__(self, directory, format="jsonl", prefix="pron",
+                 max_records=None, max_bytes=None, compression=None,
+                 columns=("title", "ipa"), cmubet=True):
+        # pylint: disable=redefined-builtin
+        if format not in ("jsonl", "tsv"):
+            raise ValueError("Unknown format: %s" % format)
+        if compression is not None and \
+                compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError("Unknown compression: %s" % compression)
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstandard is required for zstd compression, "
+                              "install pywiktionary[zstd]")
+        self.directory = directory
+        self.format = format
+        self.prefix = prefix
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.columns = [COLUMNS.index(column) for column in columns]
+        self.cmubet = cmubet
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        # paths of complete shards
+        self.shards = []
+        self.index = 0
+        self.file = None
+        self.records = 0
+        self.bytes = 0
+        self.queue = None
+        self.thread = None
+        self.error = None
+        if compression is not None:
+            self.queue = queue.Queue()
+            self.thread = threading.Thread(target=self.compress_shards)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def shard_path(self, index):
+        """Get path of shard, before compression.
+
+        Parameters
+        ----------
+        index : int
+            Index of shard.
+
+        Returns
+        -------
+        string
+            Path of shard.
+        """
+        return os.path.join(
+            self.directory,
+            "%s-%05d.%s" % (self.prefix, index, self.format),
+        )
+
+    def resume(self, index):
+        """Resume writing from shard of index.
+
+        Shards from ``index`` on and partial files, left by an interrupted
+        run, are removed; complete shards left uncompressed are compressed.
+        Must be called before writing.
+
+        Parameters
+        ----------
+        index : int
+            Index of the first shard to write.
+        """
+        ext = COMPRESSION_EXTENSIONS.get(self.compression, "")
+        shards = []
+        for i in itertools.count():
+            path = self.shard_path(i)
+            names = [path + suffix for suffix in (
+                "", ".tmp", ".gz", ".gz.tmp", ".zst", ".zst.tmp",
+            )]
+            found = [name for name in names if os.path.exists(name)]
+            if not found and i >= index:
+                break
+            for name in found:
+                if i >= index or name.endswith(".tmp"):
+                    os.remove(name)
+            if i >= index:
+                continue
+            if ext and os.path.exists(path):
+                if os.path.exists(path + ext):
+                    os.remove(path)
+                else:
+                    # interrupted before compression
+                    compress_file(path, path + ext, self.compression)
+            if os.path.exists(path + ext):
+                shards.append(path + ext)
+        self.shards = shards
+        self.index = index
+
+    def lines(self, result):
+        """Format result in lines of shard.
+
+        Parameters
+        ----------
+        result : dict or PageResult
+            Result of a page.
+
+        Returns
+        -------
+        list of string
+            List of lines.
+        """
+        if self.format == "jsonl":
+            if isinstance(result, PageResult):
+                result = result.to_dict()
+            return [json.dumps(result, ensure_ascii=False) + "\n"]
+        return [
+            "\t".join(
+                "" if row[i] is None else "%s" % row[i]
+                for i in self.columns
+            ) + "\n"
+            for row in iter_rows(result, cmubet=self.cmubet)
+        ]
+
+    def write(self, result):
+        """Write result of a page.
+
+        Lines of a page are always written to the same shard.
+
+        Parameters
+        ----------
+        result : dict or PageResult
+            Result of a page, TSV shards need :class:`PageResult`.
+        """
+        data = "".join(self.lines(result)).encode("utf-8")
+        if not data:
+            return
+        if self.file is None:
+            self.file = open(self.shard_path(self.index) + ".tmp", "wb")
+        self.file.write(data)
+        self.records += data.count(b"\n")
+        self.bytes += len(data)
+        if (self.max_records is not None and
+                self.records >= self.max_records) or \
+                (self.max_bytes is not None and self.bytes >= self.max_bytes):
+            self.rotate()
+
+    def write_all(self, results):
+        """Write results of pages.
+
+        Parameters
+        ----------
+        results : iterable
+            Iterable of results of pages.
+        """
+        for result in results:
+            self.write(result)
+
+    def rotate(self):
+        """Complete current shard and start a new one.
+
+        The shard is flushed to disk before it is renamed, so that a
+        checkpoint written after rotation never points past a shard lost
+        in a crash.
+        """
+        if self.file is None:
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+        path = self.shard_path(self.index)
+        os.rename(path + ".tmp", path)
+        sync_directory(self.directory)
+        if self.compression is None:
+            self.shards.append(path)
+        else:
+            self.queue.put(path)
+        self.index += 1
+        self.records = 0
+        self.bytes = 0
+
+    def compress_shards(self):
+        """Compress complete shards in background thread."""
+        ext = COMPRESSION_EXTENSIONS[self.compression]
+        while True:
+            path = self.queue.get()
+            if path is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                compress_file(path, path + ext, self.compression)
+            except Exception as err: # pylint: disable=broad-except
+                # raised in close, complete shard is kept uncompressed
+                self.error = err
+                continue
+            self.shards.append(path + ext)
+
+    def close(self):
+        """Complete current shard, and wait for compression.
+
+        Raises
+        ------
+        Exception
+            Error of compression in background thread.
+        """
+        self.rotate()
+        self.stop_compression()
+        if self.error is not None:
+            raise self.error
+
+    def abort(self):
+        """Stop writing on error, current shard is left partial."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.stop_compression()
+
+    def stop_compression(self):
+        """Wait for compression of queued shards and stop its thread."""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
@@ -29,6 +29,7 @@ setup(
     keywords="wiktionary cmudict IPA parser",
     packages=find_packages(exclude=["contrib", "docs", "tests", "mwxml"]),
     install_requires=["regex", "mwxml", "beautifulsoup4", "six"],
+    extras_require={"arrow": ["pyarrow"], "zstd": ["zstandard"]},
     tests_require = ["nose", "pylint"],
     test_suite="nose.collector",
 